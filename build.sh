@@ -7,4 +7,14 @@ python manage.py collectstatic --no-input
 
 python manage.py migrate
 
+python manage.py createcachetable
+
 python manage.py loaddata dump.json
+
+python manage.py rebuild_search_index
+
+python manage.py recount
+
+python manage.py warm_dashboard
+
+python manage.py rebuild_progress
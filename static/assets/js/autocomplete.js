@@ -0,0 +1,145 @@
+// Search-as-you-type for <select class="autocomplete" data-autocomplete-url="...">.
+// The select keeps only the chosen options; results are fetched page by
+// page from the url with ?term=&page= and added to it when picked.
+(function () {
+  "use strict";
+
+  var DELAY = 250;
+
+  function setup(select) {
+    var multiple = select.multiple;
+    var wrapper = document.createElement("div");
+    var chosen = document.createElement("div");
+    var input = document.createElement("input");
+    var results = document.createElement("div");
+    var timer = null;
+    var state = {term: "", page: 1, more: false, loading: false};
+
+    wrapper.className = "autocomplete-widget position-relative";
+    chosen.className = "autocomplete-chosen mb-1";
+    input.type = "search";
+    input.className = "form-control";
+    input.placeholder = "Type to search";
+    input.autocomplete = "off";
+    results.className = "autocomplete-results list-group position-absolute w-100 d-none";
+    results.style.zIndex = 1000;
+    results.style.maxHeight = "16rem";
+    results.style.overflowY = "auto";
+
+    select.parentNode.insertBefore(wrapper, select);
+    wrapper.appendChild(chosen);
+    wrapper.appendChild(input);
+    wrapper.appendChild(results);
+    wrapper.appendChild(select);
+    select.style.display = "none";
+
+    function renderChosen() {
+      chosen.innerHTML = "";
+      Array.prototype.forEach.call(select.options, function (option) {
+        if (!option.selected || !option.value) {
+          return;
+        }
+        var badge = document.createElement("span");
+        var remove = document.createElement("a");
+        badge.className = "badge bg-primary me-1";
+        badge.textContent = option.textContent + " ";
+        remove.href = "#";
+        remove.className = "text-white";
+        remove.textContent = "×";
+        remove.addEventListener("click", function (event) {
+          event.preventDefault();
+          option.selected = false;
+          select.removeChild(option);
+          renderChosen();
+        });
+        badge.appendChild(remove);
+        chosen.appendChild(badge);
+      });
+    }
+
+    function choose(id, text) {
+      var option = Array.prototype.find.call(select.options, function (o) {
+        return o.value === id;
+      });
+      if (!multiple) {
+        Array.prototype.forEach.call(select.options, function (o) {
+          o.selected = false;
+        });
+      }
+      if (!option) {
+        option = new Option(text, id, true, true);
+        select.appendChild(option);
+      }
+      option.selected = true;
+      renderChosen();
+      input.value = "";
+      hide();
+    }
+
+    function hide() {
+      results.classList.add("d-none");
+      results.innerHTML = "";
+    }
+
+    function load(page) {
+      if (state.loading) {
+        return;
+      }
+      state.loading = true;
+      var url = select.dataset.autocompleteUrl
+        + "?term=" + encodeURIComponent(state.term) + "&page=" + page;
+      fetch(url, {credentials: "same-origin", headers: {"Accept": "application/json"}})
+        .then(function (response) { return response.json(); })
+        .then(function (data) {
+          if (page === 1) {
+            results.innerHTML = "";
+          }
+          data.results.forEach(function (item) {
+            var entry = document.createElement("button");
+            entry.type = "button";
+            entry.className = "list-group-item list-group-item-action";
+            entry.textContent = item.text;
+            entry.addEventListener("click", function () {
+              choose(item.id, item.text);
+            });
+            results.appendChild(entry);
+          });
+          state.page = page;
+          state.more = data.pagination.more;
+          results.classList.toggle("d-none", !results.children.length);
+        })
+        .finally(function () {
+          state.loading = false;
+        });
+    }
+
+    input.addEventListener("input", function () {
+      clearTimeout(timer);
+      timer = setTimeout(function () {
+        state.term = input.value.trim();
+        load(1);
+      }, DELAY);
+    });
+    input.addEventListener("focus", function () {
+      state.term = input.value.trim();
+      load(1);
+    });
+    // Next page when the list is scrolled to the bottom.
+    results.addEventListener("scroll", function () {
+      if (state.more && results.scrollTop + results.clientHeight >= results.scrollHeight - 8) {
+        load(state.page + 1);
+      }
+    });
+    document.addEventListener("click", function (event) {
+      if (!wrapper.contains(event.target)) {
+        hide();
+      }
+    });
+
+    renderChosen();
+  }
+
+  document.addEventListener("DOMContentLoaded", function () {
+    document.querySelectorAll("select.autocomplete").forEach(setup);
+  });
+})();
@@ -13,4 +13,10 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "task_manager.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported once the apps are loaded. Serves the server-sent live updates
+# next to Django, see tasks.live.
+from tasks.live import LiveUpdatesRouter  # noqa: E402
+
+application = LiveUpdatesRouter(django_application)
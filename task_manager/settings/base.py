@@ -40,11 +40,14 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
+    "tasks.middleware.QueryBudgetMiddleware",
+    "tasks.middleware.ProfilingMiddleware",
+    "tasks.middleware.PrimaryPinningMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "tasks.middleware.TaskHistoryMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -53,7 +56,8 @@ ROOT_URLCONF = "task_manager.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # DjangoTemplates that reports render time to ProfilingMiddleware
+        "BACKEND": "tasks.profiling.TimedDjangoTemplates",
         "DIRS": [os.path.join(BASE_DIR, 'templates')],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -62,6 +66,7 @@ TEMPLATES = [
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
                 "tasks.context_processors.cfg_assets_root",
+                "tasks.context_processors.live_updates",
             ],
         },
     },
@@ -127,3 +132,87 @@ CRISPY_TEMPLATE_PACK = "bootstrap4"
 LOGIN_REDIRECT_URL = "tasks:task-list"
 LOGOUT_REDIRECT_URL = "tasks:index"
 
+# Caches
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHE_BACKENDS = {
+    "locmem": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "file": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": BASE_DIR / "cache",
+    },
+    "db": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "django_cache",
+    },
+}
+
+CACHES = {
+    "default": CACHE_BACKENDS[config("CACHE_BACKEND", default="locmem")],
+}
+
+# Rendered fragments, see tasks.caching
+FRAGMENT_CACHE_TIMEOUT = config("FRAGMENT_CACHE_TIMEOUT", default=3600, cast=int)
+
+# Homepage statistics, see tasks.dashboard
+DASHBOARD_CACHE_TIMEOUT = config("DASHBOARD_CACHE_TIMEOUT", default=300, cast=int)
+
+# Task list facet counts, see tasks.facets
+FACET_CACHE_TIMEOUT = config("FACET_CACHE_TIMEOUT", default=600, cast=int)
+
+# "offset" or "cursor", see tasks.pagination.CursorPaginationMixin
+LIST_PAGINATION_MODE = config("LIST_PAGINATION_MODE", default="offset")
+PAGINATION_ESTIMATE_COUNT = config("PAGINATION_ESTIMATE_COUNT", default=True, cast=bool)
+
+# Per-view query budgets, see tasks.middleware.QueryBudgetMiddleware
+# "off", "log" or "reject"
+QUERY_BUDGET_MODE = config("QUERY_BUDGET_MODE", default="log")
+
+
+# Serve the async read views from tasks.async_views, for ASGI deployments
+ASYNC_VIEWS = config("ASYNC_VIEWS", default=False, cast=bool)
+
+# Server-sent live updates of the task pages, served by task_manager.asgi
+# (ASGI deployments only), see tasks.live
+LIVE_UPDATES = config("LIVE_UPDATES", default=False, cast=bool)
+LIVE_UPDATES_PATH = "/live/tasks/"
+LIVE_BROKER = config("LIVE_BROKER", default="tasks.live.EventLogBroker")
+LIVE_POLL_INTERVAL = config("LIVE_POLL_INTERVAL", default=1.0, cast=float)
+# Messages buffered per connection before it is told to resync
+LIVE_QUEUE_SIZE = config("LIVE_QUEUE_SIZE", default=100, cast=int)
+LIVE_HEARTBEAT = config("LIVE_HEARTBEAT", default=15, cast=int)
+LIVE_MAX_CONNECTIONS = config("LIVE_MAX_CONNECTIONS", default=20000, cast=int)
+
+# Read replicas, see tasks.routers
+DATABASE_ROUTERS = ["tasks.routers.ReplicaRouter"]
+# Aliases in DATABASES that serve reads, set by the prod settings
+DATABASE_REPLICAS = []
+# Seconds a client's reads stay on the primary after it writes
+REPLICA_PIN_SECONDS = config("REPLICA_PIN_SECONDS", default=5, cast=int)
+
+# Request metrics and sampled cProfile dumps, see tasks.profiling
+PROFILING_ENABLED = config("PROFILING_ENABLED", default=True, cast=bool)
+# Fraction of requests (0 to 1) run under cProfile
+PROFILING_SAMPLE_RATE = config("PROFILING_SAMPLE_RATE", default=0.0, cast=float)
+PROFILING_DIR = config("PROFILING_DIR", default=str(BASE_DIR / "profiles"))
+# Bearer token that lets a Prometheus scraper read /metrics/ without a staff login
+PROFILING_METRICS_TOKEN = config("PROFILING_METRICS_TOKEN", default="")
+
+# Background jobs run by `manage.py run_worker`, see tasks.jobs
+# Seconds before the first retry of a failed job, doubled on every further attempt
+JOB_RETRY_BACKOFF = config("JOB_RETRY_BACKOFF", default=10, cast=int)
+JOB_RETRY_MAX_BACKOFF = config("JOB_RETRY_MAX_BACKOFF", default=3600, cast=int)
+# Seconds after which a running job is assumed to have lost its worker and is retried
+JOB_TIMEOUT = config("JOB_TIMEOUT", default=3600, cast=int)
+JOB_OUTPUT_DIR = config("JOB_OUTPUT_DIR", default=str(BASE_DIR / "job_output"))
+
+# Days of task history kept event by event; `manage.py compact_task_history`
+# folds older events into snapshots, see tasks.history
+TASK_HISTORY_RETENTION_DAYS = config("TASK_HISTORY_RETENTION_DAYS", default=90, cast=int)
+
+# Activity feed page size and how long a worker's subscription set is
+# cached (it is versioned, so changes show up at once), see tasks.feed
+FEED_PAGE_SIZE = config("FEED_PAGE_SIZE", default=30, cast=int)
+FEED_SUBSCRIPTION_TIMEOUT = config("FEED_SUBSCRIPTION_TIMEOUT", default=3600, cast=int)
@@ -12,6 +12,10 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # Take the write lock when a transaction starts, so concurrent
+        # writers (run_worker claiming jobs) wait for each other instead of
+        # failing with "database is locked" when a read turns into a write.
+        "OPTIONS": {"transaction_mode": "IMMEDIATE", "timeout": 20},
     }
 }
 
@@ -1,3 +1,7 @@
+import copy
+
+from decouple import Csv
+
 from .base import *
 
 # SECURITY WARNING: don't run with debug turned on in production!
@@ -21,7 +25,48 @@ DATABASES = {
         "PASSWORD": os.environ["POSTGRES_PASSWORD"],
         "HOST": os.environ["POSTGRES_HOST"],
         "PORT": int(os.environ["POSTGRES_DB_PORT"]),
+        # Seconds a connection is reused across requests, 0 closes it after
+        # every request. Ignored (forced to 0) when DB_POOL is on.
+        "CONN_MAX_AGE": config("DB_CONN_MAX_AGE", default=60, cast=int),
+        # Ping a persistent or pooled connection before handing it out
+        "CONN_HEALTH_CHECKS": config("DB_CONN_HEALTH_CHECKS", default=True, cast=bool),
+        # Needed behind PgBouncer in transaction pooling mode
+        "DISABLE_SERVER_SIDE_CURSORS": config("DB_DISABLE_SERVER_SIDE_CURSORS", default=False, cast=bool),
+        "OPTIONS": {
+            # Milliseconds before PostgreSQL cancels a statement, 0 disables
+            "options": f"-c statement_timeout={config('DB_STATEMENT_TIMEOUT', default=30000, cast=int)}",
+        },
+    }
+}
+
+# psycopg 3 connection pool, one per worker process (Django 5.1+)
+DB_POOL = config("DB_POOL", default=False, cast=bool)
+if DB_POOL:
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["OPTIONS"]["pool"] = {
+        "min_size": config("DB_POOL_MIN_SIZE", default=2, cast=int),
+        "max_size": config("DB_POOL_MAX_SIZE", default=10, cast=int),
+        # Seconds a request waits for a free connection before failing
+        "timeout": config("DB_POOL_TIMEOUT", default=10, cast=float),
+    }
+
+# Read replicas as comma separated host[:port], with the primary's
+# database name, credentials and connection options
+for number, address in enumerate(config("DB_REPLICA_HOSTS", default="", cast=Csv()), start=1):
+    host, _, port = address.partition(":")
+    alias = f"replica{number}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "PORT": int(port) if port else DATABASES["default"]["PORT"],
+        "OPTIONS": copy.deepcopy(DATABASES["default"]["OPTIONS"]),
+        "TEST": {"MIRROR": "default"},
     }
+    DATABASE_REPLICAS.append(alias)
+
+# Shared by all gunicorn workers, needs `manage.py createcachetable`.
+CACHES = {
+    "default": CACHE_BACKENDS[config("CACHE_BACKEND", default="db")],
 }
 
 STATIC_ROOT = BASE_DIR / "staticfiles"
@@ -18,10 +18,14 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from tasks.views import metrics
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("", include("tasks.urls", namespace="tasks")),
+    path("api/", include("tasks.api_urls", namespace="api")),
     path("accounts/", include("django.contrib.auth.urls")),
+    path("metrics/", metrics, name="metrics"),
 
     path("__debug__/", include("debug_toolbar.urls")),
 
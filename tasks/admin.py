@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 
-from tasks.models import Task, TaskType, Worker, Position, Tag, Team, Project
+from tasks.models import Task, TaskType, Worker, Position, Tag, Team, Project, Job
 
 
 @admin.register(Task)
@@ -47,3 +47,10 @@ class TeamAdmin(admin.ModelAdmin):
 class ProjectAdmin(admin.ModelAdmin):
     search_fields = ["name",]
 
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ["name", "status", "progress", "attempts", "created_by", "created_at", "finished_at"]
+    list_filter = ["status", "name"]
+    readonly_fields = ["locked_by", "started_at", "finished_at"]
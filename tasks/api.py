@@ -0,0 +1,199 @@
+"""
+Read-only JSON API.
+
+Every model is exposed as a resource with a list and a detail endpoint:
+
+* ``?fields=name,deadline`` limits the serialized (and loaded) columns,
+* ``?include=assignees,tags`` nests related objects, loaded with one
+  prefetch query per relation,
+* lists are cursor paginated (``?cursor=``, ``?limit=``),
+* responses carry an ETag built from the fragment cache versions, so a
+  matching If-None-Match is answered with 304 before any query runs.
+"""
+import hashlib
+
+from django.http import Http404, JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.views import generic
+
+from tasks import caching
+from tasks.models import Position, Project, Tag, Task, TaskType, Team, Worker
+from tasks.pagination import CursorPaginator
+
+DEFAULT_LIMIT = 25
+MAX_LIMIT = 100
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class Resource:
+    """
+    ``fields`` are the exposed columns, foreign keys are serialized as
+    ids unless included. ``includes`` maps relation names to the
+    resource name used to serialize them. ``depends_on`` lists models
+    whose changes show up in this resource without a save of its own
+    rows (e.g. counter columns).
+    """
+
+    def __init__(self, model, fields, includes=None, depends_on=()):
+        self.model = model
+        self.fields = fields
+        self.includes = includes or {}
+        self.depends_on = depends_on
+
+    def parse(self, params):
+        fields = self._parse_list(params.get("fields"), self.fields, "field") or list(self.fields)
+        includes = self._parse_list(params.get("include"), self.includes, "include")
+        return fields, includes
+
+    def _parse_list(self, value, allowed, kind):
+        names = [name for name in (value or "").split(",") if name]
+        unknown = [name for name in names if name not in allowed]
+        if unknown:
+            raise ApiError(f"Unknown {kind}: {', '.join(unknown)}")
+        return names
+
+    def get_queryset(self, fields, includes):
+        opts = self.model._meta
+        columns = {"pk", opts.ordering[0]}
+        columns.update(
+            name for name in fields + includes
+            if opts.get_field(name).concrete and not opts.get_field(name).many_to_many
+        )
+        return self.model.objects.only(*columns).prefetch_related(*includes)
+
+    def serialize(self, obj, fields, includes=()):
+        data = {}
+        for name in fields:
+            if name in includes:
+                continue
+            field = self.model._meta.get_field(name)
+            data[name] = getattr(obj, field.attname)
+        for name in includes:
+            resource = RESOURCES[self.includes[name]]
+            value = getattr(obj, name)
+            if self.model._meta.get_field(name).many_to_one:
+                data[name] = value and resource.serialize(value, resource.fields)
+            else:
+                data[name] = [resource.serialize(item, resource.fields) for item in value.all()]
+        return data
+
+    def version_keys(self, includes):
+        models = {self.model, *self.depends_on}
+        models.update(RESOURCES[self.includes[name]].model for name in includes)
+        return sorted(caching.collection_key(model) for model in models)
+
+
+RESOURCES = {
+    "tasks": Resource(
+        Task,
+        ["id", "name", "description", "deadline", "is_completed", "priority", "task_type", "project"],
+        includes={"assignees": "workers", "tags": "tags", "task_type": "task-types", "project": "projects"},
+    ),
+    "workers": Resource(
+        Worker,
+        ["id", "username", "first_name", "last_name", "email", "position"],
+        includes={"position": "positions", "teams": "teams"},
+    ),
+    "teams": Resource(
+        Team,
+        ["id", "name", "num_workers", "num_projects"],
+        includes={"workers": "workers", "projects": "projects"},
+        depends_on=(Project,),
+    ),
+    "projects": Resource(
+        Project,
+        ["id", "name", "team", "num_tasks"],
+        includes={"team": "teams"},
+        depends_on=(Task,),
+    ),
+    "tags": Resource(Tag, ["id", "name", "num_tasks"], depends_on=(Task,)),
+    "positions": Resource(Position, ["id", "name", "num_workers"], depends_on=(Worker,)),
+    "task-types": Resource(TaskType, ["id", "name", "num_tasks"], depends_on=(Task,)),
+}
+
+
+class ApiView(generic.View):
+    resource_name = None
+    http_method_names = ["get", "head", "options"]
+    query_budget = 8
+
+    @property
+    def resource(self):
+        return RESOURCES[self.resource_name]
+
+    def dispatch(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return JsonResponse({"error": "Authentication required"}, status=401)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except ApiError as error:
+            return JsonResponse({"error": str(error)}, status=error.status)
+
+    def get(self, request, *args, **kwargs):
+        fields, includes = self.resource.parse(request.GET)
+        etag = quote_etag(self.get_etag(includes))
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = JsonResponse(self.get_data(fields, includes))
+        response.headers["ETag"] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def get_version_keys(self, includes):
+        return self.resource.version_keys(includes)
+
+    def get_etag(self, includes):
+        versions = caching.get_versions(self.get_version_keys(includes))
+        raw = ":".join(map(str, versions)) + "|" + self.request.get_full_path()
+        return hashlib.md5(raw.encode()).hexdigest()
+
+
+class ApiListView(ApiView):
+    def get_limit(self):
+        try:
+            limit = int(self.request.GET.get("limit", DEFAULT_LIMIT))
+        except ValueError:
+            raise ApiError("limit must be an integer")
+        return max(1, min(limit, MAX_LIMIT))
+
+    def get_data(self, fields, includes):
+        queryset = self.resource.get_queryset(fields, includes)
+        paginator = CursorPaginator(queryset, self.get_limit(), self.resource.model._meta.ordering[0])
+        try:
+            page = paginator.page(self.request.GET.get("cursor"))
+        except Http404:
+            raise ApiError("Invalid cursor")
+        return {
+            "results": [self.resource.serialize(obj, fields, includes) for obj in page],
+            "next": self.page_url(page.next_cursor),
+            "previous": self.page_url(page.previous_cursor),
+        }
+
+    def page_url(self, cursor):
+        if cursor is None:
+            return None
+        params = self.request.GET.copy()
+        params["cursor"] = cursor
+        return self.request.build_absolute_uri(f"{self.request.path}?{params.urlencode()}")
+
+
+class ApiDetailView(ApiView):
+    def get_version_keys(self, includes):
+        return super().get_version_keys(includes) + [
+            caching.object_key(self.resource.model, self.kwargs["pk"])
+        ]
+
+    def get_data(self, fields, includes):
+        queryset = self.resource.get_queryset(fields, includes)
+        try:
+            obj = queryset.get(pk=self.kwargs["pk"])
+        except self.resource.model.DoesNotExist:
+            raise ApiError("Not found", status=404)
+        return self.resource.serialize(obj, fields, includes)
+
@@ -0,0 +1,15 @@
+from django.urls import path
+
+from tasks.api import RESOURCES, ApiDetailView, ApiListView
+from tasks.views import TaskBulkActionView
+
+urlpatterns = [
+    path("tasks/bulk/", TaskBulkActionView.as_view(json_response=True), name="task-bulk"),
+]
+for name in RESOURCES:
+    urlpatterns += [
+        path(f"{name}/", ApiListView.as_view(resource_name=name), name=f"{name}-list"),
+        path(f"{name}/<int:pk>/", ApiDetailView.as_view(resource_name=name), name=f"{name}-detail"),
+    ]
+
+app_name = "api"
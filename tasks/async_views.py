@@ -0,0 +1,88 @@
+"""
+ASGI-native versions of the read-heavy views.
+
+Everything a template needs is loaded with the async ORM (related rows
+prefetched) before rendering, so no query runs from the template. The
+render itself still goes through sync_to_async: template tags read the
+fragment cache, whose backends are synchronous (a database table in
+production).
+
+Served instead of the sync views when ASYNC_VIEWS is on, see tasks.urls.
+"""
+from asgiref.sync import sync_to_async
+from django.contrib.auth.decorators import login_required
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.shortcuts import aget_object_or_404
+from django.template.response import TemplateResponse
+from django.views import generic
+
+from tasks import dashboard
+from tasks.middleware import query_budget
+from tasks.models import Task, Worker
+from tasks.views import TaskListView
+
+
+async def arender(response):
+    return await sync_to_async(response.render)()
+
+
+class AsyncLoginRequiredMixin(LoginRequiredMixin):
+    async def dispatch(self, request, *args, **kwargs):
+        # Resolve the user once, the lazy request.user would query from
+        # the event loop.
+        request.user = await request.auser()
+        if not request.user.is_authenticated:
+            return self.handle_no_permission()
+        return await generic.View.dispatch(self, request, *args, **kwargs)
+
+
+@login_required
+@query_budget(4)
+async def index(request):
+    request.user = await request.auser()
+    stats = await dashboard.aget_stats()
+    return await arender(TemplateResponse(request, "tasks/index.html", stats))
+
+
+class AsyncTaskListView(AsyncLoginRequiredMixin, TaskListView):
+    async def get(self, request, *args, **kwargs):
+        self.object_list = self.get_queryset()
+        self.pagination = await self.apaginate_queryset(
+            self.object_list, self.get_paginate_by(self.object_list)
+        )
+        self.facets = await sync_to_async(super().get_facets)()
+        return await arender(self.render_to_response(self.get_context_data()))
+
+    def paginate_queryset(self, queryset, page_size):
+        return self.pagination
+
+    def get_facets(self):
+        return self.facets
+
+
+class AsyncTaskDetailView(AsyncLoginRequiredMixin, generic.DetailView):
+    model = Task
+    query_budget = 5
+    queryset = Task.objects.select_related("project").prefetch_related("assignees", "tags")
+
+    async def get(self, request, *args, **kwargs):
+        self.object = await aget_object_or_404(self.get_queryset(), pk=kwargs["pk"])
+        return await arender(self.render_to_response(self.get_context_data(object=self.object)))
+
+
+class AsyncWorkerDetailView(AsyncLoginRequiredMixin, generic.DetailView):
+    model = Worker
+    query_budget = 5
+    queryset = Worker.objects.prefetch_related("teams")
+    template_name = "tasks/worker_detail.html"
+
+    async def get(self, request, *args, **kwargs):
+        self.object = await aget_object_or_404(self.get_queryset(), pk=kwargs["pk"])
+        # One query for both lists instead of one per list.
+        tasks = [task async for task in self.object.tasks.all()]
+        context = self.get_context_data(
+            object=self.object,
+            incompleted_tasks=[task for task in tasks if not task.is_completed],
+            completed_tasks=[task for task in tasks if task.is_completed],
+        )
+        return await arender(self.render_to_response(context))
@@ -0,0 +1,175 @@
+"""
+Latency, query count and memory of every page in tasks.urls.
+
+Pages are requested through the test client, so the whole middleware,
+view and template stack is measured without a running server. The
+helpers at the bottom drive a real server process over HTTP instead, for
+benchmarks of the server and database setup.
+"""
+import math
+import os
+import socket
+import subprocess
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from http.client import HTTPConnection
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import CommandError
+from django.test import Client
+from django.urls import reverse
+
+from tasks import urls as task_urls
+from tasks.middleware import QueryCounter
+
+
+def url_kwargs(pattern):
+    """
+    Fills in the pk of detail/update/delete urls with the first object
+    of the view's model. Returns None if there is no such object.
+    """
+    if "pk" not in pattern.pattern.converters:
+        return {}
+    model = pattern.callback.view_class.model
+    pk = model.objects.order_by("pk").values_list("pk", flat=True).first()
+    return None if pk is None else {"pk": pk}
+
+
+def iter_urls(exclude=()):
+    for pattern in task_urls.urlpatterns:
+        if pattern.name in exclude:
+            continue
+        kwargs = url_kwargs(pattern)
+        if kwargs is not None:
+            yield pattern, reverse(f"tasks:{pattern.name}", kwargs=kwargs)
+
+
+def percentile(values, percent):
+    """
+    Nearest-rank percentile.
+    """
+    values = sorted(values)
+    return values[max(0, math.ceil(percent / 100 * len(values)) - 1)]
+
+
+def fetch(client, url):
+    response = client.get(url)
+    if response.streaming:
+        for _ in response.streaming_content:
+            pass
+    return response
+
+
+def measure(client, url, repeat=10, warmup=1):
+    for _ in range(warmup):
+        fetch(client, url)
+
+    timings = []
+    counter = QueryCounter()
+    with counter.track():
+        for _ in range(repeat):
+            started = time.perf_counter()
+            response = fetch(client, url)
+            timings.append((time.perf_counter() - started) * 1000)
+
+    # tracemalloc slows everything down, so memory gets a separate request.
+    tracemalloc.start()
+    try:
+        fetch(client, url)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "url": url,
+        "status": response.status_code,
+        "p50_ms": round(percentile(timings, 50), 2),
+        "p95_ms": round(percentile(timings, 95), 2),
+        "queries": counter.count / repeat,
+        "db_ms": round(counter.duration * 1000 / repeat, 2),
+        "peak_memory_kb": round(peak / 1024, 1),
+    }
+
+
+def run(client, repeat=10, warmup=1, exclude=(), progress=None):
+    results = {}
+    for pattern, url in iter_urls(exclude):
+        results[pattern.name] = measure(client, url, repeat=repeat, warmup=warmup)
+        if progress:
+            progress(pattern.name, results[pattern.name])
+    return results
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise CommandError(f"Server did not start on port {port}")
+
+
+@contextmanager
+def serve(command, env, port):
+    """
+    Runs ``command`` with ``env`` added to the environment until the
+    block exits.
+    """
+    server = subprocess.Popen(command, env={**os.environ, **env})
+    try:
+        wait_for_port(port)
+        yield server
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def session_cookie():
+    user = get_user_model().objects.order_by("-is_superuser", "pk").first()
+    client = Client()
+    client.force_login(user)
+    return f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}"
+
+
+def load(port, paths, cookie, concurrency, total):
+    """
+    GETs ``paths`` round robin ``total`` times from ``concurrency``
+    threads with one keep-alive connection each.
+    """
+    local = threading.local()
+    timings, errors = [], []
+
+    def request(index):
+        if not hasattr(local, "connection"):
+            local.connection = HTTPConnection("127.0.0.1", port, timeout=60)
+        started = time.perf_counter()
+        try:
+            local.connection.request("GET", paths[index % len(paths)], headers={"Cookie": cookie})
+            response = local.connection.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+        except OSError as error:
+            errors.append(str(error))
+            local.connection.close()
+            del local.connection
+        timings.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        list(executor.map(request, range(total)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": total,
+        "errors": len(errors),
+        "requests_per_second": round(total / elapsed, 1),
+        "p50_ms": round(percentile(timings, 50), 2),
+        "p95_ms": round(percentile(timings, 95), 2),
+        "p99_ms": round(percentile(timings, 99), 2),
+    }
@@ -0,0 +1,202 @@
+"""
+Bulk task actions.
+
+Each action changes many tasks in one transaction, CHUNK_SIZE tasks per
+UPDATE or bulk through-table INSERT/DELETE. Those bypass the model signals, so
+every action also fixes up what the handlers in tasks.signals would
+have: counter columns, the search index, cache versions, the dashboard,
+the progress rollups and the task history.
+"""
+from collections import Counter
+
+from django.db import transaction
+
+from tasks import caching, counters, dashboard, history, rollups, search
+from tasks.models import Project, Tag, Task, Worker
+
+
+# Tasks handled per query, well under the bind parameter limits
+# (32766 on SQLite, 65535 on PostgreSQL) however many are selected.
+CHUNK_SIZE = 1000
+
+
+def _chunks(tasks, *fields):
+    """
+    Yields the (pk, *fields) rows of ``tasks`` in pages of CHUNK_SIZE,
+    keyed on the pk, so a page stays valid while earlier ones are
+    changed.
+    """
+    last = None
+    while True:
+        page = tasks.order_by("pk")
+        if last is not None:
+            page = page.filter(pk__gt=last)
+        rows = list(page.values_list("pk", *fields)[:CHUNK_SIZE])
+        if not rows:
+            return
+        yield rows
+        last = rows[-1][0]
+
+
+def _invalidate_tasks(task_ids):
+    caching.invalidate(Task, task_ids)
+    # Worker and tag pages list their tasks, see signals.invalidate_cached_fragments.
+    links = Task.assignees.through.objects.filter(task_id__in=task_ids)
+    caching.invalidate(Worker, set(links.values_list("worker_id", flat=True)), collection=False)
+    links = Task.tags.through.objects.filter(task_id__in=task_ids)
+    caching.invalidate(Tag, set(links.values_list("tag_id", flat=True)), collection=False)
+
+
+def set_completed(tasks, is_completed=True):
+    affected, project_ids = 0, set()
+    with transaction.atomic():
+        for rows in _chunks(tasks.exclude(is_completed=is_completed), "project_id"):
+            task_ids = [task_id for task_id, _ in rows]
+            affected += Task.objects.filter(pk__in=task_ids).update(is_completed=is_completed)
+            history.record_updated(
+                [(task_id, not is_completed, project_id) for task_id, project_id in rows], "is_completed", is_completed
+            )
+            _invalidate_tasks(task_ids)
+            project_ids.update(project_id for _, project_id in rows)
+        dashboard.invalidate()
+        rollups.refresh_projects(project_ids)
+    return affected
+
+
+def set_priority(tasks, priority):
+    affected = 0
+    with transaction.atomic():
+        for rows in _chunks(tasks.exclude(priority=priority), "priority", "project_id"):
+            task_ids = [task_id for task_id, _, _ in rows]
+            affected += Task.objects.filter(pk__in=task_ids).update(priority=priority)
+            history.record_updated(rows, "priority", priority)
+            _invalidate_tasks(task_ids)
+        dashboard.invalidate()
+    return affected
+
+
+def move_to_project(tasks, project):
+    project_id = project.pk if project else None
+    affected, previous = 0, Counter()
+    with transaction.atomic():
+        moved = tasks.exclude(project_id=project_id) if project_id else tasks.filter(project__isnull=False)
+        for rows in _chunks(moved, "project_id"):
+            task_ids = [task_id for task_id, _ in rows]
+            affected += Task.objects.filter(pk__in=task_ids).update(project_id=project_id)
+            history.record_updated([(task_id, old, project_id) for task_id, old in rows], "project", project_id)
+            previous.update(old for _, old in rows if old is not None)
+            search.reindex_tasks(task_ids)
+            _invalidate_tasks(task_ids)
+
+        for old, count in previous.items():
+            counters.adjust(Project, [old], "num_tasks", -count)
+        counters.adjust(Project, [project_id], "num_tasks", affected)
+        caching.invalidate(Project, [*previous, project_id])
+        rollups.refresh_projects([*previous, project_id])
+    return affected
+
+
+def _m2m(relation):
+    field = Task._meta.get_field(relation)
+    return field.remote_field.through, f"{field.m2m_reverse_field_name()}_id", field.related_model
+
+
+def add_related(tasks, relation, objs):
+    """
+    Links every task to every object in ``objs`` through the ``relation``
+    many to many field. Existing links are kept, returns the number of
+    new links.
+    """
+    through, target, model = _m2m(relation)
+    target_ids = [obj.pk for obj in objs]
+    added = 0
+    with transaction.atomic():
+        for chunk in _chunks(tasks):
+            task_ids = [task_id for task_id, in chunk]
+            existing = set(
+                through.objects.filter(task_id__in=task_ids, **{f"{target}__in": target_ids})
+                .values_list("task_id", target)
+            )
+            rows = [
+                (task_id, target_id)
+                for task_id in task_ids
+                for target_id in target_ids
+                if (task_id, target_id) not in existing
+            ]
+            through.objects.bulk_create(
+                [through(task_id=task_id, **{target: target_id}) for task_id, target_id in rows],
+                batch_size=1000,
+            )
+            history.record_links(relation, rows, added=True)
+            _after_m2m_change(model, rows, 1)
+            added += len(rows)
+    return added
+
+
+def remove_related(tasks, relation, objs):
+    """
+    Unlinks the tasks from ``objs``, returns the number of removed links.
+    """
+    through, target, model = _m2m(relation)
+    removed = 0
+    with transaction.atomic():
+        for chunk in _chunks(tasks):
+            links = through.objects.filter(
+                task_id__in=[task_id for task_id, in chunk],
+                **{f"{target}__in": [obj.pk for obj in objs]},
+            )
+            rows = list(links.values_list("task_id", target))
+            links.delete()
+            history.record_links(relation, rows, added=False)
+            _after_m2m_change(model, rows, -1)
+            removed += len(rows)
+    return removed
+
+
+def _after_m2m_change(model, rows, sign):
+    task_ids = {task_id for task_id, _ in rows}
+    by_target = Counter(target_id for _, target_id in rows)
+    if model is Tag:
+        for target_id, count in by_target.items():
+            counters.adjust(Tag, [target_id], "num_tasks", sign * count)
+    # Tag, project and assignee names are part of the indexed text.
+    search.reindex_tasks(task_ids)
+    _invalidate_tasks(task_ids)
+    caching.invalidate(model, list(by_target))
+
+
+def add_tags(tasks, tags):
+    return add_related(tasks, "tags", tags)
+
+
+def remove_tags(tasks, tags):
+    return remove_related(tasks, "tags", tags)
+
+
+def add_assignees(tasks, workers):
+    return add_related(tasks, "assignees", workers)
+
+
+def remove_assignees(tasks, workers):
+    return remove_related(tasks, "assignees", workers)
+
+
+ACTIONS = {
+    "complete": lambda tasks, data: set_completed(tasks, True),
+    "reopen": lambda tasks, data: set_completed(tasks, False),
+    "set_priority": lambda tasks, data: set_priority(tasks, data["priority"]),
+    "move_to_project": lambda tasks, data: move_to_project(tasks, data["project"]),
+    "add_tags": lambda tasks, data: add_tags(tasks, data["tags"]),
+    "remove_tags": lambda tasks, data: remove_tags(tasks, data["tags"]),
+    "add_assignees": lambda tasks, data: add_assignees(tasks, data["assignees"]),
+    "remove_assignees": lambda tasks, data: remove_assignees(tasks, data["assignees"]),
+}
+
+
+def run(action, tasks, data):
+    """
+    Runs ``action`` with the cleaned data of a TaskBulkActionForm and
+    returns the number of changed tasks (or links for tag/assignee
+    actions).
+    """
+    return ACTIONS[action](tasks, data)
@@ -0,0 +1,115 @@
+"""
+Versioned fragment caching.
+
+Every cached object has a version key per row and one per model
+(collection). Rendered fragments are stored under a key built from the
+versions they depend on, so invalidation is just dropping version keys:
+the next read picks a fresh, never used version and old fragments are
+no longer reachable (they expire on their own).
+
+Version keys are dropped by the signal handlers in tasks.signals.
+
+Fragment hits and misses are counted in process memory, like the
+request metrics of tasks.profiling, so a lookup costs one cache read and
+nothing more. With several workers stats() reports the answering one.
+"""
+import hashlib
+import threading
+import time
+from collections import Counter
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models, transaction
+
+_stats_lock = threading.Lock()
+_stats = Counter()
+
+
+def object_key(model, pk):
+    return f"version:{model._meta.label_lower}:{pk}"
+
+
+def collection_key(model):
+    return f"version:{model._meta.label_lower}"
+
+
+def get_versions(keys):
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        # A fresh timestamp can not collide with a version that was used
+        # before the key was dropped or evicted.
+        now = time.time_ns()
+        for key in missing:
+            cache.add(key, now, timeout=None)
+        versions.update(cache.get_many(missing))
+    return [versions.get(key) for key in keys]
+
+
+def invalidate(model, pks=(), collection=True):
+    """
+    Drops the versions of ``pks`` and of the ``model`` collection once
+    the current transaction commits. Dropped earlier, a read in between
+    would cache the uncommitted rows' old state under the new version.
+    """
+    keys = [object_key(model, pk) for pk in pks if pk is not None]
+    if collection:
+        keys.append(collection_key(model))
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def dependency_key(dependency):
+    """
+    Model instances depend on their row version, "app_label.Model"
+    strings on the model's collection version, anything else is used
+    literally (e.g. the query string of a list page).
+    """
+    if isinstance(dependency, models.Model):
+        return object_key(type(dependency), dependency.pk)
+    if isinstance(dependency, str) and dependency.count(".") == 1:
+        try:
+            return collection_key(apps.get_model(dependency))
+        except (LookupError, ValueError):
+            pass
+    return None
+
+
+def fragment_key(name, dependencies):
+    version_keys = [dependency_key(dependency) for dependency in dependencies]
+    versions = iter(get_versions([key for key in version_keys if key]))
+    parts = [
+        str(next(versions)) if key else repr(dependency)
+        for key, dependency in zip(version_keys, dependencies)
+    ]
+    digest = hashlib.md5(":".join(parts).encode()).hexdigest()
+    return f"fragment:{name}:{digest}"
+
+
+def get_fragment(key):
+    content = cache.get(key)
+    with _stats_lock:
+        _stats["misses" if content is None else "hits"] += 1
+    return content
+
+
+def set_fragment(key, content):
+    cache.set(key, content, getattr(settings, "FRAGMENT_CACHE_TIMEOUT", 3600))
+
+
+def stats():
+    with _stats_lock:
+        hits, misses = _stats["hits"], _stats["misses"]
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": hits / total if total else 0.0,
+    }
+
+
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
@@ -4,3 +4,7 @@ def cfg_assets_root(request):
 
     return { "ASSETS_ROOT" : settings.ASSETS_ROOT }
 
+
+def live_updates(request):
+    # The url the task pages listen on for changes, see tasks.live.
+    return {"LIVE_UPDATES_URL": settings.LIVE_UPDATES_PATH if settings.LIVE_UPDATES else None}
@@ -0,0 +1,93 @@
+"""
+Denormalized counter columns.
+
+Counts such as Tag.num_tasks are stored on the row and adjusted with
+F() updates from the signal handlers in tasks.signals, so templates and
+list pages can show them without a COUNT per object. ``recount`` rebuilds
+every counter from scratch to repair drift (e.g. after raw SQL or
+bulk_create, which bypass signals).
+"""
+from django.apps import apps as global_apps
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from tasks import caching
+
+# (model, foreign key, counted model, counter field)
+FK_COUNTERS = [
+    ("tasks.Worker", "position", "tasks.Position", "num_workers"),
+    ("tasks.Task", "task_type", "tasks.TaskType", "num_tasks"),
+    ("tasks.Task", "project", "tasks.Project", "num_tasks"),
+    ("tasks.Project", "team", "tasks.Team", "num_projects"),
+]
+
+# (model, many to many field, counted model, counter field)
+M2M_COUNTERS = [
+    ("tasks.Task", "tags", "tasks.Tag", "num_tasks"),
+    ("tasks.Team", "workers", "tasks.Team", "num_workers"),
+]
+
+
+def adjust(model, pks, field, delta):
+    pks = [pk for pk in pks if pk is not None]
+    if pks and delta:
+        model.objects.filter(pk__in=pks).update(**{field: F(field) + delta})
+
+
+def fk_counters_for(model):
+    return [
+        (fk, global_apps.get_model(target), field)
+        for source, fk, target, field in FK_COUNTERS
+        if global_apps.get_model(source) is model
+    ]
+
+
+def m2m_counters_for(through):
+    for source, m2m, target, field in M2M_COUNTERS:
+        m2m_field = global_apps.get_model(source)._meta.get_field(m2m)
+        if m2m_field.remote_field.through is through:
+            yield m2m_field, global_apps.get_model(target), field
+
+
+def _count_subquery(queryset, group_by):
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{group_by: OuterRef("pk")})
+            .order_by()
+            .values(group_by)
+            .annotate(count=Count("pk"))
+            .values("count")
+        ),
+        Value(0),
+    )
+
+
+def invalidate_counted():
+    """
+    Drops the cached versions of the counted models, whose pages show the
+    counters recount() rewrote.
+    """
+    for target in {target for *_, target, _ in FK_COUNTERS + M2M_COUNTERS}:
+        caching.invalidate(global_apps.get_model(target))
+
+
+def recount():
+    """
+    Recomputes every counter column with one UPDATE per counter.
+    """
+    for source, fk, target, field in FK_COUNTERS:
+        source_model = global_apps.get_model(source)
+        global_apps.get_model(target).objects.update(
+            **{field: _count_subquery(source_model.objects.all(), fk)}
+        )
+    for source, m2m, target, field in M2M_COUNTERS:
+        source_model = global_apps.get_model(source)
+        m2m_field = source_model._meta.get_field(m2m)
+        if global_apps.get_model(target) is source_model:
+            group_by = m2m_field.m2m_field_name()
+        else:
+            group_by = m2m_field.m2m_reverse_field_name()
+        through = m2m_field.remote_field.through
+        global_apps.get_model(target).objects.update(
+            **{field: _count_subquery(through.objects.all(), group_by)}
+        )
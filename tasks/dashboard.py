@@ -0,0 +1,200 @@
+"""
+Cached statistics for the homepage.
+
+The numbers are computed with one grouped query over tasks plus one
+aggregate over teams (project totals come from Team.num_projects), and
+cached for DASHBOARD_CACHE_TIMEOUT seconds. Signal handlers in
+tasks.signals apply single task/project/team changes to the cached
+numbers in place instead of dropping them.
+
+Every counter has its own cache key, so a change is a cache.incr per
+counter once the transaction commits, never a read-modify-write of the
+whole stats. The keys carry the generation of the refresh() that stored
+them: a refresh starts a new set of keys and the old ones expire.
+"""
+import time
+from collections import Counter
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from tasks.models import Task, TaskPriority, Team, overdue_condition
+
+CACHE_KEY = "dashboard:stats"
+
+
+def _timeout():
+    return getattr(settings, "DASHBOARD_CACHE_TIMEOUT", 300)
+
+
+def compute_stats():
+    today = timezone.now().date()
+    by_priority = {
+        priority: {"open": 0, "completed": 0, "overdue": 0}
+        for priority in TaskPriority.values
+    }
+    rows = (
+        Task.objects.order_by()
+        .values("priority", "is_completed")
+        .annotate(
+            total=Count("pk"),
+            overdue=Count("pk", filter=overdue_condition()),
+        )
+    )
+    for row in rows:
+        counts = by_priority.setdefault(row["priority"], {"open": 0, "completed": 0, "overdue": 0})
+        counts["completed" if row["is_completed"] else "open"] += row["total"]
+        counts["overdue"] += row["overdue"]
+
+    totals = Team.objects.aggregate(num_teams=Count("pk"), num_projects=Sum("num_projects"))
+    stats = {
+        "date": today.isoformat(),
+        "computed_at": time.time(),
+        "by_priority": by_priority,
+        "num_teams": totals["num_teams"],
+        "num_projects": totals["num_projects"] or 0,
+    }
+    _update_totals(stats)
+    return stats
+
+
+def _update_totals(stats):
+    by_priority = stats["by_priority"].values()
+    stats["num_open"] = sum(counts["open"] for counts in by_priority)
+    stats["num_completed"] = sum(counts["completed"] for counts in by_priority)
+    stats["num_overdue"] = sum(counts["overdue"] for counts in by_priority)
+    stats["num_tasks"] = stats["num_open"] + stats["num_completed"]
+
+
+def _counter_key(generation, *names):
+    return ":".join((CACHE_KEY, str(generation), *names))
+
+
+def _counter_keys(meta):
+    keys = {
+        (priority, bucket): _counter_key(meta["generation"], priority, bucket)
+        for priority in meta["priorities"]
+        for bucket in ("open", "completed", "overdue")
+    }
+    keys.update({name: _counter_key(meta["generation"], name) for name in ("num_teams", "num_projects")})
+    return keys
+
+
+def refresh():
+    stats = compute_stats()
+    meta = {
+        "date": stats["date"],
+        "computed_at": stats["computed_at"],
+        "generation": time.time_ns(),
+        "priorities": list(stats["by_priority"]),
+    }
+    counters = {
+        key: stats["by_priority"][name[0]][name[1]] if isinstance(name, tuple) else stats[name]
+        for name, key in _counter_keys(meta).items()
+    }
+    # The counters first: a reader that finds the meta finds them too.
+    cache.set_many(counters, _timeout())
+    cache.set(CACHE_KEY, meta, _timeout())
+    return stats
+
+
+def _assemble(meta, counts):
+    """
+    Rebuilds the stats from the cached counters, or None if one of them
+    expired or was dropped.
+    """
+    keys = _counter_keys(meta)
+    if meta["date"] != timezone.now().date().isoformat() or not all(key in counts for key in keys.values()):
+        return None
+    stats = {
+        "date": meta["date"],
+        "computed_at": meta["computed_at"],
+        "by_priority": {priority: {} for priority in meta["priorities"]},
+    }
+    for name, key in keys.items():
+        if isinstance(name, tuple):
+            stats["by_priority"][name[0]][name[1]] = counts[key]
+        else:
+            stats[name] = counts[key]
+    _update_totals(stats)
+    return stats
+
+
+def get_stats():
+    meta = cache.get(CACHE_KEY)
+    stats = _assemble(meta, cache.get_many(_counter_keys(meta).values())) if meta else None
+    # Overdue counts go stale at midnight.
+    return stats if stats is not None else refresh()
+
+
+async def aget_stats():
+    meta = await cache.aget(CACHE_KEY)
+    stats = _assemble(meta, await cache.aget_many(_counter_keys(meta).values())) if meta else None
+    return stats if stats is not None else await sync_to_async(refresh)()
+
+
+def invalidate():
+    """
+    Drops the stats once the current transaction commits, so a read in
+    between can not cache them from the uncommitted rows' old state.
+    """
+    transaction.on_commit(lambda: cache.delete(CACHE_KEY))
+
+
+def _apply(deltas):
+    """
+    Adds ``deltas`` ({counter name: delta}) to the cached counters once
+    the current transaction commits. A counter that is gone drops the
+    stats, the next read recomputes them.
+    """
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+
+    def apply():
+        meta = cache.get(CACHE_KEY)
+        if meta is None:
+            return
+        keys = _counter_keys(meta)
+        try:
+            for name, delta in deltas.items():
+                if name not in keys:
+                    raise ValueError(name)
+                cache.incr(keys[name], delta)
+        except ValueError:
+            invalidate()
+
+    if deltas:
+        transaction.on_commit(apply)
+
+
+def task_state(priority, is_completed, deadline):
+    """
+    Returns the (priority, bucket, overdue) a task counts towards.
+    """
+    deadline = Task._meta.get_field("deadline").to_python(deadline)
+    overdue = not is_completed and deadline is not None and deadline < timezone.now().date()
+    return priority, "completed" if is_completed else "open", overdue
+
+
+def apply_task_change(old=None, new=None):
+    """
+    Moves one task from the ``old`` to the ``new`` task_state() in the
+    cached stats. None stands for a task that did not exist.
+    """
+    if old == new:
+        return
+    deltas = Counter()
+    for state, delta in ((old, -1), (new, 1)):
+        if state is None:
+            continue
+        priority, bucket, overdue = state
+        deltas[priority, bucket] += delta
+        deltas[priority, "overdue"] += delta if overdue else 0
+    _apply(deltas)
+
+
+def apply_count_change(key, delta):
+    _apply({key: delta})
@@ -0,0 +1,165 @@
+"""
+Faceted filtering of the task list.
+
+Values selected within a facet are OR-ed, facets are AND-ed. The counts
+of a facet are computed with every active filter except its own, so
+they show what picking another value would give, with one grouped
+query per facet. Counts are cached under the filter signature plus the
+collection versions of the counted models (see tasks.caching), so any
+task change makes every cached count unreachable.
+"""
+import hashlib
+import json
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from tasks import caching
+from tasks.models import Project, Tag, Task, TaskPriority, TaskType, Worker
+
+# Values shown for the facets that can have many (projects, tags...)
+FACET_LIMIT = 20
+
+DEADLINE_RANGES = {
+    "overdue": ("Overdue", lambda today: Q(is_completed=False, deadline__lt=today)),
+    "today": ("Due today", lambda today: Q(deadline=today)),
+    "week": ("Due within 7 days", lambda today: Q(deadline__gt=today, deadline__lte=today + timedelta(days=7))),
+    "later": ("Due later", lambda today: Q(deadline__gt=today + timedelta(days=7))),
+    "none": ("No deadline", lambda today: Q(deadline__isnull=True)),
+}
+
+COMPLETION = {"open": "Open", "completed": "Completed"}
+# Rows written around the form validation (imports, raw SQL) may hold other values.
+PRIORITY_LABELS = dict(TaskPriority.choices)
+
+# facet: label, in display order
+FACETS = {
+    "completion": "Status",
+    "priority": "Priority",
+    "deadline": "Deadline",
+    "task_type": "Type",
+    "project": "Project",
+    "tag": "Tag",
+    "assignee": "Assignee",
+}
+
+COUNTED_MODELS = [Task, TaskType, Project, Tag, Worker]
+
+
+def _through_tasks(relation, pks):
+    field = Task._meta.get_field(relation)
+    through = field.remote_field.through
+    return Q(pk__in=through.objects.filter(
+        **{f"{field.m2m_reverse_field_name()}__in": pks}
+    ).values("task_id"))
+
+
+def facet_filters(data, today):
+    """
+    Returns {facet: Q} for the facets with values selected in ``data``
+    (cleaned TaskFacetForm data).
+    """
+    builders = {
+        "completion": lambda values: Q(is_completed__in=[value == "completed" for value in values]),
+        "priority": lambda values: Q(priority__in=values),
+        "deadline": lambda values: reduce(or_, (DEADLINE_RANGES[value][1](today) for value in values)),
+        "task_type": lambda values: Q(task_type__in=values),
+        "project": lambda values: Q(project__in=values),
+        "tag": lambda values: _through_tasks("tags", values),
+        "assignee": lambda values: _through_tasks("assignees", values),
+    }
+    return {name: build(data[name]) for name, build in builders.items() if data.get(name)}
+
+
+def apply(queryset, filters, exclude=None):
+    for name, condition in filters.items():
+        if name != exclude:
+            queryset = queryset.filter(condition)
+    return queryset
+
+
+def _group(queryset, field, label=None, limit=None):
+    fields = [field, label] if label else [field]
+    rows = (
+        queryset.order_by().filter(**{f"{field}__isnull": False})
+        .values(*fields).annotate(count=Count("pk")).order_by("-count", field)
+    )
+    if limit:
+        rows = rows[:limit]
+    return [(row[field], row[label] if label else row[field], row["count"]) for row in rows]
+
+
+def _group_m2m(queryset, relation, label):
+    field = Task._meta.get_field(relation)
+    target = field.m2m_reverse_field_name()
+    rows = (
+        field.remote_field.through.objects.filter(task_id__in=queryset.values("pk"))
+        .values(target, f"{target}__{label}")
+        .annotate(count=Count("task_id"))
+        .order_by("-count", target)[:FACET_LIMIT]
+    )
+    return [(row[target], row[f"{target}__{label}"], row["count"]) for row in rows]
+
+
+def _count_deadlines(queryset, today):
+    counts = queryset.aggregate(**{
+        name: Count("pk", filter=build(today)) for name, (_, build) in DEADLINE_RANGES.items()
+    })
+    return [(name, DEADLINE_RANGES[name][0], counts[name]) for name in DEADLINE_RANGES if counts[name]]
+
+
+def compute_counts(queryset, filters, today):
+    """
+    Returns {facet: [(value, label, count)]}, one query per facet.
+    """
+    if queryset.query.annotations:
+        # Ranked search results, group over plain rows instead.
+        queryset = Task.objects.filter(pk__in=queryset.order_by().values("pk"))
+    counters = {
+        "completion": lambda tasks: [
+            ("completed" if value else "open", COMPLETION["completed" if value else "open"], count)
+            for value, _, count in _group(tasks, "is_completed")
+        ],
+        "priority": lambda tasks: [
+            (value, PRIORITY_LABELS.get(value, value), count) for value, _, count in _group(tasks, "priority")
+        ],
+        "deadline": lambda tasks: _count_deadlines(tasks, today),
+        "task_type": lambda tasks: _group(tasks, "task_type", "task_type__name", FACET_LIMIT),
+        "project": lambda tasks: _group(tasks, "project", "project__name", FACET_LIMIT),
+        "tag": lambda tasks: _group_m2m(tasks, "tags", "name"),
+        "assignee": lambda tasks: _group_m2m(tasks, "assignees", "username"),
+    }
+    return {name: count(apply(queryset, filters, exclude=name)) for name, count in counters.items()}
+
+
+def signature(data):
+    normalized = {
+        name: sorted(map(str, value)) if isinstance(value, list) else value
+        for name, value in data.items()
+        if value not in (None, "", [], False)
+    }
+    return json.dumps(normalized, sort_keys=True, default=str)
+
+
+def get_counts(queryset, data, search=None):
+    """
+    Cached compute_counts() for the tasks of ``queryset`` (the task list
+    before facet filters) with the facets selected in ``data``.
+    ``search`` holds whatever else narrowed ``queryset`` down, it is
+    part of the cache key.
+    """
+    # Deadlines are days in the site's time zone, not UTC.
+    today = timezone.localdate()
+    versions = caching.get_versions([caching.collection_key(model) for model in COUNTED_MODELS])
+    parts = [signature(data), signature(search or {}), today.isoformat(), *map(str, versions)]
+    key = f"facets:{hashlib.md5(':'.join(parts).encode()).hexdigest()}"
+    counts = cache.get(key)
+    if counts is None:
+        counts = compute_counts(queryset, facet_filters(data, today), today)
+        cache.set(key, counts, getattr(settings, "FACET_CACHE_TIMEOUT", 600))
+    return counts
@@ -0,0 +1,137 @@
+"""
+Per-worker activity feed, fanned out on read.
+
+A worker follows the tasks assigned to them and every task of the
+projects of their teams. That subscription set takes two queries and
+is cached under the versions of the worker row and of the team and
+project collections (see tasks.caching), which the signal handlers drop
+on assignment, membership and project changes.
+
+The events of the followed tasks are read as time-ordered streams off
+the (task, created_at) and (project, created_at) indexes of TaskEvent,
+and the streams are merged newest first with heapq.merge. Each stream
+reads at most one page past the cursor, and all the streams of a kind
+(tasks, projects) are read with one query, as a bounded subquery per
+stream where the database allows it. A page costs the same number of
+queries however many tasks, teams or projects the worker follows.
+
+Pages are addressed by a (created_at, id) cursor of the last event shown.
+"""
+import heapq
+from itertools import groupby
+from operator import itemgetter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Q
+from django.http import Http404
+from django.utils.dateparse import parse_datetime
+
+from tasks import caching, pagination
+from tasks.models import Project, Task, TaskEvent, Team, Worker
+
+# Above this many tasks/projects their events are read with one IN query
+# instead of one index range scan per task/project.
+MAX_SUBQUERY_STREAMS = 50
+
+
+def subscriptions(worker):
+    """
+    Returns ``{"tasks": [ids], "projects": [ids]}`` followed by ``worker``.
+    """
+    versions = caching.get_versions([
+        caching.object_key(Worker, worker.pk),
+        caching.collection_key(Team),
+        caching.collection_key(Project),
+    ])
+    key = f"feed-subscriptions:{worker.pk}:" + ":".join(map(str, versions))
+    subscribed = cache.get(key)
+    if subscribed is None:
+        subscribed = {
+            "tasks": list(
+                Task.assignees.through.objects.filter(worker_id=worker.pk)
+                .order_by("task_id")
+                .values_list("task_id", flat=True)
+            ),
+            "projects": list(
+                Project.objects.filter(team__workers=worker).order_by("pk").values_list("pk", flat=True)
+            ),
+        }
+        cache.set(key, subscribed, getattr(settings, "FEED_SUBSCRIPTION_TIMEOUT", 3600))
+    return subscribed
+
+
+def _after(cursor):
+    created_at, pk = cursor
+    return Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk)
+
+
+def _streams(field, ids, cursor, limit):
+    """
+    The newest ``limit`` (created_at, id) pairs of the events of each of
+    ``ids`` (``field`` is "task" or "project"), as newest first streams.
+    """
+    if not ids:
+        return []
+    events = TaskEvent.objects.all()
+    if cursor is not None:
+        events = events.filter(_after(cursor))
+    events = events.order_by("-created_at", "-pk")
+
+    if connection.features.allow_sliced_subqueries_with_in and len(ids) <= MAX_SUBQUERY_STREAMS:
+        newest = Q()
+        for pk in ids:
+            newest |= Q(pk__in=events.filter(**{f"{field}_id": pk}).values("pk")[:limit])
+        rows = sorted(TaskEvent.objects.filter(newest).values_list(f"{field}_id", "created_at", "pk"), reverse=True)
+        return [[row[1:] for row in stream] for _, stream in groupby(rows, key=itemgetter(0))]
+
+    return [list(events.filter(**{f"{field}_id__in": ids}).values_list("created_at", "pk")[:limit])]
+
+
+def merge(streams, limit):
+    """
+    Merges newest first (created_at, id) streams into the newest
+    ``limit`` distinct pairs.
+    """
+    merged = []
+    for row in heapq.merge(*streams, reverse=True):
+        if merged and merged[-1] == row:
+            # An assigned task of a followed project is in two streams.
+            continue
+        merged.append(row)
+        if len(merged) == limit:
+            break
+    return merged
+
+
+def encode_cursor(event):
+    return pagination.encode_cursor(pagination.NEXT, event.created_at.isoformat(), event.pk)
+
+
+def decode_cursor(cursor):
+    direction, value, pk = pagination.decode_cursor(cursor)
+    created_at = parse_datetime(value) if isinstance(value, str) else None
+    if direction != pagination.NEXT or created_at is None or not isinstance(pk, int):
+        raise Http404("Invalid cursor")
+    return created_at, pk
+
+
+def page(worker, cursor=None, limit=None):
+    """
+    Returns the events of the feed of ``worker`` older than ``cursor``
+    (newest first) and the cursor of the next page, or None.
+    """
+    limit = limit or getattr(settings, "FEED_PAGE_SIZE", 30)
+    after = decode_cursor(cursor) if cursor else None
+    subscribed = subscriptions(worker)
+    streams = [
+        *_streams("task", subscribed["tasks"], after, limit + 1),
+        *_streams("project", subscribed["projects"], after, limit + 1),
+    ]
+    rows = merge(streams, limit + 1)
+
+    by_pk = TaskEvent.objects.select_related("actor").in_bulk([pk for _, pk in rows[:limit]])
+    events = [by_pk[pk] for _, pk in rows[:limit] if pk in by_pk]
+    next_cursor = encode_cursor(events[-1]) if len(rows) > limit and events else None
+    return events, next_cursor
@@ -3,19 +3,21 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import UserCreationForm
 from django.utils import timezone
 
-from tasks.models import Task, Position, Worker, Tag
+from tasks.facets import COMPLETION, DEADLINE_RANGES
+from tasks.models import Task, TaskPriority, Position, Project, Worker, Tag
+from tasks.widgets import AutocompleteSelect, AutocompleteSelectMultiple
 
 
 class TaskForm(forms.ModelForm):
     assignees = forms.ModelMultipleChoiceField(
         queryset=get_user_model().objects.all(),
-        widget=forms.CheckboxSelectMultiple,
+        widget=AutocompleteSelectMultiple("tasks:worker-autocomplete"),
         required=False,
     )
 
     tags = forms.ModelMultipleChoiceField(
         queryset=Tag.objects.all(),
-        widget=forms.CheckboxSelectMultiple,
+        widget=AutocompleteSelectMultiple("tasks:tag-autocomplete"),
         required=False,
     )
 
@@ -25,6 +27,7 @@ class TaskForm(forms.ModelForm):
         widgets = {
             "deadline": forms.DateInput(
                 attrs={"type": "date"}),
+            "project": AutocompleteSelect("tasks:project-autocomplete"),
         }
 
     def clean_deadline(self):
@@ -37,6 +40,74 @@ def validate_deadline(deadline):
     return deadline
 
 
+class IdListField(forms.Field):
+    widget = forms.MultipleHiddenInput
+
+    def to_python(self, value):
+        try:
+            return [int(pk) for pk in value or ()]
+        except (TypeError, ValueError):
+            raise forms.ValidationError("Enter a list of ids")
+
+
+class TaskBulkActionForm(forms.Form):
+    """
+    An action applied to the selected tasks, or with ``select_all`` to
+    every task matching the task list filters in the query string.
+    """
+    # action: (label, fields the action requires)
+    ACTIONS = {
+        "complete": ("Mark complete", ()),
+        "reopen": ("Reopen", ()),
+        "set_priority": ("Change priority", ("priority",)),
+        "move_to_project": ("Move to project", ()),
+        "add_tags": ("Add tags", ("tags",)),
+        "remove_tags": ("Remove tags", ("tags",)),
+        "add_assignees": ("Add assignees", ("assignees",)),
+        "remove_assignees": ("Remove assignees", ("assignees",)),
+    }
+
+    action = forms.ChoiceField(choices=[(name, label) for name, (label, _) in ACTIONS.items()])
+    tasks = IdListField(required=False)
+    select_all = forms.BooleanField(required=False, label="All matching tasks")
+    priority = forms.ChoiceField(choices=[("", "---------")] + TaskPriority.choices, required=False)
+    project = forms.ModelChoiceField(
+        queryset=Project.objects.all(),
+        required=False,
+        empty_label="No project",
+        widget=AutocompleteSelect("tasks:project-autocomplete"),
+    )
+    tags = forms.ModelMultipleChoiceField(
+        queryset=Tag.objects.all(),
+        required=False,
+        widget=AutocompleteSelectMultiple("tasks:tag-autocomplete"),
+    )
+    assignees = forms.ModelMultipleChoiceField(
+        queryset=get_user_model().objects.all(),
+        required=False,
+        widget=AutocompleteSelectMultiple("tasks:worker-autocomplete"),
+    )
+    in_background = forms.BooleanField(
+        required=False,
+        label="Run in the background",
+        help_text="For large selections: queue the action as a job and follow its progress.",
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if not cleaned_data.get("tasks") and not cleaned_data.get("select_all"):
+            raise forms.ValidationError("Select at least one task")
+        _, required = self.ACTIONS.get(cleaned_data.get("action"), (None, ()))
+        for name in required:
+            if not cleaned_data.get(name):
+                self.add_error(name, "This field is required for the selected action")
+        return cleaned_data
+
+
+class TaskExportJobForm(forms.Form):
+    format = forms.ChoiceField(choices=[("csv", "CSV"), ("jsonl", "NDJSON")])
+
+
 class WorkerCreationForm(UserCreationForm):
     class Meta(UserCreationForm.Meta):
         model = Worker
@@ -49,7 +120,7 @@ class WorkerCreationForm(UserCreationForm):
 
     position = forms.ModelChoiceField(
         queryset=Position.objects.all(),
-        widget=forms.RadioSelect
+        widget=AutocompleteSelect("tasks:position-autocomplete"),
     )
 
 
@@ -65,6 +136,38 @@ class TaskSearchForm(forms.Form):
             "placeholder": "Search by name",
         })
     )
+    full_text = forms.BooleanField(
+        required=False,
+        label="Also search descriptions, tags, projects and assignees",
+    )
+
+
+class TaskFacetForm(forms.Form):
+    """
+    Facet filters of the task list, see tasks.facets. Values repeat in
+    the query string (?tag=1&tag=2).
+    """
+    completion = forms.MultipleChoiceField(choices=COMPLETION.items(), required=False)
+    priority = forms.MultipleChoiceField(choices=TaskPriority.choices, required=False)
+    deadline = forms.MultipleChoiceField(
+        choices=[(name, label) for name, (label, _) in DEADLINE_RANGES.items()],
+        required=False,
+    )
+    task_type = IdListField(required=False)
+    project = IdListField(required=False)
+    tag = IdListField(required=False)
+    assignee = IdListField(required=False)
+
+
+class OverdueTaskFilterForm(forms.Form):
+    due_within = forms.IntegerField(
+        min_value=0,
+        required=False,
+        label="",
+        widget=forms.NumberInput(attrs={
+            "placeholder": "Or due within days",
+        })
+    )
 
 
 class WorkerSearchForm(forms.Form):
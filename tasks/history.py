@@ -0,0 +1,316 @@
+"""
+Task change history as an append-only event log.
+
+Each change to a task adds one TaskEvent holding only what changed:
+``{"field": [old, new]}`` for columns and ``{"tags": {"add": [ids],
+"remove": [ids]}}`` for the many to many fields. Creations and
+compaction snapshots hold the whole state instead, with the many to
+many fields as id lists. The handlers in tasks.signals write the events
+inside the saving transaction; tasks.bulk and the importer, which skip
+the signals, write theirs in bulk.
+
+Inside grouped() (task form saves) the tag/assignee changes that follow
+a save of the task are merged into the event of the save.
+
+Event ids only grow and compaction keeps the id of the last event it
+folds, so a task's timeline is an index range scan on (task, id).
+compact() bounds the log: events older than the retention period are
+folded into one snapshot per task, and the events of tasks deleted
+before it are dropped.
+"""
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.db.models import Count, Q
+
+from tasks.models import Project, Tag, Task, TaskEvent, TaskEventKind, TaskPriority, TaskType, Worker
+
+FIELDS = ("name", "description", "deadline", "is_completed", "priority", "task_type", "project")
+M2M_FIELDS = ("tags", "assignees")
+
+# field: (model, field shown instead of the stored id)
+RELATED_NAMES = {
+    "task_type": (TaskType, "name"),
+    "project": (Project, "name"),
+    "tags": (Tag, "name"),
+    "assignees": (Worker, "username"),
+}
+
+_actor = ContextVar("task_history_actor", default=None)
+_group = ContextVar("task_history_group", default=None)
+
+
+def set_actor(user):
+    """
+    Attributes the events written in the current context to ``user``,
+    which may be a lazy request.user. Returns a token for reset_actor().
+    """
+    # Wrapped, asgiref compares context values and would evaluate the
+    # lazy user on every sync/async switch.
+    return _actor.set(lambda: user)
+
+
+def reset_actor(token):
+    _actor.reset(token)
+
+
+def actor_id():
+    get_user = _actor.get()
+    user = get_user() if get_user else None
+    if user is None or not user.is_authenticated:
+        return None
+    return user.pk
+
+
+@contextmanager
+def grouped():
+    """
+    Merges the link changes of a task made in the block into the event
+    of its last save in the block. Use inside the saving transaction.
+    """
+    token = _group.set({})
+    try:
+        yield
+    finally:
+        _group.reset(token)
+
+
+def _attname(field):
+    return Task._meta.get_field(field).attname
+
+
+def state_of(task, related=None):
+    state = {field: getattr(task, _attname(field)) for field in FIELDS}
+    for field in M2M_FIELDS:
+        state[field] = sorted((related or {}).get(field, ()))
+    return state
+
+
+def _event(task_id, kind, changes, project_id):
+    return TaskEvent(task_id=task_id, project_id=project_id, kind=kind, changes=changes, actor_id=actor_id())
+
+
+def _write(task, kind, changes):
+    event = _event(task.pk, kind, changes, task.project_id)
+    event.save()
+    group = _group.get()
+    if group is not None:
+        group[task.pk] = event
+    return event
+
+
+def record_saved(task, created, previous=None):
+    if created:
+        return _write(task, TaskEventKind.CREATED, state_of(task))
+    if previous is None:
+        return None
+    changes = {}
+    for field in FIELDS:
+        old, new = previous.get(field), getattr(task, _attname(field))
+        if field in previous and old != new:
+            changes[field] = [old, new]
+    if changes:
+        return _write(task, TaskEventKind.UPDATED, changes)
+    return None
+
+
+def record_deleted(tasks):
+    TaskEvent.objects.bulk_create([_event(task.pk, TaskEventKind.DELETED, {}, task.project_id) for task in tasks])
+
+
+def record_created(tasks, related=None):
+    """
+    CREATED events for tasks inserted with bulk_create. ``related`` maps
+    task ids to ``{"tags": [ids], "assignees": [ids]}``.
+    """
+    related = related or {}
+    TaskEvent.objects.bulk_create(
+        [
+            _event(task.pk, TaskEventKind.CREATED, state_of(task, related.get(task.pk)), task.project_id)
+            for task in tasks
+        ],
+        batch_size=1000,
+    )
+
+
+def record_updated(rows, field, new):
+    """
+    Events for a bulk UPDATE of ``field`` to ``new``. ``rows`` holds
+    (task id, old value, project id after the update) triples.
+    """
+    TaskEvent.objects.bulk_create(
+        [
+            _event(task_id, TaskEventKind.UPDATED, {field: [old, new]}, project_id)
+            for task_id, old, project_id in rows
+            if old != new
+        ],
+        batch_size=1000,
+    )
+
+
+def _merge_links(changes, field, added, removed):
+    if field in changes and isinstance(changes[field], list):
+        # A creation or snapshot: the field holds the full id list.
+        changes[field] = sorted((set(changes[field]) | added) - removed)
+        return
+    diff = changes.get(field, {})
+    add = (set(diff.get("add", ())) - removed) | (added - set(diff.get("remove", ())))
+    remove = (set(diff.get("remove", ())) - added) | (removed - set(diff.get("add", ())))
+    diff = {key: sorted(ids) for key, ids in (("add", add), ("remove", remove)) if ids}
+    if diff:
+        changes[field] = diff
+    else:
+        changes.pop(field, None)
+
+
+def record_links(field, links, added, projects=None):
+    """
+    Events for tags/assignees links added (``added``) or removed.
+    ``links`` holds (task id, target id) pairs, ``projects`` maps the
+    task ids to their project ids and is loaded when not given.
+    """
+    by_task = defaultdict(set)
+    for task_id, target_id in links:
+        by_task[task_id].add(target_id)
+    if projects is None and by_task:
+        projects = dict(Task.objects.filter(pk__in=by_task).values_list("pk", "project_id"))
+
+    group = _group.get() or {}
+    events = []
+    for task_id, ids in by_task.items():
+        pending = group.get(task_id)
+        changes = pending.changes if pending is not None else {}
+        _merge_links(changes, field, ids if added else set(), set() if added else ids)
+        if pending is not None:
+            TaskEvent.objects.filter(pk=pending.pk).update(changes=changes)
+        else:
+            events.append(_event(task_id, TaskEventKind.UPDATED, changes, projects.get(task_id)))
+    TaskEvent.objects.bulk_create(events, batch_size=1000)
+
+
+def timeline(task_id, before=None, limit=50):
+    """
+    The newest ``limit`` events of a task, older than event id ``before``.
+    """
+    events = TaskEvent.objects.filter(task_id=task_id).select_related("actor")
+    if before is not None:
+        events = events.filter(pk__lt=before)
+    return list(events.order_by("-pk")[:limit])
+
+
+def describe(events):
+    """
+    Returns ``(event, changes)`` pairs for display, where each change is
+    a dict with the field label and the old/new values or the added and
+    removed names. Related names are loaded with one query per model.
+    """
+    ids = defaultdict(set)
+    for event in events:
+        for field, change in event.changes.items():
+            if field not in RELATED_NAMES:
+                continue
+            if isinstance(change, dict):
+                ids[field].update(change.get("add", ()), change.get("remove", ()))
+            elif field in M2M_FIELDS and event.kind != TaskEventKind.UPDATED:
+                ids[field].update(change)
+            else:
+                ids[field].update(change if event.kind == TaskEventKind.UPDATED else [change])
+    names = {}
+    for field, pks in ids.items():
+        model, name_field = RELATED_NAMES[field]
+        names[field] = dict(model.objects.filter(pk__in=pks - {None}).values_list("pk", name_field))
+
+    def display(field, value):
+        if value is None or value == "":
+            return "-"
+        if isinstance(value, bool):
+            return "Yes" if value else "No"
+        if field in names:
+            return names[field].get(value, f"#{value} (deleted)")
+        if field == "priority" and value in TaskPriority.values:
+            return TaskPriority(value).label
+        return value
+
+    described = []
+    for event in events:
+        changes = []
+        for field, change in event.changes.items():
+            label = Task._meta.get_field(field).verbose_name.capitalize()
+            if isinstance(change, dict):
+                changes.append({
+                    "field": label,
+                    "added": [display(field, pk) for pk in change.get("add", ())],
+                    "removed": [display(field, pk) for pk in change.get("remove", ())],
+                })
+            elif event.kind != TaskEventKind.UPDATED and field in M2M_FIELDS:
+                changes.append({"field": label, "new": ", ".join(str(display(field, pk)) for pk in change) or "-"})
+            elif event.kind != TaskEventKind.UPDATED:
+                changes.append({"field": label, "new": display(field, change)})
+            else:
+                changes.append({"field": label, "old": display(field, change[0]), "new": display(field, change[1])})
+        described.append((event, changes))
+    return described
+
+
+def apply(state, event):
+    """
+    Returns the task state after ``event``. ``state`` may be partial when
+    the history of a task does not start with its creation.
+    """
+    if event.kind in (TaskEventKind.CREATED, TaskEventKind.SNAPSHOT):
+        return dict(event.changes)
+    state = dict(state)
+    for field, change in event.changes.items():
+        if isinstance(change, list):
+            state[field] = change[1]
+        else:
+            ids = (set(state.get(field, ())) | set(change.get("add", ()))) - set(change.get("remove", ()))
+            state[field] = sorted(ids)
+    return state
+
+
+def fold(events):
+    """
+    Folds events (oldest first) into a state, see apply().
+    """
+    state = {}
+    for event in events:
+        state = apply(state, event)
+    return state
+
+
+def compact(cutoff, chunk_size=500):
+    """
+    Folds the events created before ``cutoff`` into one snapshot per
+    task, in place of the newest of them, and removes every event of
+    tasks deleted before ``cutoff``. Returns (snapshots written, events
+    removed).
+    """
+    old = TaskEvent.objects.filter(created_at__lt=cutoff)
+    task_ids = list(
+        old.values("task_id")
+        .annotate(count=Count("pk"), deleted=Count("pk", filter=Q(kind=TaskEventKind.DELETED)))
+        .filter(Q(count__gt=1) | Q(deleted__gt=0))
+        .order_by("task_id")
+        .values_list("task_id", flat=True)
+    )
+    snapshots = removed = 0
+    for start in range(0, len(task_ids), chunk_size):
+        chunk = task_ids[start:start + chunk_size]
+        by_task = defaultdict(list)
+        for event in old.filter(task_id__in=chunk).order_by("task_id", "pk"):
+            by_task[event.task_id].append(event)
+        with transaction.atomic():
+            kept = []
+            for events in by_task.values():
+                last = events[-1]
+                if last.kind != TaskEventKind.DELETED:
+                    TaskEvent.objects.filter(pk=last.pk).update(
+                        kind=TaskEventKind.SNAPSHOT, changes=fold(events), actor=None
+                    )
+                    kept.append(last.pk)
+            snapshots += len(kept)
+            removed += old.filter(task_id__in=chunk).exclude(pk__in=kept).delete()[0]
+    return snapshots, removed
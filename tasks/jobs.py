@@ -0,0 +1,237 @@
+"""
+Database-backed background jobs.
+
+enqueue() stores a Job row naming a function registered with @register.
+``manage.py run_worker`` claims queued rows with SELECT ... FOR UPDATE
+SKIP LOCKED, so any number of workers can poll the same table without
+handing a job out twice, and runs them in a process pool. A failed job
+is queued again after an exponential backoff until it has used
+``max_attempts``; a job whose worker died is treated the same once it
+has been running for JOB_TIMEOUT seconds.
+"""
+import traceback
+import uuid
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.http import QueryDict
+from django.utils import timezone
+
+from tasks import bulk, counters, dashboard, history, rollups, search
+from tasks.models import Job, JobStatus, Project, Tag, Task, Worker
+from tasks.task_io import export_lines, iter_task_records
+
+JOBS = {}
+
+
+def register(name):
+    """
+    Registers ``func(job, **args)`` as the job called ``name``. The
+    return value must be JSON serializable and is stored as the result.
+    """
+    def decorator(func):
+        JOBS[name] = func
+        return func
+    return decorator
+
+
+def enqueue(name, args=None, created_by=None, max_attempts=3, run_after=None):
+    if name not in JOBS:
+        raise KeyError(f"Unknown job {name!r}")
+    return Job.objects.create(
+        name=name,
+        args=args or {},
+        created_by=created_by,
+        max_attempts=max_attempts,
+        run_after=run_after or timezone.now(),
+    )
+
+
+def claim(limit=1, worker_id=None):
+    """
+    Marks up to ``limit`` due jobs as running and returns them, oldest
+    first. Rows locked by another worker's claim are skipped.
+    """
+    worker_id = worker_id or uuid.uuid4().hex
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=JobStatus.QUEUED, run_after__lte=now)
+            .order_by("run_after", "pk")
+            .values_list("pk", flat=True)[:limit]
+        )
+        if not ids:
+            return []
+        # The status filter keeps backends without row locks (SQLite,
+        # which serializes writers instead) from claiming a job twice.
+        Job.objects.filter(pk__in=ids, status=JobStatus.QUEUED).update(
+            status=JobStatus.RUNNING,
+            locked_by=worker_id,
+            started_at=now,
+            attempts=F("attempts") + 1,
+        )
+    return list(
+        Job.objects.filter(pk__in=ids, locked_by=worker_id, status=JobStatus.RUNNING).order_by("run_after", "pk")
+    )
+
+
+def backoff(attempt):
+    base = getattr(settings, "JOB_RETRY_BACKOFF", 10)
+    return timedelta(seconds=min(base * 2 ** (attempt - 1), getattr(settings, "JOB_RETRY_MAX_BACKOFF", 3600)))
+
+
+def _retry_or_fail(jobs, error):
+    now = timezone.now()
+    for job in jobs:
+        changes = {"error": error, "locked_by": ""}
+        if job.attempts < job.max_attempts:
+            changes.update(status=JobStatus.QUEUED, run_after=now + backoff(job.attempts))
+        else:
+            changes.update(status=JobStatus.FAILED, finished_at=now)
+        Job.objects.filter(pk=job.pk, status=JobStatus.RUNNING, locked_by=job.locked_by).update(**changes)
+
+
+def execute(job_id):
+    """
+    Runs one claimed job and records its outcome. Called in the worker
+    processes of run_worker.
+    """
+    close_old_connections()
+    job = Job.objects.select_related("created_by").get(pk=job_id)
+    token = history.set_actor(job.created_by)
+    try:
+        result = JOBS[job.name](job, **job.args)
+    except Exception:
+        _retry_or_fail([job], traceback.format_exc())
+        return JobStatus.FAILED
+    finally:
+        history.reset_actor(token)
+    # requeue_stale() may have handed a slow job to another worker, or
+    # back to this one (a new started_at).
+    Job.objects.filter(
+        pk=job.pk, status=JobStatus.RUNNING, locked_by=job.locked_by, started_at=job.started_at
+    ).update(
+        status=JobStatus.SUCCEEDED,
+        result=result,
+        progress=100,
+        error="",
+        locked_by="",
+        finished_at=timezone.now(),
+    )
+    return JobStatus.SUCCEEDED
+
+
+def run_pending():
+    """
+    Runs the due jobs one by one in this process, without a worker.
+    Returns how many ran.
+    """
+    count = 0
+    while claimed := claim():
+        execute(claimed[0].pk)
+        count += 1
+    return count
+
+
+def requeue_stale():
+    """
+    Retries (or fails) jobs that have been running for longer than
+    JOB_TIMEOUT seconds, i.e. whose worker most likely died.
+    """
+    cutoff = timezone.now() - timedelta(seconds=getattr(settings, "JOB_TIMEOUT", 3600))
+    stale = list(Job.objects.filter(status=JobStatus.RUNNING, started_at__lt=cutoff))
+    _retry_or_fail(stale, "Timed out, the worker running the job stopped responding")
+    return len(stale)
+
+
+def set_progress(job, done, total, message=""):
+    percent = min(99, int(100 * done / total)) if total else 0
+    Job.objects.filter(pk=job.pk).update(progress=percent, progress_message=message[:255])
+
+
+def output_path(job, suffix):
+    directory = Path(getattr(settings, "JOB_OUTPUT_DIR", "job_output"))
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory / f"job-{job.pk}.{suffix}"
+
+
+def _select_tasks(task_ids=None, query=None):
+    if task_ids is not None:
+        return Task.objects.filter(pk__in=task_ids)
+    from tasks.views import filter_tasks
+
+    return filter_tasks(Task.objects.all(), QueryDict(query or ""))
+
+
+@register("noop")
+def noop(job, **args):
+    return args
+
+
+@register("recount")
+def recount_job(job):
+    with transaction.atomic():
+        counters.recount()
+    rollups.rebuild()
+    counters.invalidate_counted()
+    dashboard.invalidate()
+    return None
+
+
+@register("rebuild_search_index")
+def rebuild_search_index_job(job):
+    search.reindex_tasks()
+    return None
+
+
+@register("bulk_action")
+def bulk_action_job(job, action, task_ids=None, query=None, priority=None, project=None,
+                    tags=(), assignees=()):
+    """
+    A TaskBulkActionForm action, on ``task_ids`` or on every task
+    matching the task list ``query`` string.
+    """
+    data = {
+        "priority": priority,
+        "project": Project.objects.filter(pk=project).first() if project else None,
+        "tags": list(Tag.objects.filter(pk__in=tags)),
+        "assignees": list(Worker.objects.filter(pk__in=assignees)),
+    }
+    return {"affected": bulk.run(action, _select_tasks(task_ids, query), data)}
+
+
+def enqueue_bulk_action(action, data, task_ids=None, query=None, created_by=None):
+    """
+    Queues a bulk_action job for the cleaned data of a TaskBulkActionForm.
+    """
+    return enqueue("bulk_action", {
+        "action": action,
+        "task_ids": task_ids,
+        "query": query,
+        "priority": data.get("priority") or None,
+        "project": data["project"].pk if data.get("project") else None,
+        "tags": [tag.pk for tag in data.get("tags", ())],
+        "assignees": [worker.pk for worker in data.get("assignees", ())],
+    }, created_by=created_by)
+
+
+@register("export_tasks")
+def export_tasks_job(job, format="csv", query=""):
+    queryset = _select_tasks(query=query).order_by("pk")
+    total = queryset.count()
+    path = output_path(job, format)
+
+    def records():
+        for done, record in enumerate(iter_task_records(queryset), start=1):
+            if done % 2000 == 0:
+                set_progress(job, done, total, f"{done} of {total} tasks")
+            yield record
+
+    with open(path, "w", encoding="utf-8", newline="") as output:
+        for line in export_lines(records(), format):
+            output.write(line)
+    return {"path": str(path), "count": total, "format": format}
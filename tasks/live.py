@@ -0,0 +1,302 @@
+"""
+Live task updates pushed to the task pages as server-sent events.
+
+task_manager.asgi routes LIVE_UPDATES_PATH to live_updates(), a plain
+ASGI app outside the Django request stack, so an open connection only
+costs a coroutine and a small buffer. The task list subscribes to every
+task ("?" without parameters), a task page to its own task ("?task=<id>").
+
+Every server process has one Hub, an in-process pub/sub. A single pump
+reads the change messages from the broker and offers them to the
+subscriptions of the topics they touch. Each subscription buffers at
+most LIVE_QUEUE_SIZE messages. The pump never waits for a connection:
+when a client reads slower than tasks change, its backlog is dropped and
+it gets one "resync" event, after which the page reloads instead of
+replaying what it missed. Memory per connection stays bounded however
+slow the client is.
+
+The broker is the LIVE_BROKER class. EventLogBroker, the default, needs
+no external service: it polls the task history (tasks.history) for
+events newer than the last one it read, so it sees the changes made by
+every process, including bulk actions and background jobs, with one
+query per LIVE_POLL_INTERVAL per server process. A broker for an
+external pub/sub service only has to implement ``listen()``, an async
+iterator of messages.
+"""
+import asyncio
+import json
+import logging
+from collections import defaultdict, deque
+from importlib import import_module
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import auth
+from django.db import close_old_connections
+from django.http import HttpRequest, QueryDict, parse_cookie
+from django.utils.module_loading import import_string
+
+from tasks.models import TaskEvent, TaskEventKind
+
+logger = logging.getLogger(__name__)
+
+ALL_TASKS = "tasks"
+KINDS = {
+    TaskEventKind.CREATED: "created",
+    TaskEventKind.UPDATED: "updated",
+    TaskEventKind.DELETED: "deleted",
+}
+
+# Subscription.get() results besides messages.
+HEARTBEAT = "heartbeat"
+RESYNC = "resync"
+CLOSED = "closed"
+
+
+def topics_of(message):
+    return (ALL_TASKS, f"task:{message['task']}")
+
+
+class Subscription:
+    def __init__(self, topics, maxsize):
+        self.topics = topics
+        self.maxsize = maxsize
+        self.messages = deque()
+        self.ready = asyncio.Event()
+        self.overflowed = False
+        self.closed = False
+
+    def offer(self, message):
+        """
+        Buffers ``message`` without waiting. A full buffer is dropped and
+        the subscriber resyncs, see get(). Returns False if ``message``
+        was dropped.
+        """
+        if self.overflowed or self.closed:
+            return False
+        if len(self.messages) >= self.maxsize:
+            self.messages.clear()
+            self.overflowed = True
+        else:
+            self.messages.append(message)
+        self.ready.set()
+        return not self.overflowed
+
+    def close(self):
+        self.closed = True
+        self.ready.set()
+
+    async def get(self, timeout):
+        """
+        The next message, RESYNC after an overflow, HEARTBEAT when nothing
+        arrived within ``timeout`` seconds or CLOSED.
+        """
+        if not (self.messages or self.overflowed or self.closed):
+            self.ready.clear()
+            try:
+                async with asyncio.timeout(timeout):
+                    await self.ready.wait()
+            except TimeoutError:
+                return HEARTBEAT
+        if self.closed:
+            return CLOSED
+        if self.overflowed:
+            self.overflowed = False
+            return RESYNC
+        return self.messages.popleft()
+
+
+class Hub:
+    def __init__(self, broker, queue_size=100):
+        self.broker = broker
+        self.queue_size = queue_size
+        self.subscriptions = defaultdict(set)
+        self.connections = 0
+        self.dropped = 0
+        self.pump = None
+
+    def subscribe(self, topics):
+        subscription = Subscription(topics, self.queue_size)
+        for topic in topics:
+            self.subscriptions[topic].add(subscription)
+        self.connections += 1
+        if self.pump is None or self.pump.done():
+            self.pump = asyncio.get_running_loop().create_task(self.run())
+        return subscription
+
+    def unsubscribe(self, subscription):
+        subscription.close()
+        for topic in subscription.topics:
+            subscribers = self.subscriptions.get(topic)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self.subscriptions[topic]
+        self.connections -= 1
+        if not self.connections and self.pump is not None:
+            self.pump.cancel()
+            self.pump = None
+
+    def publish(self, message):
+        for topic in topics_of(message):
+            for subscription in list(self.subscriptions.get(topic, ())):
+                if not subscription.offer(message):
+                    self.dropped += 1
+
+    async def run(self):
+        """
+        Pumps the broker's messages to the subscriptions until the last
+        one is gone. A failing broker is restarted after a pause.
+        """
+        while True:
+            try:
+                async for message in self.broker.listen():
+                    self.publish(message)
+            except Exception:
+                logger.exception("Live updates broker failed")
+                await asyncio.sleep(getattr(settings, "LIVE_POLL_INTERVAL", 1.0))
+
+
+class EventLogBroker:
+    """
+    Reads the changes from the TaskEvent log, see the module docstring.
+    Events whose transaction commits after a later event was read are
+    not seen, which costs a missed notice, not a wrong page.
+    """
+    batch_size = 500
+
+    def __init__(self, interval=None):
+        self.interval = interval if interval is not None else getattr(settings, "LIVE_POLL_INTERVAL", 1.0)
+
+    def latest(self):
+        return TaskEvent.objects.order_by("-pk").values_list("pk", flat=True).first() or 0
+
+    def read(self, after):
+        """
+        Messages for the events after event id ``after``, oldest first.
+        """
+        # The pump runs outside the request cycle, whose signals would
+        # otherwise replace a connection that broke (e.g. a database
+        # restart) or outlived CONN_MAX_AGE.
+        close_old_connections()
+        rows = (
+            TaskEvent.objects.filter(pk__gt=after, kind__in=KINDS)
+            .order_by("pk")
+            .values_list("pk", "task_id", "kind", "project_id", "actor_id")[:self.batch_size]
+        )
+        return [
+            {"id": pk, "task": task_id, "kind": KINDS[kind], "project": project_id, "actor": actor_id}
+            for pk, task_id, kind, project_id, actor_id in rows
+        ]
+
+    async def listen(self):
+        last = await sync_to_async(self.latest)()
+        while True:
+            messages = await sync_to_async(self.read)(last)
+            for message in messages:
+                yield message
+            if messages:
+                last = messages[-1]["id"]
+            if len(messages) < self.batch_size:
+                await asyncio.sleep(self.interval)
+
+
+_hub = None
+
+
+def get_hub():
+    global _hub
+    if _hub is None:
+        broker = import_string(getattr(settings, "LIVE_BROKER", "tasks.live.EventLogBroker"))()
+        _hub = Hub(broker, getattr(settings, "LIVE_QUEUE_SIZE", 100))
+    return _hub
+
+
+def encode(message):
+    if message is HEARTBEAT:
+        return b": heartbeat\n\n"
+    if message is RESYNC:
+        return b"event: resync\ndata: {}\n\n"
+    return f"id: {message['id']}\nevent: task\ndata: {json.dumps(message)}\n\n".encode()
+
+
+async def get_user(scope):
+    headers = dict(scope.get("headers", ()))
+    cookies = parse_cookie(headers.get(b"cookie", b"").decode("latin-1"))
+    request = HttpRequest()
+    engine = import_module(settings.SESSION_ENGINE)
+    request.session = engine.SessionStore(cookies.get(settings.SESSION_COOKIE_NAME))
+    user = await auth.aget_user(request)
+    return user if user.is_authenticated else None
+
+
+async def respond(send, status, body=b"", headers=()):
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"text/plain; charset=utf-8"), *headers],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def watch_disconnect(receive, subscription):
+    while (await receive())["type"] != "http.disconnect":
+        pass
+    subscription.close()
+
+
+async def live_updates(scope, receive, send):
+    """
+    The server-sent events endpoint, an ASGI app.
+    """
+    if scope["method"] != "GET":
+        return await respond(send, 405, b"Method not allowed", [(b"allow", b"GET")])
+    if await get_user(scope) is None:
+        return await respond(send, 403, b"Log in to receive live updates")
+    task = QueryDict(scope.get("query_string", b"")).get("task")
+    if task is not None and not task.isdigit():
+        return await respond(send, 400, b"Invalid task")
+
+    hub = get_hub()
+    if hub.connections >= getattr(settings, "LIVE_MAX_CONNECTIONS", 20000):
+        return await respond(send, 503, b"Too many live connections", [(b"retry-after", b"30")])
+
+    subscription = hub.subscribe((f"task:{task}",) if task else (ALL_TASKS,))
+    watcher = asyncio.create_task(watch_disconnect(receive, subscription))
+    heartbeat = getattr(settings, "LIVE_HEARTBEAT", 15)
+    try:
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/event-stream"),
+                (b"cache-control", b"no-cache"),
+                # Keep proxies (nginx) from buffering the stream.
+                (b"x-accel-buffering", b"no"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": b"retry: 5000\n\n", "more_body": True})
+        while (message := await subscription.get(heartbeat)) is not CLOSED:
+            await send({"type": "http.response.body", "body": encode(message), "more_body": True})
+    finally:
+        watcher.cancel()
+        hub.unsubscribe(subscription)
+
+
+class LiveUpdatesRouter:
+    """
+    Serves LIVE_UPDATES_PATH with live_updates() and everything else with
+    the Django application.
+    """
+
+    def __init__(self, application):
+        self.application = application
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] == "http"
+            and getattr(settings, "LIVE_UPDATES", False)
+            and scope["path"] == settings.LIVE_UPDATES_PATH
+        ):
+            return await live_updates(scope, receive, send)
+        return await self.application(scope, receive, send)
@@ -0,0 +1,63 @@
+import json
+import os
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from tasks.benchmarks import load, serve, session_cookie
+from tasks.management.commands.benchmark_servers import DEFAULT_URLS, get_paths
+
+# Environment for task_manager.settings.prod per connection setup.
+SETUPS = {
+    "per-request": {"DB_POOL": "False", "DB_CONN_MAX_AGE": "0"},
+    "persistent": {"DB_POOL": "False", "DB_CONN_MAX_AGE": "600", "DB_CONN_HEALTH_CHECKS": "True"},
+    "pool": {"DB_POOL": "True", "DB_CONN_HEALTH_CHECKS": "True"},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Starts gunicorn once per database connection setup (a new connection "
+        "per request, persistent connections, the psycopg pool), fires the "
+        "same concurrent requests at each and prints latency as JSON. Run it "
+        "with task_manager.settings.prod against a local PostgreSQL filled by "
+        "generate_fixtures."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--setups", nargs="*", default=list(SETUPS), choices=list(SETUPS))
+        parser.add_argument("--workers", type=int, default=2)
+        parser.add_argument("--threads", type=int, default=4)
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--port", type=int, default=8766)
+        parser.add_argument("--urls", nargs="*", default=DEFAULT_URLS, metavar="URL_NAME")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Connection setups only differ on PostgreSQL, use the prod settings.")
+        paths = get_paths(options["urls"])
+        cookie = session_cookie()
+        command = [
+            sys.executable, "-m", "gunicorn", "task_manager.wsgi",
+            "--workers", str(options["workers"]),
+            "--threads", str(options["threads"]),
+            "--bind", f"127.0.0.1:{options['port']}",
+        ]
+        results = {}
+        for name in options["setups"]:
+            env = {**SETUPS[name], "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "")}
+            self.stderr.write(f"Starting gunicorn with {name} connections")
+            with serve(command, env, options["port"]):
+                load(options["port"], paths, cookie, options["concurrency"], 50)
+                results[name] = load(
+                    options["port"], paths, cookie, options["concurrency"], options["requests"]
+                )
+            self.stderr.write(f"{name}: p50 {results[name]['p50_ms']} ms")
+        self.stdout.write(json.dumps(
+            {"options": {key: options[key] for key in ("workers", "threads", "concurrency", "requests")},
+             "paths": paths,
+             "results": results},
+            indent=2,
+        ))
@@ -0,0 +1,78 @@
+import json
+import threading
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+
+from tasks import jobs
+from tasks.models import Job, JobStatus
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures the job queue: enqueues noop jobs one by one, then drains "
+        "them with concurrent claimers that claim a batch, execute and mark "
+        "each job done, and prints the throughput as JSON. Fails if a job "
+        "was handed out twice. The benchmark jobs are deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--jobs", type=int, default=2000)
+        parser.add_argument("--claimers", type=int, default=4)
+        parser.add_argument("--batch", type=int, default=10, help="Jobs claimed per query.")
+
+    def handle(self, *args, **options):
+        if Job.objects.filter(status=JobStatus.QUEUED).exists():
+            raise CommandError("The claimers would run the queued jobs, benchmark an empty queue.")
+        marker = uuid.uuid4().hex
+        try:
+            started = time.perf_counter()
+            for index in range(options["jobs"]):
+                jobs.enqueue("noop", {"benchmark": marker, "index": index})
+            enqueue_seconds = time.perf_counter() - started
+
+            claims, errors = [], []
+            lock = threading.Lock()
+            threads = [
+                threading.Thread(target=self.drain, args=(options["batch"], claims, errors, lock))
+                for _ in range(options["claimers"])
+            ]
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            dequeue_seconds = time.perf_counter() - started
+
+            benchmark_jobs = Job.objects.filter(args__benchmark=marker)
+            succeeded = benchmark_jobs.filter(status=JobStatus.SUCCEEDED, attempts=1).count()
+        finally:
+            Job.objects.filter(args__benchmark=marker).delete()
+
+        if errors:
+            raise CommandError(f"{len(errors)} claimers failed: {errors[0]!r}")
+        if len(claims) != len(set(claims)) or succeeded != options["jobs"]:
+            raise CommandError(
+                f"{len(claims) - len(set(claims))} jobs claimed twice, "
+                f"{options['jobs'] - succeeded} jobs not run exactly once"
+            )
+        self.stdout.write(json.dumps({
+            "vendor": connection.vendor,
+            "options": {key: options[key] for key in ("jobs", "claimers", "batch")},
+            "enqueue_per_second": round(options["jobs"] / enqueue_seconds),
+            "dequeue_per_second": round(options["jobs"] / dequeue_seconds),
+        }, indent=2))
+
+    def drain(self, batch, claims, errors, lock):
+        try:
+            while claimed := jobs.claim(batch):
+                for job in claimed:
+                    jobs.execute(job.pk)
+                with lock:
+                    claims.extend(job.pk for job in claimed)
+        except Exception as error:
+            errors.append(error)
+        finally:
+            connections.close_all()
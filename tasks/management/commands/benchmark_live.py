@@ -0,0 +1,161 @@
+import asyncio
+import json
+import os
+import resource
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from tasks.benchmarks import percentile, serve, session_cookie
+from tasks.models import Task, TaskPriority
+
+
+def rss_kb(pid):
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def cpu_seconds(pid):
+    with open(f"/proc/{pid}/stat") as stat:
+        fields = stat.read().rsplit(")", 1)[1].split()
+    # utime and stime, in clock ticks.
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+class Command(BaseCommand):
+    help = (
+        "Starts the project under uvicorn with LIVE_UPDATES on, opens many "
+        "concurrent server-sent event connections to the task list stream, "
+        "keeps them idle, then changes a task and measures how long the "
+        "notice takes to reach every connection. Prints connect times, the "
+        "server's memory and CPU while idle and the fan-out latency as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--connections", type=int, default=10000)
+        parser.add_argument("--connect-concurrency", type=int, default=200,
+                            help="Connections being opened at the same time.")
+        parser.add_argument("--idle", type=float, default=10.0,
+                            help="Seconds to hold the connections idle before the change.")
+        parser.add_argument("--port", type=int, default=8766)
+
+    def handle(self, *args, **options):
+        task = Task.objects.order_by("pk").first()
+        if task is None:
+            raise CommandError("No task to change, run generate_fixtures first.")
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if hard != resource.RLIM_INFINITY and hard < options["connections"] + 100:
+            raise CommandError(f"The open file limit ({hard}) is too low for {options['connections']} connections.")
+        # The server inherits the raised limit.
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+        cookie = session_cookie()
+        connections.close_all()
+        command = [
+            sys.executable, "-m", "uvicorn", "task_manager.asgi:application",
+            "--port", str(options["port"]), "--log-level", "warning", "--backlog", "4096",
+        ]
+        env = {"LIVE_UPDATES": "True", "LIVE_MAX_CONNECTIONS": str(options["connections"] + 100)}
+        self.stderr.write(f"Starting {' '.join(command)}")
+        with serve(command, env, options["port"]) as server:
+            results = asyncio.run(self.run(server.pid, task, cookie, options))
+        self.stdout.write(json.dumps(
+            {"options": {key: options[key] for key in ("connections", "connect_concurrency", "idle")},
+             **results},
+            indent=2,
+        ))
+
+    async def run(self, pid, task, cookie, options):
+        request = (
+            f"GET {settings.LIVE_UPDATES_PATH} HTTP/1.1\r\nHost: 127.0.0.1\r\n"
+            f"Cookie: {cookie}\r\nAccept: text/event-stream\r\n\r\n"
+        ).encode()
+        gate = asyncio.Semaphore(options["connect_concurrency"])
+        connect_ms, errors, streams = [], [], []
+
+        async def connect():
+            async with gate:
+                started = time.perf_counter()
+                try:
+                    reader, writer = await asyncio.open_connection("127.0.0.1", options["port"])
+                    writer.write(request)
+                    headers = await reader.readuntil(b"\r\n\r\n")
+                    if b" 200 " not in headers.split(b"\r\n", 1)[0]:
+                        raise ConnectionError(headers.split(b"\r\n", 1)[0].decode())
+                    await reader.readuntil(b"retry:")
+                except (OSError, asyncio.IncompleteReadError, ConnectionError) as error:
+                    errors.append(repr(error))
+                    return
+                connect_ms.append((time.perf_counter() - started) * 1000)
+                streams.append((reader, writer))
+
+        idle_rss = rss_kb(pid)
+        started = time.perf_counter()
+        await asyncio.gather(*(connect() for _ in range(options["connections"])))
+        connect_seconds = time.perf_counter() - started
+        if not streams:
+            raise CommandError(f"No connection succeeded: {errors[:3]}")
+        self.stderr.write(f"{len(streams)} connections open in {connect_seconds:.1f}s, holding them idle")
+
+        received = []
+
+        async def wait_for_change(reader):
+            try:
+                await reader.readuntil(b"event: task")
+            except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                return
+            received.append(time.perf_counter())
+
+        waiters = [asyncio.create_task(wait_for_change(reader)) for reader, _ in streams]
+        cpu_before = cpu_seconds(pid)
+        await asyncio.sleep(options["idle"])
+        idle_cpu = (cpu_seconds(pid) - cpu_before) / options["idle"]
+        connected_rss = rss_kb(pid)
+
+        previous = task.priority
+        changed = TaskPriority.LOW if previous != TaskPriority.LOW else TaskPriority.HIGH
+        await asyncio.to_thread(self.set_priority, task.pk, changed)
+        changed_at = time.perf_counter()
+        try:
+            await asyncio.wait(waiters, timeout=30)
+        finally:
+            await asyncio.to_thread(self.set_priority, task.pk, previous)
+        latencies = [(at - changed_at) * 1000 for at in received]
+
+        for waiter in waiters:
+            waiter.cancel()
+        for _, writer in streams:
+            writer.close()
+
+        return {
+            "connected": len(streams),
+            "connect_errors": len(errors),
+            "connect_seconds": round(connect_seconds, 2),
+            "connect_p50_ms": round(percentile(connect_ms, 50), 2),
+            "connect_p95_ms": round(percentile(connect_ms, 95), 2),
+            "server_rss_mb": {
+                "before": round(idle_rss / 1024, 1),
+                "connected": round(connected_rss / 1024, 1),
+                "per_connection_kb": round((connected_rss - idle_rss) / len(streams), 1),
+            },
+            "server_idle_cpu_percent": round(idle_cpu * 100, 1),
+            "delivered": len(received),
+            # Includes up to LIVE_POLL_INTERVAL of broker polling delay.
+            "fanout_p50_ms": round(percentile(latencies, 50), 1) if latencies else None,
+            "fanout_p95_ms": round(percentile(latencies, 95), 1) if latencies else None,
+            "fanout_max_ms": round(max(latencies), 1) if latencies else None,
+        }
+
+    def set_priority(self, task_id, priority):
+        try:
+            task = Task.objects.get(pk=task_id)
+            task.priority = priority
+            task.save()
+        finally:
+            connections.close_all()
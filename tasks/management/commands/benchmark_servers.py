@@ -0,0 +1,76 @@
+import json
+import os
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from tasks.benchmarks import load, serve, session_cookie
+from tasks.models import Task
+
+DEFAULT_URLS = ["index", "task-list", "task-detail", "worker-detail"]
+
+
+def server_commands(workers, port):
+    address = f"127.0.0.1:{port}"
+    return {
+        "wsgi": (
+            [sys.executable, "-m", "gunicorn", "task_manager.wsgi",
+             "--workers", str(workers), "--bind", address],
+            {"ASYNC_VIEWS": "False"},
+        ),
+        "asgi": (
+            [sys.executable, "-m", "uvicorn", "task_manager.asgi:application",
+             "--workers", str(workers), "--port", str(port), "--log-level", "warning"],
+            {"ASYNC_VIEWS": "True"},
+        ),
+    }
+
+
+def get_paths(names):
+    worker = get_user_model().objects.order_by("pk").first()
+    task = Task.objects.order_by("pk").first()
+    if worker is None or task is None:
+        raise CommandError("No data to request, run generate_fixtures first.")
+    kwargs = {"task-detail": {"pk": task.pk}, "worker-detail": {"pk": worker.pk}}
+    return [reverse(f"tasks:{name}", kwargs=kwargs.get(name)) for name in names]
+
+
+class Command(BaseCommand):
+    help = (
+        "Starts the project under gunicorn sync workers and under uvicorn "
+        "(with ASYNC_VIEWS on), fires the same concurrent requests at both and "
+        "prints throughput and latency as JSON. Run it with production-like "
+        "settings (DEBUG off) and data from generate_fixtures."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--servers", nargs="*", default=["wsgi", "asgi"], choices=["wsgi", "asgi"])
+        parser.add_argument("--workers", type=int, default=2)
+        parser.add_argument("--concurrency", type=int, default=32)
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--urls", nargs="*", default=DEFAULT_URLS, metavar="URL_NAME")
+
+    def handle(self, *args, **options):
+        paths = get_paths(options["urls"])
+        cookie = session_cookie()
+        commands = server_commands(options["workers"], options["port"])
+        results = {}
+        for name in options["servers"]:
+            command, env = commands[name]
+            self.stderr.write(f"Starting {name}: {' '.join(command)}")
+            env["DJANGO_SETTINGS_MODULE"] = os.environ.get("DJANGO_SETTINGS_MODULE", "")
+            with serve(command, env, options["port"]):
+                load(options["port"], paths, cookie, options["concurrency"], 50)
+                results[name] = load(
+                    options["port"], paths, cookie, options["concurrency"], options["requests"]
+                )
+            self.stderr.write(f"{name}: {results[name]['requests_per_second']} requests/s")
+        self.stdout.write(json.dumps(
+            {"options": {key: options[key] for key in ("workers", "concurrency", "requests")},
+             "paths": paths,
+             "results": results},
+            indent=2,
+        ))
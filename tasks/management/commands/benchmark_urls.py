@@ -0,0 +1,62 @@
+import json
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+
+from tasks import benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        "Requests every page in tasks.urls through the test client and prints "
+        "p50/p95 latency, queries, database time and peak memory per page as "
+        "JSON, so runs on different commits can be diffed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=10)
+        parser.add_argument("--warmup", type=int, default=1)
+        parser.add_argument("--user", help="Username to log in as. Defaults to the first superuser.")
+        parser.add_argument(
+            "--exclude",
+            nargs="*",
+            default=[],
+            metavar="URL_NAME",
+            help="Url names to skip, e.g. task-export on large datasets.",
+        )
+        parser.add_argument("--output", help="Write the JSON here instead of stdout.")
+
+    def handle(self, *args, **options):
+        workers = get_user_model().objects.order_by("-is_superuser", "pk")
+        if options["user"]:
+            workers = workers.filter(username=options["user"])
+        user = workers.first()
+        if user is None:
+            raise CommandError("No user to log in as, run generate_fixtures first.")
+
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            # A non internal address keeps the debug toolbar out of the numbers.
+            client = Client(REMOTE_ADDR="192.0.2.1")
+            client.force_login(user)
+            results = benchmarks.run(
+                client,
+                repeat=options["repeat"],
+                warmup=options["warmup"],
+                exclude=options["exclude"],
+                progress=lambda name, result: self.stderr.write(
+                    f"{name}: p50 {result['p50_ms']} ms, {result['queries']} queries"
+                ),
+            )
+
+        report = json.dumps(
+            {"user": user.username, "repeat": options["repeat"], "results": results},
+            indent=2,
+        )
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                output.write(report + "\n")
+        else:
+            self.stdout.write(report)
@@ -0,0 +1,31 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from tasks import history
+
+
+class Command(BaseCommand):
+    help = (
+        "Folds task history events older than the retention period into one "
+        "snapshot per task and drops the history of tasks deleted before it. "
+        "Meant to run daily."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.TASK_HISTORY_RETENTION_DAYS,
+            help="Keep every event of the last DAYS days.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=500, help="Tasks compacted per transaction.")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["days"])
+        snapshots, removed = history.compact(cutoff, options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {snapshots} snapshots and removed {removed} events older than {cutoff:%Y-%m-%d %H:%M}"
+        ))
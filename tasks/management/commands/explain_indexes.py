@@ -0,0 +1,94 @@
+import random
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from tasks.models import Project, Task, TaskPriority, TaskType, Team
+from tasks.synthetic import create_tasks
+
+
+def hot_queries(project):
+    """
+    The task query shapes the indexes on Task are meant to serve.
+    """
+    return [
+        ("open tasks by name", Task.objects.filter(is_completed=False).order_by("name")[:25]),
+        ("overdue tasks", Task.objects.overdue()[:25]),
+        ("due within 7 days", Task.objects.due_within(7)[:25]),
+        (
+            "urgent tasks by deadline",
+            Task.objects.filter(priority=TaskPriority.URGENT, deadline__isnull=False)
+            .order_by("deadline")[:25],
+        ),
+        ("open tasks of a project", Task.objects.filter(project=project, is_completed=False)),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates tasks inside a transaction that is rolled back afterwards "
+        "and prints EXPLAIN plans and timings of the hot task queries without "
+        "and with the indexes declared on Task. It drops the indexes of the "
+        "live tasks table, which locks the table (ACCESS EXCLUSIVE on "
+        "PostgreSQL) until the run ends and blocks every request that touches "
+        "tasks, so it refuses to run unless DEBUG is on or "
+        "--i-know-this-locks-tasks is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tasks", type=int, default=1_000_000)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--i-know-this-locks-tasks", action="store_true", dest="locks_tasks",
+                            help="Run without DEBUG, e.g. against a copy of production.")
+
+    def handle(self, *args, **options):
+        if not (settings.DEBUG or options["locks_tasks"]):
+            raise CommandError(
+                "explain_indexes locks the tasks table for the whole run. Use a "
+                "development database or pass --i-know-this-locks-tasks."
+            )
+        with transaction.atomic():
+            project = self.generate(options["tasks"], options["batch_size"], options["seed"])
+            queries = hot_queries(project)
+            editor = connection.schema_editor()
+            indexes = Task._meta.indexes
+
+            self.run_sql([f"DROP INDEX {connection.ops.quote_name(index.name)}" for index in indexes])
+            self.report("without indexes", queries)
+            self.run_sql([str(index.create_sql(Task, editor)) for index in indexes])
+            self.report("with indexes", queries)
+
+            transaction.set_rollback(True)
+
+    def run_sql(self, statements):
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+            cursor.execute(f"ANALYZE {connection.ops.quote_name(Task._meta.db_table)}")
+
+    def report(self, title, queries):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"== {title} =="))
+        for name, queryset in queries:
+            started = time.perf_counter()
+            list(queryset.all())
+            elapsed = (time.perf_counter() - started) * 1000
+            self.stdout.write(self.style.MIGRATE_LABEL(f"{name} ({elapsed:.1f} ms)"))
+            self.stdout.write(queryset.explain())
+            self.stdout.write("")
+
+    def generate(self, num_tasks, batch_size, seed):
+        rng = random.Random(seed)
+        task_types = TaskType.objects.bulk_create(
+            TaskType(name=f"bench type {i}") for i in range(20)
+        )
+        teams = Team.objects.bulk_create(Team(name=f"bench team {i}") for i in range(50))
+        projects = Project.objects.bulk_create(
+            Project(name=f"bench project {i}", team=rng.choice(teams)) for i in range(500)
+        )
+        started = time.monotonic()
+        create_tasks(num_tasks, task_types, projects, rng, prefix="bench", batch_size=batch_size)
+        self.stderr.write(f"Generated {num_tasks} tasks in {time.monotonic() - started:.1f}s")
+        return projects[0]
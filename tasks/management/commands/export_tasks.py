@@ -0,0 +1,43 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from tasks.models import Task
+from tasks.task_io import FORMATS, export_lines, iter_task_records
+
+
+class Command(BaseCommand):
+    help = "Streams all tasks to a JSONL or CSV file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Output file, or - for stdout.")
+        parser.add_argument("--format", choices=FORMATS, default="jsonl")
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        chunk_size = options["chunk_size"]
+        records = iter_task_records(Task.objects.order_by("pk"), chunk_size=chunk_size)
+
+        stream = sys.stdout if path == "-" else open(path, "w", newline="", encoding="utf-8")
+        started = time.monotonic()
+        try:
+            for line in export_lines(self.count(records), options["format"]):
+                stream.write(line)
+        finally:
+            if stream is not sys.stdout:
+                stream.close()
+
+        elapsed = time.monotonic() - started
+        self.stderr.write(self.style.SUCCESS(
+            f"Exported {self.exported} tasks in {elapsed:.1f}s"
+        ))
+
+    def count(self, records):
+        self.exported = 0
+        for record in records:
+            self.exported += 1
+            if self.exported % 10000 == 0:
+                self.stderr.write(f"{self.exported} tasks exported")
+            yield record
@@ -0,0 +1,42 @@
+from dataclasses import fields
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+
+from tasks.synthetic import Sizes, generate
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk inserts a synthetic graph of positions, workers, teams, projects, "
+        "task types, tags and tasks for load testing. Generated workers log in "
+        "with the password \"password\"."
+    )
+
+    def add_arguments(self, parser):
+        for field in fields(Sizes):
+            parser.add_argument(
+                f"--{field.name.replace('_', '-')}",
+                type=int,
+                default=field.default,
+                dest=field.name,
+            )
+        parser.add_argument("--prefix", default="gen", help="Prefix of every generated name.")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        sizes = Sizes(**{field.name: options[field.name] for field in fields(Sizes)})
+        try:
+            generate(
+                sizes,
+                prefix=options["prefix"],
+                seed=options["seed"],
+                batch_size=options["batch_size"],
+                progress=self.stderr.write,
+            )
+        except IntegrityError as error:
+            raise CommandError(f"{error}. Use another --prefix for a second run.")
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {sizes.workers} workers, {sizes.projects} projects and {sizes.tasks} tasks"
+        ))
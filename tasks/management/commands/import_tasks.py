@@ -0,0 +1,66 @@
+import sys
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks import caching, dashboard, rollups
+from tasks.counters import recount
+from tasks.task_io import FORMATS, TaskImporter, TaskImportError, read_records
+
+
+class Command(BaseCommand):
+    help = (
+        "Streams tasks from a JSONL or CSV file into the database in batches. "
+        "Tasks whose name already exists are skipped, so an interrupted "
+        "import can be rerun."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Input file, or - for stdin.")
+        parser.add_argument("--format", choices=FORMATS, help="Defaults to the file extension.")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--create-missing",
+            action="store_true",
+            help="Create unknown task types and tags instead of failing.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or path.rsplit(".", 1)[-1]
+        if fmt not in FORMATS:
+            raise CommandError("Can not guess the format, pass --format.")
+
+        importer = TaskImporter(
+            batch_size=options["batch_size"],
+            create_missing=options["create_missing"],
+        )
+        started = time.monotonic()
+
+        def progress(importer):
+            elapsed = time.monotonic() - started
+            self.stderr.write(
+                f"{importer.created} created, {importer.skipped} skipped "
+                f"({importer.created / elapsed:.0f} tasks/s)"
+            )
+
+        stream = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+        try:
+            importer.run(read_records(stream, fmt), progress=progress)
+        except (TaskImportError, KeyError, ValueError) as error:
+            raise CommandError(f"Import stopped after {importer.created} tasks: {error}")
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+            recount()
+            rollups.rebuild()
+            # The bulk inserts skip the signal handlers that drop the
+            # cached pages, facets and ETags.
+            for model in apps.get_app_config("tasks").get_models():
+                caching.invalidate(model)
+            dashboard.invalidate()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {importer.created} tasks, skipped {importer.skipped} existing"
+        ))
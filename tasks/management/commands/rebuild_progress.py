@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from tasks import caching, rollups
+from tasks.models import Project, Team
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the project and team progress rollups from the tasks. "
+        "Run it after midnight so overdue counts are current before the "
+        "first page view."
+    )
+
+    def handle(self, *args, **options):
+        rollups.rebuild()
+        caching.invalidate(Project)
+        caching.invalidate(Team)
+        self.stdout.write(self.style.SUCCESS("Progress rollups rebuilt"))
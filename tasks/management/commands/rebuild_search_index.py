@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from tasks.search import reindex_tasks
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the full-text search index for all tasks."
+
+    def handle(self, *args, **options):
+        reindex_tasks()
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt"))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from tasks import dashboard
+from tasks.counters import invalidate_counted, recount
+
+
+class Command(BaseCommand):
+    help = "Recomputes the denormalized counter columns from the database."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            recount()
+        invalidate_counted()
+        dashboard.invalidate()
+        self.stdout.write(self.style.SUCCESS("Counters recomputed"))
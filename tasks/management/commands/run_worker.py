@@ -0,0 +1,126 @@
+import multiprocessing
+import signal
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from tasks import jobs
+from tasks.models import JobStatus
+
+
+def ignore_signals():
+    # Stopping is up to the parent, which lets running jobs finish.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs queued background jobs in a pool of worker processes until "
+        "stopped with SIGINT/SIGTERM, which lets the running jobs finish."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=multiprocessing.cpu_count())
+        parser.add_argument("--poll-interval", type=float, default=1.0,
+                            help="Seconds to sleep when no job is due.")
+        parser.add_argument("--burst", action="store_true",
+                            help="Exit once the queue is empty instead of waiting for new jobs.")
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGTERM, self.stop)
+
+        processes = options["processes"]
+        worker_id = uuid.uuid4().hex[:12]
+        self.stderr.write(f"Worker {worker_id} started with {processes} processes")
+        running = {}
+        pool = self.start_pool(processes)
+        try:
+            while not self.stopping:
+                jobs.requeue_stale()
+                claimed = jobs.claim(processes - len(running), worker_id) if len(running) < processes else []
+                if claimed:
+                    connections.close_all()
+                lost = []
+                for job in claimed:
+                    try:
+                        running[pool.submit(jobs.execute, job.pk)] = job
+                    except BrokenProcessPool:
+                        lost.append(job)
+                    else:
+                        self.stderr.write(f"Started {job}")
+
+                if running:
+                    done, _ = wait(running, timeout=0 if claimed else options["poll_interval"],
+                                   return_when=FIRST_COMPLETED)
+                    lost += self.collect(running, done)
+                elif options["burst"] and not lost:
+                    break
+                elif not claimed:
+                    time.sleep(options["poll_interval"])
+                if lost:
+                    pool = self.replace_pool(pool, processes, running, lost)
+
+            lost = self.collect(running, wait(running).done)
+            if lost:
+                self.give_back(running, lost)
+        finally:
+            pool.shutdown(cancel_futures=True)
+        self.stderr.write(self.style.SUCCESS(f"Worker {worker_id} stopped"))
+
+    def start_pool(self, processes):
+        # Forked children start from the loaded Django project. The pool
+        # forks on the first submit, connections are closed before that so
+        # no database socket is shared with a child.
+        return ProcessPoolExecutor(
+            processes, mp_context=multiprocessing.get_context("fork"), initializer=ignore_signals
+        )
+
+    def collect(self, running, done):
+        """
+        Reports the finished futures in ``done`` and returns the jobs
+        whose pool broke under them.
+        """
+        lost = []
+        for future in done:
+            job = running.pop(future)
+            if isinstance(future.exception(), BrokenProcessPool):
+                lost.append(job)
+            else:
+                self.report(job, future)
+        return lost
+
+    def give_back(self, running, lost):
+        # A dead child takes the whole pool down with every job it held.
+        lost = [*lost, *running.values()]
+        running.clear()
+        self.stderr.write(self.style.ERROR(
+            f"A worker process died, giving back {', '.join(map(str, lost))}"
+        ))
+        jobs._retry_or_fail(lost, "The worker process running the job died")
+
+    def replace_pool(self, pool, processes, running, lost):
+        self.give_back(running, lost)
+        pool.shutdown(wait=False, cancel_futures=True)
+        return self.start_pool(processes)
+
+    def stop(self, signum, frame):
+        self.stderr.write("Stopping after the running jobs")
+        self.stopping = True
+
+    def report(self, job, future):
+        try:
+            status = future.result()
+        except Exception as exc:
+            # execute() records the job's own errors, this is the pool
+            # failing to run it; requeue_stale() retries it.
+            self.stderr.write(self.style.ERROR(f"{job} could not run in the worker process: {exc!r}"))
+        else:
+            style = self.style.SUCCESS if status == JobStatus.SUCCEEDED else self.style.WARNING
+            self.stderr.write(style(f"{job.name} #{job.pk} {status}"))
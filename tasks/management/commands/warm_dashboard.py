@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from tasks import dashboard
+
+
+class Command(BaseCommand):
+    help = "Computes the homepage statistics and stores them in the cache."
+
+    def handle(self, *args, **options):
+        stats = dashboard.refresh()
+        self.stdout.write(self.style.SUCCESS(
+            f"Dashboard cache warmed: {stats['num_tasks']} tasks, "
+            f"{stats['num_projects']} projects, {stats['num_teams']} teams"
+        ))
@@ -0,0 +1,305 @@
+import cProfile
+import logging
+import random
+import time
+from contextlib import AsyncExitStack, ExitStack, asynccontextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponseServerError
+
+from tasks import history, profiling, routers
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCounter:
+    """
+    Execute wrapper that counts queries and the time spent running them.
+    Works regardless of DEBUG, unlike connection.queries.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+    def track(self):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(self))
+        return stack
+
+    @asynccontextmanager
+    async def atrack(self):
+        # The async ORM runs queries on the request's sync thread, whose
+        # connection objects differ from the ones seen by the event loop.
+        stack = await sync_to_async(self.track)()
+        try:
+            yield self
+        finally:
+            await sync_to_async(stack.close)()
+
+
+def query_budget(max_queries):
+    """
+    Declares the query budget of a function based view.
+    Class based views set the ``query_budget`` attribute instead.
+    """
+    def decorator(view_func):
+        view_func.query_budget = max_queries
+        return view_func
+    return decorator
+
+
+def get_query_budget(view_func):
+    view_class = getattr(view_func, "view_class", None)
+    if view_class is not None:
+        return getattr(view_class, "query_budget", None)
+    return getattr(view_func, "query_budget", None)
+
+
+class QueryBudgetMiddleware:
+    """
+    Counts queries per request and compares them with the budget declared
+    on the resolved view. QUERY_BUDGET_MODE is one of "off", "log" or "reject".
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.mode = getattr(settings, "QUERY_BUDGET_MODE", "log")
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if self.mode == "off":
+            return self.get_response(request)
+
+        counter = QueryCounter()
+        request.query_budget = None
+        request.query_counter = counter
+        with counter.track():
+            response = self.get_response(request)
+        return self.check(request, counter, response)
+
+    async def __acall__(self, request):
+        if self.mode == "off":
+            return await self.get_response(request)
+
+        counter = QueryCounter()
+        request.query_budget = None
+        request.query_counter = counter
+        async with counter.atrack():
+            response = await self.get_response(request)
+        return self.check(request, counter, response)
+
+    def check(self, request, counter, response):
+        budget = request.query_budget
+        if budget is not None and counter.count > budget:
+            logger.warning(
+                "Query budget exceeded for %s: %s queries, budget %s",
+                request.path,
+                counter.count,
+                budget,
+            )
+            if self.mode == "reject":
+                return HttpResponseServerError("Query budget exceeded")
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = get_query_budget(view_func)
+
+
+class PrimaryPinningMiddleware:
+    """
+    Sends the reads of safe requests to the replicas, except for
+    REPLICA_PIN_SECONDS after the client wrote (tracked with a cookie),
+    so nobody reads their own change from a lagging replica. Does nothing
+    without DATABASE_REPLICAS.
+    """
+
+    sync_capable = True
+    async_capable = True
+    cookie_name = "pin_primary"
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not routers.replicas():
+            return self.get_response(request)
+
+        tokens = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            wrote = self.stop(tokens)
+        if wrote:
+            self.set_pin_cookie(response)
+        return response
+
+    async def __acall__(self, request):
+        if not routers.replicas():
+            return await self.get_response(request)
+
+        tokens = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            wrote = self.stop(tokens)
+        if wrote:
+            self.set_pin_cookie(response)
+        return response
+
+    def start(self, request):
+        replicas = None
+        if request.method in ("GET", "HEAD") and self.cookie_name not in request.COOKIES:
+            replicas = routers.read_from_replicas()
+        return replicas, routers.track_writes()
+
+    def stop(self, tokens):
+        replicas, tracking = tokens
+        wrote = routers.wrote()
+        routers.stop_tracking(tracking)
+        if replicas is not None:
+            routers.stop_reading_from_replicas(replicas)
+        return wrote
+
+    def set_pin_cookie(self, response):
+        response.set_cookie(
+            self.cookie_name,
+            "1",
+            max_age=getattr(settings, "REPLICA_PIN_SECONDS", 5),
+            httponly=True,
+            samesite="Lax",
+        )
+
+
+class TaskHistoryMiddleware:
+    """
+    Attributes the task history events written by a request to its user.
+    Must come after AuthenticationMiddleware; request.user stays lazy
+    until an event is written.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        token = history.set_actor(request.user)
+        try:
+            return self.get_response(request)
+        finally:
+            history.reset_actor(token)
+
+    async def __acall__(self, request):
+        token = history.set_actor(request.user)
+        try:
+            return await self.get_response(request)
+        finally:
+            history.reset_actor(token)
+
+
+class ProfilingMiddleware:
+    """
+    Records wall time, database time, query count and template render
+    time (see profiling.TimedDjangoTemplates) per resolved view in
+    tasks.profiling.metrics, and runs a
+    PROFILING_SAMPLE_RATE fraction of sync requests under cProfile.
+    Reuses the QueryBudgetMiddleware counter when that runs outside it.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, "PROFILING_ENABLED", True)
+        self.sample_rate = getattr(settings, "PROFILING_SAMPLE_RATE", 0.0)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+
+        request.template_duration = 0.0
+        counter = getattr(request, "query_counter", None)
+        with ExitStack() as stack:
+            if counter is None:
+                counter = QueryCounter()
+                stack.enter_context(counter.track())
+            queries, db = counter.count, counter.duration
+            profile = cProfile.Profile() if random.random() < self.sample_rate else None
+            started = time.perf_counter()
+            if profile is not None:
+                profile.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                if profile is not None:
+                    profile.disable()
+            wall = time.perf_counter() - started
+        if profile is not None:
+            profiling.dump_profile(profile, profiling.view_name(request))
+        return self.record(request, response, wall, counter.count - queries, counter.duration - db)
+
+    async def __acall__(self, request):
+        # cProfile follows one thread, which says little about a request
+        # spread over the event loop and sync_to_async threads.
+        if not self.enabled:
+            return await self.get_response(request)
+
+        request.template_duration = 0.0
+        counter = getattr(request, "query_counter", None)
+        async with AsyncExitStack() as stack:
+            if counter is None:
+                counter = QueryCounter()
+                await stack.enter_async_context(counter.atrack())
+            queries, db = counter.count, counter.duration
+            started = time.perf_counter()
+            response = await self.get_response(request)
+            wall = time.perf_counter() - started
+        return self.record(request, response, wall, counter.count - queries, counter.duration - db)
+
+    def record(self, request, response, wall, queries, db):
+        profiling.metrics.record(
+            profiling.view_name(request),
+            request.method,
+            response.status_code,
+            wall,
+            db,
+            queries,
+            request.template_duration,
+        )
+        return response
@@ -0,0 +1,70 @@
+from django.db import migrations
+
+# A frozen copy of the tasks.search schema and first indexing, so the
+# migration keeps working when that module changes.
+RELATED_TEXT_SQL = """
+    COALESCE((SELECT p.name FROM tasks_project p WHERE p.id = t.project_id), '')
+    || ' ' || COALESCE((
+        SELECT {aggregate}(g.name, ' ')
+        FROM tasks_tag g
+        JOIN tasks_task_tags tt ON tt.tag_id = g.id
+        WHERE tt.task_id = t.id
+    ), '')
+    || ' ' || COALESCE((
+        SELECT {aggregate}(w.username || ' ' || w.first_name || ' ' || w.last_name, ' ')
+        FROM tasks_worker w
+        JOIN tasks_task_assignees ta ON ta.worker_id = w.id
+        WHERE ta.task_id = t.id
+    ), '')
+"""
+
+INSTALL_SQL = {
+    "postgresql": [
+        "ALTER TABLE tasks_task ADD COLUMN search_vector tsvector",
+        "CREATE INDEX tasks_task_search_vector_idx ON tasks_task USING GIN (search_vector)",
+        f"""
+            UPDATE tasks_task t SET search_vector =
+                setweight(to_tsvector('english'::regconfig, t.name), 'A')
+                || setweight(to_tsvector('english'::regconfig, {RELATED_TEXT_SQL.format(aggregate="string_agg")}), 'B')
+                || setweight(to_tsvector('english'::regconfig, t.description), 'C')
+        """,
+    ],
+    "sqlite": [
+        "CREATE VIRTUAL TABLE tasks_task_fts "
+        "USING fts5(name, description, related, tokenize='porter unicode61')",
+        f"""
+            INSERT INTO tasks_task_fts (rowid, name, description, related)
+            SELECT t.id, t.name, t.description, {RELATED_TEXT_SQL.format(aggregate="group_concat")}
+            FROM tasks_task t
+        """,
+    ],
+}
+
+UNINSTALL_SQL = {
+    "postgresql": ["ALTER TABLE tasks_task DROP COLUMN search_vector"],
+    "sqlite": ["DROP TABLE IF EXISTS tasks_task_fts"],
+}
+
+
+def run(statements, schema_editor):
+    for sql in statements.get(schema_editor.connection.vendor, ()):
+        schema_editor.execute(sql)
+
+
+def install_search_index(apps, schema_editor):
+    run(INSTALL_SQL, schema_editor)
+
+
+def uninstall_search_index(apps, schema_editor):
+    run(UNINSTALL_SQL, schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0008_project_alter_position_name_alter_task_name_and_more"),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.12 on 2026-10-18 18:47
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+# A frozen copy of tasks.counters.recount(): (counted model, counter
+# field, counting model, field grouping its rows by the counted model).
+COUNTERS = [
+    ("Position", "num_workers", "Worker", "position"),
+    ("TaskType", "num_tasks", "Task", "task_type"),
+    ("Project", "num_tasks", "Task", "project"),
+    ("Team", "num_projects", "Project", "team"),
+    ("Tag", "num_tasks", "Task_tags", "tag"),
+    ("Team", "num_workers", "Team_workers", "team"),
+]
+
+
+def populate_counters(apps, schema_editor):
+    for target, field, source, group_by in COUNTERS:
+        rows = (
+            apps.get_model("tasks", source).objects.filter(**{group_by: OuterRef("pk")})
+            .order_by()
+            .values(group_by)
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        apps.get_model("tasks", target).objects.update(**{field: Coalesce(Subquery(rows), Value(0))})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0009_task_search_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="position",
+            name="num_workers",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="num_tasks",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="tag",
+            name="num_tasks",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="tasktype",
+            name="num_tasks",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="team",
+            name="num_projects",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="team",
+            name="num_workers",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.12 on 2026-10-18 18:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0010_counter_columns"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(fields=["is_completed", "deadline"], name="task_completed_deadline_idx"),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.12 on 2026-10-18 18:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0011_task_completed_deadline_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(fields=["priority", "deadline"], name="task_priority_deadline_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(fields=["project", "is_completed"], name="task_project_completed_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(condition=models.Q(("is_completed", False)), fields=["name"], name="task_open_name_idx"),
+        ),
+    ]
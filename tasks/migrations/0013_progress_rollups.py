@@ -0,0 +1,72 @@
+# Generated by Django 5.2.12 on 2026-10-18 19:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+
+
+def populate_rollups(apps, schema_editor):
+    # A frozen copy of tasks.rollups.rebuild().
+    Task = apps.get_model("tasks", "Task")
+    today = timezone.now().date()
+    for owner, group_by in (("Project", "project"), ("Team", "project__team")):
+        Progress = apps.get_model("tasks", f"{owner}Progress")
+        totals = {
+            row.pop(group_by): row
+            for row in Task.objects.filter(**{f"{group_by}__isnull": False})
+            .order_by()
+            .values(group_by)
+            .annotate(
+                num_tasks=Count("pk"),
+                num_completed=Count("pk", filter=Q(is_completed=True)),
+                num_overdue=Count("pk", filter=Q(is_completed=False, deadline__lt=today)),
+                next_deadline=Min("deadline", filter=Q(is_completed=False)),
+            )
+        }
+        Progress.objects.bulk_create(
+            [
+                Progress(**{f"{owner.lower()}_id": pk}, computed_on=today, **totals.get(pk, {}))
+                for pk in apps.get_model("tasks", owner).objects.values_list("pk", flat=True)
+            ],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0012_task_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProjectProgress",
+            fields=[
+                ("num_tasks", models.PositiveIntegerField(default=0)),
+                ("num_completed", models.PositiveIntegerField(default=0)),
+                ("num_overdue", models.PositiveIntegerField(default=0)),
+                ("next_deadline", models.DateField(blank=True, null=True)),
+                ("computed_on", models.DateField()),
+                ("project", models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name="progress", serialize=False, to="tasks.project")),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="TeamProgress",
+            fields=[
+                ("num_tasks", models.PositiveIntegerField(default=0)),
+                ("num_completed", models.PositiveIntegerField(default=0)),
+                ("num_overdue", models.PositiveIntegerField(default=0)),
+                ("next_deadline", models.DateField(blank=True, null=True)),
+                ("computed_on", models.DateField()),
+                ("team", models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name="progress", serialize=False, to="tasks.team")),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.12 on 2026-10-18 19:42
+
+from collections import defaultdict
+from itertools import islice
+
+import django.core.serializers.json
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+# A frozen copy of the task state recorded by tasks.history.
+FIELDS = ("name", "description", "deadline", "is_completed", "priority", "task_type_id", "project_id")
+M2M_FIELDS = (("tags", "tag_id"), ("assignees", "worker_id"))
+SNAPSHOT = 4
+
+
+def snapshot_tasks(apps, schema_editor, chunk_size=2000):
+    """
+    Starts the history of every task with a snapshot of its current state.
+    """
+    Task = apps.get_model("tasks", "Task")
+    TaskEvent = apps.get_model("tasks", "TaskEvent")
+    rows = Task.objects.order_by("pk").values("pk", *FIELDS).iterator(chunk_size)
+    while chunk := list(islice(rows, chunk_size)):
+        related = defaultdict(lambda: defaultdict(list))
+        for field, target in M2M_FIELDS:
+            through = Task._meta.get_field(field).remote_field.through
+            links = through.objects.filter(task_id__in=[row["pk"] for row in chunk])
+            for task_id, target_id in links.values_list("task_id", target):
+                related[task_id][field].append(target_id)
+        TaskEvent.objects.bulk_create([
+            TaskEvent(
+                task_id=row["pk"],
+                kind=SNAPSHOT,
+                changes={
+                    **{field.removesuffix("_id"): row[field] for field in FIELDS},
+                    **{field: sorted(related[row["pk"]][field]) for field, _ in M2M_FIELDS},
+                },
+            )
+            for row in chunk
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0014_job"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskEvent",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("kind", models.PositiveSmallIntegerField(choices=[(1, "Created"), (2, "Updated"), (3, "Deleted"), (4, "Snapshot")])),
+                ("changes", models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("actor", models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name="task_events", to=settings.AUTH_USER_MODEL)),
+                ("task", models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name="events", to="tasks.task")),
+            ],
+            options={
+                "indexes": [models.Index(fields=["task", "id"], name="taskevent_task_id_idx"), models.Index(fields=["created_at"], name="taskevent_created_at_idx")],
+            },
+        ),
+        migrations.RunPython(snapshot_tasks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.12 on 2026-10-18 19:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def populate_projects(apps, schema_editor):
+    Task = apps.get_model("tasks", "Task")
+    TaskEvent = apps.get_model("tasks", "TaskEvent")
+    TaskEvent.objects.update(
+        project_id=Subquery(Task.objects.filter(pk=OuterRef("task_id")).values("project_id")[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0015_task_events"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="taskevent",
+            name="project",
+            field=models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name="task_events", to="tasks.project"),
+        ),
+        migrations.AddIndex(
+            model_name="taskevent",
+            index=models.Index(fields=["task", "created_at"], name="taskevent_task_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="taskevent",
+            index=models.Index(fields=["project", "created_at"], name="taskevent_project_created_idx"),
+        ),
+        migrations.RunPython(populate_projects, migrations.RunPython.noop),
+    ]
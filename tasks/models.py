@@ -1,12 +1,15 @@
 from django.utils import timezone
 from django.contrib.auth.models import AbstractUser
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.db.models import Case, Q, Value, When
 
 from django.conf import settings
 
 
 class Position(models.Model):
     name = models.CharField(max_length=100, unique=True)
+    num_workers = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ("name",)
@@ -16,7 +19,7 @@ class Position(models.Model):
 
     @property
     def worker_count(self):
-        return self.workers.count()
+        return self.num_workers
 
 
 class Worker(AbstractUser):
@@ -34,6 +37,7 @@ class Worker(AbstractUser):
 
 class TaskType(models.Model):
     name = models.CharField(max_length=100, unique=True)
+    num_tasks = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ("name",)
@@ -43,11 +47,12 @@ class TaskType(models.Model):
 
     @property
     def task_count(self):
-        return self.tasks.count()
+        return self.num_tasks
 
 
 class Tag(models.Model):
     name = models.CharField(max_length=50, unique=True)
+    num_tasks = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ("name",)
@@ -57,7 +62,7 @@ class Tag(models.Model):
 
     @property
     def task_count(self):
-        return self.tasks.count()
+        return self.num_tasks
 
 
 class Team(models.Model):
@@ -66,6 +71,8 @@ class Team(models.Model):
         Worker,
         related_name="teams",
     )
+    num_workers = models.PositiveIntegerField(default=0, editable=False)
+    num_projects = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ("name",)
@@ -73,10 +80,19 @@ class Team(models.Model):
     def __str__(self):
         return self.name
 
+    @property
+    def worker_count(self):
+        return self.num_workers
+
+    @property
+    def project_count(self):
+        return self.num_projects
+
 
 class Project(models.Model):
     name = models.CharField(max_length=100, unique=True)
     team = models.ForeignKey(Team, on_delete=models.PROTECT, related_name="projects")
+    num_tasks = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ("name",)
@@ -84,6 +100,43 @@ class Project(models.Model):
     def __str__(self):
         return self.name
 
+    @property
+    def task_count(self):
+        return self.num_tasks
+
+
+class Progress(models.Model):
+    """
+    Materialized completion numbers, see tasks.rollups. ``num_overdue``
+    counts open tasks past their deadline on ``computed_on``.
+    """
+    num_tasks = models.PositiveIntegerField(default=0)
+    num_completed = models.PositiveIntegerField(default=0)
+    num_overdue = models.PositiveIntegerField(default=0)
+    next_deadline = models.DateField(null=True, blank=True)
+    computed_on = models.DateField()
+
+    class Meta:
+        abstract = True
+
+    @property
+    def percent_complete(self):
+        if not self.num_tasks:
+            return 0
+        return round(100 * self.num_completed / self.num_tasks)
+
+
+class ProjectProgress(Progress):
+    project = models.OneToOneField(
+        Project, on_delete=models.CASCADE, primary_key=True, related_name="progress"
+    )
+
+
+class TeamProgress(Progress):
+    team = models.OneToOneField(
+        Team, on_delete=models.CASCADE, primary_key=True, related_name="progress"
+    )
+
 
 class TaskPriority(models.TextChoices):  # class for priority field in Task model
     URGENT = "urgent", "Urgent"
@@ -92,6 +145,35 @@ class TaskPriority(models.TextChoices):  # class for priority field in Task mode
     LOW = "low", "Low"
 
 
+def overdue_condition():
+    return Q(is_completed=False, deadline__lt=timezone.now().date())
+
+
+class TaskQuerySet(models.QuerySet):
+    def overdue(self):
+        return self.filter(overdue_condition())
+
+    def due_within(self, days):
+        today = timezone.now().date()
+        return self.filter(
+            is_completed=False,
+            deadline__gte=today,
+            deadline__lte=today + timezone.timedelta(days=days),
+        )
+
+    def with_overdue(self):
+        """
+        Annotates ``overdue`` so templates don't call is_overdue() per row.
+        """
+        return self.annotate(
+            overdue=Case(
+                When(overdue_condition(), then=Value(True)),
+                default=Value(False),
+                output_field=models.BooleanField(),
+            )
+        )
+
+
 class Task(models.Model):
     name = models.CharField(max_length=100, unique=True)
     description = models.TextField()
@@ -125,10 +207,22 @@ class Task(models.Model):
         related_name="tasks",
     )
 
+    objects = TaskQuerySet.as_manager()
+
     class Meta:
         ordering = ("name",)
         verbose_name = "task"
         verbose_name_plural = "tasks"
+        indexes = [
+            models.Index(fields=["is_completed", "deadline"], name="task_completed_deadline_idx"),
+            models.Index(fields=["priority", "deadline"], name="task_priority_deadline_idx"),
+            models.Index(fields=["project", "is_completed"], name="task_project_completed_idx"),
+            models.Index(
+                fields=["name"],
+                condition=Q(is_completed=False),
+                name="task_open_name_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name}: till {self.deadline}, priority {self.priority}"
@@ -138,3 +232,101 @@ class Task(models.Model):
             return False
         return self.deadline < timezone.now().date() and not self.is_completed
 
+
+class TaskEventKind(models.IntegerChoices):
+    CREATED = 1, "Created"
+    UPDATED = 2, "Updated"
+    DELETED = 3, "Deleted"
+    SNAPSHOT = 4, "Snapshot"
+
+
+class TaskEvent(models.Model):
+    """
+    One change to a task, see tasks.history. Events outlive their task,
+    so the task reference has no database constraint. ``project`` is the
+    project of the task when the event happened, for the activity feed.
+    """
+    task = models.ForeignKey(
+        Task,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        # Covered by the (task, id) index.
+        db_index=False,
+        related_name="events",
+    )
+    project = models.ForeignKey(
+        Project,
+        null=True,
+        blank=True,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        # Covered by the (project, created_at) index.
+        db_index=False,
+        related_name="task_events",
+    )
+    kind = models.PositiveSmallIntegerField(choices=TaskEventKind.choices)
+    changes = models.JSONField(encoder=DjangoJSONEncoder)
+    actor = models.ForeignKey(
+        Worker, null=True, blank=True, on_delete=models.SET_NULL, related_name="task_events"
+    )
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["task", "id"], name="taskevent_task_id_idx"),
+            models.Index(fields=["created_at"], name="taskevent_created_at_idx"),
+            # The activity feed streams, see tasks.feed.
+            models.Index(fields=["task", "created_at"], name="taskevent_task_created_idx"),
+            models.Index(fields=["project", "created_at"], name="taskevent_project_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} task #{self.task_id} at {self.created_at}"
+
+
+class JobStatus(models.TextChoices):
+    QUEUED = "queued", "Queued"
+    RUNNING = "running", "Running"
+    SUCCEEDED = "succeeded", "Succeeded"
+    FAILED = "failed", "Failed"
+
+
+class Job(models.Model):
+    """
+    A unit of background work run by ``manage.py run_worker``, see
+    tasks.jobs.
+    """
+    name = models.CharField(max_length=100)
+    args = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=JobStatus.choices, default=JobStatus.QUEUED)
+    run_after = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    progress = models.PositiveSmallIntegerField(default=0)
+    progress_message = models.CharField(max_length=255, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    created_by = models.ForeignKey(
+        Worker, null=True, blank=True, on_delete=models.SET_NULL, related_name="jobs"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ("-created_at", "-pk")
+        indexes = [
+            models.Index(
+                fields=["run_after"],
+                condition=Q(status="queued"),
+                name="job_queued_run_after_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in (JobStatus.SUCCEEDED, JobStatus.FAILED)
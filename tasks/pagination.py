@@ -0,0 +1,227 @@
+"""
+Keyset (cursor) pagination for list views.
+
+Pages are addressed by an opaque cursor holding the ordering value and
+pk of the row at the page boundary, so every page is a bounded index
+range scan instead of an OFFSET, and no COUNT(*) is needed to render it.
+"""
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import InvalidPage
+from django.db import connections
+from django.db.models import Q
+from django.http import Http404
+from django.utils.functional import cached_property
+
+NEXT = "n"
+PREVIOUS = "p"
+
+
+def encode_cursor(direction, value, pk):
+    data = json.dumps([direction, value, pk], default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        direction, value, pk = json.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, ValueError, TypeError):
+        raise Http404("Invalid cursor")
+    if direction not in (NEXT, PREVIOUS) or not isinstance(pk, int) or isinstance(pk, bool):
+        raise Http404("Invalid cursor")
+    if not isinstance(value, (str, int, float)) or isinstance(value, bool):
+        raise Http404("Invalid cursor")
+    return direction, value, pk
+
+
+class CursorPage:
+    is_cursor_page = True
+    number = None
+
+    def __init__(self, object_list, paginator, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f"<CursorPage of {len(self.object_list)} objects>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    Paginates ``queryset`` ordered by ``(ordering_field, pk)``, both
+    descending when ``ordering_field`` starts with "-". The field may be
+    an annotation, aggregates are filtered with HAVING.
+
+    ``count`` is only computed when accessed. With ``estimate_count`` it
+    comes from the query planner on PostgreSQL (None elsewhere) instead
+    of an exact COUNT(*).
+    """
+
+    def __init__(self, queryset, per_page, ordering_field, estimate_count=True):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering_field = ordering_field
+        self.estimate_count = estimate_count
+
+    def page(self, cursor=None):
+        direction, queryset = self._page_queryset(cursor)
+        return self._build_page(list(queryset), direction, cursor)
+
+    async def apage(self, cursor=None):
+        direction, queryset = self._page_queryset(cursor)
+        return self._build_page([obj async for obj in queryset], direction, cursor)
+
+    @property
+    def field_name(self):
+        return self.ordering_field.lstrip("-")
+
+    def _page_queryset(self, cursor):
+        field = self.field_name
+        queryset = self.queryset
+        direction = NEXT
+        if cursor:
+            direction, value, pk = decode_cursor(cursor)
+            value = self._cursor_value(value)
+        # Pages after the cursor in the ordering's own direction.
+        ascending = (direction == NEXT) != self.ordering_field.startswith("-")
+        if cursor:
+            lookup = "gt" if ascending else "lt"
+            queryset = queryset.filter(
+                Q(**{f"{field}__{lookup}": value})
+                | Q(**{field: value, f"pk__{lookup}": pk})
+            )
+
+        if ascending:
+            queryset = queryset.order_by(field, "pk")
+        else:
+            queryset = queryset.order_by(f"-{field}", "-pk")
+        return direction, queryset[:self.per_page + 1]
+
+    def _cursor_value(self, value):
+        try:
+            field = self.queryset.model._meta.get_field(self.field_name)
+        except FieldDoesNotExist:
+            return value
+        try:
+            return field.to_python(value)
+        except (ValidationError, ValueError, TypeError):
+            raise Http404("Invalid cursor")
+
+    def _build_page(self, rows, direction, cursor):
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if direction == PREVIOUS:
+            rows.reverse()
+
+        if not rows:
+            return CursorPage(rows, self)
+        if direction == NEXT:
+            has_next, has_previous = has_more, bool(cursor)
+        else:
+            has_next, has_previous = True, has_more
+        first, last = rows[0], rows[-1]
+        return CursorPage(
+            rows,
+            self,
+            next_cursor=self._cursor(NEXT, last) if has_next else None,
+            previous_cursor=self._cursor(PREVIOUS, first) if has_previous else None,
+        )
+
+    def _cursor(self, direction, obj):
+        return encode_cursor(direction, getattr(obj, self.field_name), obj.pk)
+
+    @cached_property
+    def count(self):
+        if not self.estimate_count:
+            return self.queryset.count()
+        return estimate_count(self.queryset)
+
+
+def estimate_count(queryset):
+    """
+    Returns the planner's row estimate for ``queryset`` on PostgreSQL,
+    or None when the database can not estimate cheaply.
+    """
+    if queryset.query.is_empty() or connections[queryset.db].vendor != "postgresql":
+        return None
+    plan = json.loads(queryset.order_by().explain(format="json"))
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class CursorPaginationMixin:
+    """
+    Opt-in keyset pagination for ListView subclasses.
+
+    Enabled per view with ``pagination_mode = "cursor"`` or globally with
+    the LIST_PAGINATION_MODE setting. Querysets that carry their own
+    ordering (e.g. ranked search results) keep offset pagination.
+    """
+    pagination_mode = None
+    cursor_kwarg = "cursor"
+
+    def get_pagination_mode(self):
+        return self.pagination_mode or getattr(settings, "LIST_PAGINATION_MODE", "offset")
+
+    def get_cursor_ordering_field(self, queryset):
+        return queryset.model._meta.ordering[0]
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.get_pagination_mode() != "cursor" or queryset.query.order_by:
+            return super().paginate_queryset(queryset, page_size)
+        paginator = CursorPaginator(
+            queryset,
+            page_size,
+            self.get_cursor_ordering_field(queryset),
+            estimate_count=getattr(settings, "PAGINATION_ESTIMATE_COUNT", True),
+        )
+        page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    async def apaginate_queryset(self, queryset, page_size):
+        """
+        paginate_queryset() for async views: the count and the page rows
+        are fetched with the async ORM.
+        """
+        if self.get_pagination_mode() == "cursor" and not queryset.query.order_by:
+            paginator = CursorPaginator(
+                queryset,
+                page_size,
+                self.get_cursor_ordering_field(queryset),
+                estimate_count=getattr(settings, "PAGINATION_ESTIMATE_COUNT", True),
+            )
+            page = await paginator.apage(self.request.GET.get(self.cursor_kwarg))
+            return paginator, page, page.object_list, page.has_other_pages()
+
+        paginator = self.get_paginator(queryset, page_size)
+        paginator.count = await queryset.acount()
+        try:
+            page = paginator.page(self.request.GET.get(self.page_kwarg) or 1)
+        except InvalidPage as error:
+            raise Http404(str(error))
+        page.object_list = [obj async for obj in page.object_list]
+        return paginator, page, page.object_list, page.has_other_pages()
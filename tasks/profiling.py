@@ -0,0 +1,146 @@
+"""
+Per-route request metrics and sampled profiles.
+
+tasks.middleware.ProfilingMiddleware records wall time, database time,
+query count and template render time (taken by the TimedDjangoTemplates
+backend) of every request by resolved view name. render_prometheus()
+serves the aggregates in the Prometheus text format. The numbers live in process memory, so with several gunicorn
+workers each scrape sees the worker that answered it; sum the series in
+Prometheus. A PROFILING_SAMPLE_RATE fraction of requests also runs under
+cProfile and is dumped to PROFILING_DIR for snakeviz/pstats.
+"""
+import os
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.template.backends.django import DjangoTemplates, Template
+
+PREFIX = "task_manager"
+BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNRESOLVED = "<unresolved>"
+
+
+class RouteStats:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.wall = 0.0
+        self.db = 0.0
+        self.queries = 0
+        self.template = 0.0
+        self.buckets = [0] * len(BUCKETS)
+
+
+class Metrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.routes = defaultdict(RouteStats)
+
+    def record(self, view, method, status, wall, db, queries, template):
+        with self.lock:
+            stats = self.routes[view, method]
+            stats.requests += 1
+            stats.errors += status >= 500
+            stats.wall += wall
+            stats.db += db
+            stats.queries += queries
+            stats.template += template
+            for index, bound in enumerate(BUCKETS):
+                if wall <= bound:
+                    stats.buckets[index] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return {key: vars(stats).copy() for key, stats in self.routes.items()}
+
+    def reset(self):
+        with self.lock:
+            self.routes.clear()
+
+
+metrics = Metrics()
+
+
+class TimedTemplate(Template):
+    """
+    Adds the render time to ``request.template_duration``, which
+    ProfilingMiddleware sets. Renders nested in a timed one (form
+    widgets, render_to_string in tags) are part of its time.
+    """
+
+    def render(self, context=None, request=None):
+        if getattr(request, "template_duration", None) is None or getattr(request, "_timing_template", False):
+            return super().render(context, request)
+        request._timing_template = True
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            request.template_duration += time.perf_counter() - started
+            request._timing_template = False
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """
+    The Django template backend with TimedTemplate, so template time is
+    recorded for TemplateResponse and render() views alike.
+    """
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(view, method, **extra):
+    labels = {"view": view, "method": method, **extra}
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+def render_prometheus(snapshot=None):
+    snapshot = metrics.snapshot() if snapshot is None else snapshot
+    families = [
+        ("requests_total", "counter", "Requests handled.", "requests"),
+        ("request_errors_total", "counter", "Requests answered with a 5xx status.", "errors"),
+        ("db_queries_total", "counter", "Database queries run.", "queries"),
+        ("db_duration_seconds_total", "counter", "Time spent in database queries.", "db"),
+        ("template_duration_seconds_total", "counter", "Time spent rendering templates for the request.", "template"),
+    ]
+    lines = []
+    for name, kind, help_text, field in families:
+        lines += [f"# HELP {PREFIX}_{name} {help_text}", f"# TYPE {PREFIX}_{name} {kind}"]
+        for (view, method), stats in sorted(snapshot.items()):
+            lines.append(f"{PREFIX}_{name}{{{_labels(view, method)}}} {stats[field]}")
+
+    name = f"{PREFIX}_request_duration_seconds"
+    lines += [f"# HELP {name} Wall time of the view and the middleware inside the profiler.",
+              f"# TYPE {name} histogram"]
+    for (view, method), stats in sorted(snapshot.items()):
+        for bound, count in zip(BUCKETS, stats["buckets"]):
+            lines.append(f"{name}_bucket{{{_labels(view, method, le=bound)}}} {count}")
+        lines.append(f"{name}_bucket{{{_labels(view, method, le='+Inf')}}} {stats['requests']}")
+        lines.append(f"{name}_sum{{{_labels(view, method)}}} {stats['wall']}")
+        lines.append(f"{name}_count{{{_labels(view, method)}}} {stats['requests']}")
+    return "\n".join(lines) + "\n"
+
+
+def view_name(request):
+    match = getattr(request, "resolver_match", None)
+    return match.view_name if match else UNRESOLVED
+
+
+def dump_profile(profile, view):
+    directory = Path(getattr(settings, "PROFILING_DIR", "profiles"))
+    directory.mkdir(parents=True, exist_ok=True)
+    name = view.replace(":", ".").replace("/", "_")
+    path = directory / f"{name}-{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{time.monotonic_ns()}.prof"
+    profile.dump_stats(path)
+    return path
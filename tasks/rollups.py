@@ -0,0 +1,204 @@
+"""
+Materialized project and team progress.
+
+ProjectProgress and TeamProgress rows hold the task total, completed and
+overdue counts and the next open deadline, so list and detail pages read
+progress from one joined row instead of aggregating over tasks. Signal
+handlers in tasks.signals apply single task changes as F() deltas, bulk
+writes call refresh_projects() and ``rebuild_progress`` recomputes every
+row. Overdue counts are only valid for the day they were computed on,
+views recompute older rows in memory when they read them (see
+refresh_stale()) until the nightly rebuild rewrites them.
+"""
+from django.apps import apps as global_apps
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Case, Count, F, IntegerField, Min, Q, Value, When
+from django.utils import timezone
+
+from tasks.models import Project, ProjectProgress, Task, TeamProgress
+
+
+def _totals(tasks, group_by, today):
+    return {
+        row.pop(group_by): row
+        for row in tasks.order_by().values(group_by).annotate(
+            num_tasks=Count("pk"),
+            num_completed=Count("pk", filter=Q(is_completed=True)),
+            num_overdue=Count("pk", filter=Q(is_completed=False, deadline__lt=today)),
+            next_deadline=Min("deadline", filter=Q(is_completed=False)),
+        )
+    }
+
+
+def _compute(apps, owner, pks=None):
+    """
+    Builds, without saving, the progress rows of ``owner`` ("Project" or
+    "Team") with ``pks`` (every row when None) by one grouped query over
+    tasks.
+    """
+    owner_model = apps.get_model("tasks", owner)
+    progress_model = apps.get_model("tasks", f"{owner}Progress")
+    key = owner.lower()
+    group_by = "project" if owner == "Project" else "project__team"
+    today = timezone.now().date()
+
+    owners = owner_model.objects.order_by()
+    tasks = apps.get_model("tasks", "Task").objects.filter(**{f"{group_by}__isnull": False})
+    if pks is not None:
+        owners = owners.filter(pk__in=pks)
+        tasks = tasks.filter(**{f"{group_by}__in": pks})
+
+    totals = _totals(tasks, group_by, today)
+    return [
+        progress_model(**{f"{key}_id": pk}, computed_on=today, **totals.get(pk, {}))
+        for pk in owners.values_list("pk", flat=True)
+    ]
+
+
+def _recompute(apps, owner, pks=None):
+    """
+    Writes the rows of _compute() over the current ones, as one upsert
+    so concurrent refreshes of the same rows do not collide. Returns the
+    new rows by owner pk.
+    """
+    progress_model = apps.get_model("tasks", f"{owner}Progress")
+    rows = progress_model.objects.bulk_create(
+        _compute(apps, owner, pks),
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=[progress_model._meta.pk.name],
+        update_fields=["num_tasks", "num_completed", "num_overdue", "next_deadline", "computed_on"],
+    )
+    return {row.pk: row for row in rows}
+
+
+def rebuild():
+    """
+    Recomputes every progress row.
+    """
+    _recompute(global_apps, "Project")
+    _recompute(global_apps, "Team")
+
+
+def refresh_projects(project_ids):
+    """
+    Recomputes the progress of the given projects and of their teams,
+    for writes that bypass the signals (bulk updates).
+    """
+    project_ids = {pk for pk in project_ids if pk is not None}
+    if not project_ids:
+        return {}
+    rows = _recompute(global_apps, "Project", project_ids)
+    refresh_teams(Project.objects.filter(pk__in=project_ids).values_list("team_id", flat=True))
+    return rows
+
+
+def refresh_teams(team_ids):
+    team_ids = {pk for pk in team_ids if pk is not None}
+    if not team_ids:
+        return {}
+    return _recompute(global_apps, "Team", team_ids)
+
+
+def get_progress(obj):
+    try:
+        return obj.progress
+    except ObjectDoesNotExist:
+        return None
+
+
+def refresh_stale(objects):
+    """
+    Attaches freshly computed progress to the projects or teams in
+    ``objects`` (fetched with select_related("progress")) whose row is
+    missing or was computed before today. Costs no query when every row
+    is current. Nothing is saved, so reads never write: the stale rows
+    are rewritten by ``rebuild_progress`` or the recount job after
+    midnight.
+    """
+    today = timezone.now().date()
+    stale = [
+        obj for obj in objects
+        if get_progress(obj) is None or obj.progress.computed_on != today
+    ]
+    if not stale:
+        return
+    owner = "Project" if isinstance(stale[0], Project) else "Team"
+    rows = {row.pk: row for row in _compute(global_apps, owner, [obj.pk for obj in stale])}
+    for obj in stale:
+        obj.progress = rows[obj.pk]
+
+
+def task_state(project_id, is_completed, deadline):
+    """
+    Returns the (project, completed, deadline) a task counts towards.
+    """
+    return project_id, is_completed, Task._meta.get_field("deadline").to_python(deadline)
+
+
+def _rows_of(project_id):
+    return (
+        ProjectProgress.objects.filter(project_id=project_id),
+        TeamProgress.objects.filter(team__projects=project_id),
+    )
+
+
+def apply_task_change(old=None, new=None):
+    """
+    Moves one task from the ``old`` to the ``new`` task_state() in the
+    progress rows of its project and team. None stands for a task that
+    did not exist.
+    """
+    if old == new:
+        return
+    today = timezone.now().date()
+    recompute_deadline = set()
+    for state, delta in ((old, -1), (new, 1)):
+        if state is None or state[0] is None:
+            continue
+        project_id, is_completed, deadline = state
+        changes = {"num_tasks": F("num_tasks") + delta}
+        if is_completed:
+            changes["num_completed"] = F("num_completed") + delta
+        elif deadline is not None:
+            if deadline < today:
+                # Rows from an earlier day are refreshed on read anyway,
+                # and their overdue count may not include this task.
+                changes["num_overdue"] = Case(
+                    When(computed_on=today, then=F("num_overdue") + delta),
+                    default=F("num_overdue"),
+                    output_field=IntegerField(),
+                )
+            if delta > 0:
+                changes["next_deadline"] = Case(
+                    When(
+                        Q(next_deadline__isnull=True) | Q(next_deadline__gt=deadline),
+                        then=Value(deadline),
+                    ),
+                    default=F("next_deadline"),
+                )
+            else:
+                recompute_deadline.add(project_id)
+        for rows in _rows_of(project_id):
+            rows.update(**changes)
+
+    for project_id in recompute_deadline:
+        _update_next_deadline(project_id)
+
+
+def _update_next_deadline(project_id):
+    projects, teams = _rows_of(project_id)
+    open_tasks = Task.objects.filter(is_completed=False)
+    projects.update(
+        next_deadline=open_tasks.filter(project_id=project_id).aggregate(Min("deadline"))["deadline__min"]
+    )
+    team_id = Project.objects.filter(pk=project_id).values_list("team_id", flat=True).first()
+    teams.update(
+        next_deadline=open_tasks.filter(project__team_id=team_id).aggregate(Min("deadline"))["deadline__min"]
+    )
+
+
+def create_for(instance):
+    model = ProjectProgress if isinstance(instance, Project) else TeamProgress
+    key = "project" if isinstance(instance, Project) else "team"
+    model.objects.get_or_create(**{key: instance}, defaults={"computed_on": timezone.now().date()})
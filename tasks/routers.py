@@ -0,0 +1,78 @@
+"""
+Read replica routing.
+
+Writes and migrations go to "default". Reads go to a random alias from
+the DATABASE_REPLICAS setting only where tasks.middleware.PrimaryPinningMiddleware
+allows it: in safe (GET, HEAD) requests outside a transaction, unless the
+client wrote less than REPLICA_PIN_SECONDS ago, so the page a form
+redirects to shows the change. Management commands and anything else
+outside a request read from the primary.
+"""
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Apps whose writes are not user changes: the database cache table is
+# written to while rendering GET requests.
+UNPINNED_APP_LABELS = {"django_cache"}
+
+_read_replicas = ContextVar("read_from_replicas", default=False)
+_wrote = ContextVar("wrote_to_primary", default=None)
+
+
+def replicas():
+    return list(getattr(settings, "DATABASE_REPLICAS", ()))
+
+
+def read_from_replicas():
+    """
+    Lets the reads of the current context go to the replicas. Returns a
+    token for stop_reading_from_replicas().
+    """
+    return _read_replicas.set(True)
+
+
+def stop_reading_from_replicas(token):
+    _read_replicas.reset(token)
+
+
+def track_writes():
+    """
+    Starts recording whether the current context writes, see wrote().
+    """
+    return _wrote.set([False])
+
+
+def wrote():
+    state = _wrote.get()
+    return bool(state and state[0])
+
+
+def stop_tracking(token):
+    _wrote.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        aliases = replicas()
+        if not aliases or not _read_replicas.get() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(aliases)
+
+    def db_for_write(self, model, **hints):
+        state = _wrote.get()
+        if state is not None and model._meta.app_label not in UNPINNED_APP_LABELS:
+            state[0] = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema from the primary.
+        return db not in replicas()
@@ -0,0 +1,225 @@
+"""
+Full-text search over tasks.
+
+Each task is indexed with its name, description and the names of its
+tags, project and assignees. PostgreSQL keeps a weighted tsvector column
+on the task table behind a GIN index, SQLite keeps an FTS5 virtual table
+keyed by the task id. Other databases fall back to ``icontains``.
+
+The index is kept up to date by the signal handlers in tasks.signals.
+"""
+import re
+
+from django.db import connection as default_connection
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+BATCH_SIZE = 500
+
+SEARCH_CONFIG = "english"
+
+RELATED_TEXT_SQL = """
+    COALESCE((SELECT p.name FROM tasks_project p WHERE p.id = t.project_id), '')
+    || ' ' || COALESCE((
+        SELECT {aggregate}
+        FROM tasks_tag g
+        JOIN tasks_task_tags tt ON tt.tag_id = g.id
+        WHERE tt.task_id = t.id
+    ), '')
+    || ' ' || COALESCE((
+        SELECT {aggregate_worker}
+        FROM tasks_worker w
+        JOIN tasks_task_assignees ta ON ta.worker_id = w.id
+        WHERE ta.task_id = t.id
+    ), '')
+"""
+
+
+def _chunks(ids):
+    ids = list(ids)
+    for start in range(0, len(ids), BATCH_SIZE):
+        yield ids[start:start + BATCH_SIZE]
+
+
+class FallbackSearchBackend:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def install(self):
+        pass
+
+    def uninstall(self):
+        pass
+
+    def reindex(self, task_ids=None):
+        pass
+
+    def remove(self, task_ids):
+        pass
+
+    def search(self, queryset, query):
+        return queryset.filter(
+            Q(name__icontains=query) | Q(description__icontains=query)
+        ).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+class PostgresSearchBackend(FallbackSearchBackend):
+    def install(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute("ALTER TABLE tasks_task ADD COLUMN search_vector tsvector")
+            cursor.execute(
+                "CREATE INDEX tasks_task_search_vector_idx "
+                "ON tasks_task USING GIN (search_vector)"
+            )
+
+    def uninstall(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute("ALTER TABLE tasks_task DROP COLUMN search_vector")
+
+    def reindex(self, task_ids=None):
+        related = RELATED_TEXT_SQL.format(
+            aggregate="string_agg(g.name, ' ')",
+            aggregate_worker=(
+                "string_agg(w.username || ' ' || w.first_name || ' ' || w.last_name, ' ')"
+            ),
+        )
+        sql = f"""
+            UPDATE tasks_task t SET search_vector =
+                setweight(to_tsvector(%s::regconfig, t.name), 'A')
+                || setweight(to_tsvector(%s::regconfig, {related}), 'B')
+                || setweight(to_tsvector(%s::regconfig, t.description), 'C')
+        """
+        params = [SEARCH_CONFIG] * 3
+        with self.connection.cursor() as cursor:
+            if task_ids is None:
+                cursor.execute(sql, params)
+                return
+            for chunk in _chunks(task_ids):
+                cursor.execute(sql + " WHERE t.id = ANY(%s)", params + [chunk])
+
+    def remove(self, task_ids):
+        # The vector lives on the task row and goes away with it.
+        pass
+
+    def search(self, queryset, query):
+        tsquery = "websearch_to_tsquery(%s::regconfig, %s)"
+        params = (SEARCH_CONFIG, query)
+        return queryset.annotate(
+            search_match=RawSQL(
+                f"tasks_task.search_vector @@ {tsquery}",
+                params,
+                output_field=BooleanField(),
+            ),
+            search_rank=RawSQL(
+                f"ts_rank(tasks_task.search_vector, {tsquery})",
+                params,
+                output_field=FloatField(),
+            ),
+        ).filter(search_match=True)
+
+
+class SQLiteSearchBackend(FallbackSearchBackend):
+    # Column weights for bm25: name, description, related names.
+    WEIGHTS = (10.0, 1.0, 4.0)
+
+    def install(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                "CREATE VIRTUAL TABLE tasks_task_fts "
+                "USING fts5(name, description, related, tokenize='porter unicode61')"
+            )
+
+    def uninstall(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute("DROP TABLE IF EXISTS tasks_task_fts")
+
+    def reindex(self, task_ids=None):
+        related = RELATED_TEXT_SQL.format(
+            aggregate="group_concat(g.name, ' ')",
+            aggregate_worker=(
+                "group_concat(w.username || ' ' || w.first_name || ' ' || w.last_name, ' ')"
+            ),
+        )
+        sql = f"""
+            INSERT INTO tasks_task_fts (rowid, name, description, related)
+            SELECT t.id, t.name, t.description, {related}
+            FROM tasks_task t
+        """
+        with self.connection.cursor() as cursor:
+            if task_ids is None:
+                cursor.execute("DELETE FROM tasks_task_fts")
+                cursor.execute(sql)
+                return
+            for chunk in _chunks(task_ids):
+                placeholders = ", ".join(["%s"] * len(chunk))
+                cursor.execute(
+                    f"DELETE FROM tasks_task_fts WHERE rowid IN ({placeholders})", chunk
+                )
+                cursor.execute(sql + f" WHERE t.id IN ({placeholders})", chunk)
+
+    def remove(self, task_ids):
+        with self.connection.cursor() as cursor:
+            for chunk in _chunks(task_ids):
+                placeholders = ", ".join(["%s"] * len(chunk))
+                cursor.execute(
+                    f"DELETE FROM tasks_task_fts WHERE rowid IN ({placeholders})", chunk
+                )
+
+    def search(self, queryset, query):
+        match = to_fts5_query(query)
+        if not match:
+            return queryset.none()
+        weights = ", ".join(str(weight) for weight in self.WEIGHTS)
+        return queryset.filter(
+            id__in=RawSQL(
+                "SELECT rowid FROM tasks_task_fts WHERE tasks_task_fts MATCH %s",
+                (match,),
+            )
+        ).annotate(
+            # bm25() is lower for better matches, negate it so that
+            # search_rank sorts the same way on every backend.
+            search_rank=RawSQL(
+                f"""(
+                    SELECT -bm25(tasks_task_fts, {weights}) FROM tasks_task_fts
+                    WHERE tasks_task_fts MATCH %s AND rowid = tasks_task.id
+                )""",
+                (match,),
+                output_field=FloatField(),
+            )
+        )
+
+
+def to_fts5_query(query):
+    """
+    Turns free text into an FTS5 query where every word is a quoted
+    prefix term, so user input can not inject FTS5 syntax.
+    """
+    words = re.findall(r"\w+", query)
+    return " ".join(f'"{word}"*' for word in words)
+
+
+BACKENDS = {
+    "postgresql": PostgresSearchBackend,
+    "sqlite": SQLiteSearchBackend,
+}
+
+
+def get_backend(connection=None):
+    connection = connection or default_connection
+    return BACKENDS.get(connection.vendor, FallbackSearchBackend)(connection)
+
+
+def search_tasks(queryset, query):
+    """
+    Filters ``queryset`` down to tasks matching ``query`` and orders them
+    by relevance, best match first.
+    """
+    return get_backend().search(queryset, query).order_by("-search_rank", "name")
+
+
+def reindex_tasks(task_ids=None):
+    get_backend().reindex(task_ids)
+
+
+def remove_tasks(task_ids):
+    get_backend().remove(task_ids)
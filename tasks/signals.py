@@ -0,0 +1,330 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from tasks import caching, counters, dashboard, history, rollups, search
+from tasks.models import Position, Project, Tag, Task, TaskType, Team, Worker
+
+SEARCHED_FIELDS = {"name", "username", "first_name", "last_name"}
+
+# Non-FK fields whose value before a save is needed by the handlers below.
+TRACKED_FIELDS = {
+    Task: ["name", "description", "priority", "is_completed", "deadline"],
+}
+
+
+def _m2m_task_ids(instance, action, reverse, pk_set):
+    """
+    Returns the ids of the tasks touched by an m2m_changed signal on
+    Task.tags or Task.assignees, from either side of the relation.
+    """
+    if not reverse:
+        return [instance.pk]
+    if action == "pre_clear":
+        return list(instance.tasks.values_list("pk", flat=True))
+    return list(pk_set or ())
+
+
+@receiver(post_save, sender=Task)
+def index_saved_task(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.reindex_tasks([instance.pk])
+
+
+@receiver(post_delete, sender=Task)
+def remove_deleted_task(sender, instance, **kwargs):
+    search.remove_tasks([instance.pk])
+
+
+@receiver(m2m_changed, sender=Task.tags.through)
+@receiver(m2m_changed, sender=Task.assignees.through)
+def index_task_relations(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear" and reverse:
+        instance._search_cleared_task_ids = _m2m_task_ids(instance, action, reverse, pk_set)
+    elif action == "post_clear" and reverse:
+        search.reindex_tasks(getattr(instance, "_search_cleared_task_ids", []))
+    elif action in ("post_add", "post_remove", "post_clear"):
+        search.reindex_tasks(_m2m_task_ids(instance, action, reverse, pk_set))
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=Worker)
+def index_renamed_related(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if created or raw:
+        return
+    # Logins save the worker with update_fields=["last_login"].
+    if update_fields and not set(update_fields) & SEARCHED_FIELDS:
+        return
+    search.reindex_tasks(instance.tasks.values_list("pk", flat=True))
+
+
+@receiver(pre_save, sender=Worker)
+@receiver(pre_save, sender=Task)
+@receiver(pre_save, sender=Project)
+def remember_previous_values(sender, instance, raw=False, **kwargs):
+    if raw or instance._state.adding:
+        return
+    fields = [fk for fk, target, field in counters.fk_counters_for(sender)]
+    fields += TRACKED_FIELDS.get(sender, [])
+    instance._previous_values = (
+        sender.objects.filter(pk=instance.pk).values(*fields).first() or {}
+    )
+
+
+@receiver(post_save, sender=Worker)
+@receiver(post_save, sender=Task)
+@receiver(post_save, sender=Project)
+def count_foreign_keys(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_previous_values", {})
+    for fk, target, field in counters.fk_counters_for(sender):
+        old = None if created else previous.get(fk)
+        new = getattr(instance, sender._meta.get_field(fk).attname)
+        if old != new:
+            counters.adjust(target, [old], field, -1)
+            counters.adjust(target, [new], field, 1)
+
+
+@receiver(post_delete, sender=Worker)
+@receiver(post_delete, sender=Task)
+@receiver(post_delete, sender=Project)
+def uncount_foreign_keys(sender, instance, **kwargs):
+    for fk, target, field in counters.fk_counters_for(sender):
+        counters.adjust(target, [getattr(instance, sender._meta.get_field(fk).attname)], field, -1)
+
+
+@receiver(pre_delete, sender=Task)
+def uncount_task_tags(sender, instance, **kwargs):
+    # Deleting a task drops its through rows without an m2m_changed signal.
+    counters.adjust(Tag, instance.tags.values_list("pk", flat=True), "num_tasks", -1)
+
+
+@receiver(pre_delete, sender=Worker)
+def uncount_worker_teams(sender, instance, **kwargs):
+    counters.adjust(Team, instance.teams.values_list("pk", flat=True), "num_workers", -1)
+
+
+@receiver(m2m_changed, sender=Task.tags.through)
+@receiver(m2m_changed, sender=Task.assignees.through)
+@receiver(m2m_changed, sender=Team.workers.through)
+def drop_unlinked_ids(sender, instance, action, model, pk_set, **kwargs):
+    """
+    remove() signals every id it was given, linked or not. Narrows
+    pk_set to the linked ids before the delete, the same set is sent
+    with post_remove, so the handlers only see links that are removed.
+    """
+    if action != "pre_remove" or not pk_set:
+        return
+    own, other = _through_field(sender, type(instance)), _through_field(sender, model)
+    pk_set.intersection_update(
+        sender.objects.filter(**{own.attname: instance.pk, f"{other.attname}__in": pk_set})
+        .values_list(other.attname, flat=True)
+    )
+
+
+@receiver(m2m_changed, sender=Task.tags.through)
+@receiver(m2m_changed, sender=Team.workers.through)
+def count_m2m_changes(sender, instance, action, pk_set, **kwargs):
+    for m2m_field, counted, field in counters.m2m_counters_for(sender):
+        if isinstance(instance, counted):
+            if action in ("post_add", "post_remove"):
+                delta = len(pk_set) if action == "post_add" else -len(pk_set)
+                counters.adjust(counted, [instance.pk], field, delta)
+            elif action == "post_clear":
+                counted.objects.filter(pk=instance.pk).update(**{field: 0})
+            continue
+
+        if m2m_field.model is counted:
+            counted_fk, other_fk = m2m_field.m2m_field_name(), m2m_field.m2m_reverse_field_name()
+        else:
+            counted_fk, other_fk = m2m_field.m2m_reverse_field_name(), m2m_field.m2m_field_name()
+        if action in ("post_add", "post_remove"):
+            counters.adjust(counted, pk_set, field, 1 if action == "post_add" else -1)
+        elif action == "pre_clear":
+            instance._counter_cleared_ids = list(
+                sender.objects.filter(**{other_fk: instance.pk}).values_list(counted_fk, flat=True)
+            )
+        elif action == "post_clear":
+            counters.adjust(counted, getattr(instance, "_counter_cleared_ids", []), field, -1)
+
+
+def _is_login_save(update_fields):
+    return bool(update_fields) and set(update_fields) <= {"last_login"}
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_save, sender=Worker)
+@receiver(post_save, sender=Team)
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Position)
+@receiver(post_save, sender=TaskType)
+@receiver(post_delete, sender=Task)
+@receiver(post_delete, sender=Worker)
+@receiver(post_delete, sender=Team)
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Position)
+@receiver(post_delete, sender=TaskType)
+def invalidate_cached_fragments(sender, instance, update_fields=None, **kwargs):
+    if _is_login_save(update_fields):
+        return
+    caching.invalidate(sender, [instance.pk])
+
+    # Rows whose pages show this instance, through the old and new FKs.
+    previous = getattr(instance, "_previous_values", {})
+    for fk, target, field in counters.fk_counters_for(sender):
+        attname = sender._meta.get_field(fk).attname
+        caching.invalidate(target, [previous.get(fk), getattr(instance, attname)], collection=False)
+
+    if sender is Task:
+        related = getattr(instance, "_cache_related_ids", None) or _task_related_ids(instance)
+        caching.invalidate(Tag, related["tags"], collection=False)
+        caching.invalidate(Worker, related["assignees"], collection=False)
+    elif sender is Worker:
+        teams = getattr(instance, "_cache_related_ids", None) or instance.teams.values_list("pk", flat=True)
+        caching.invalidate(Team, teams, collection=False)
+
+
+def _task_related_ids(task):
+    return {
+        "tags": list(task.tags.values_list("pk", flat=True)),
+        "assignees": list(task.assignees.values_list("pk", flat=True)),
+    }
+
+
+@receiver(pre_delete, sender=Task)
+@receiver(pre_delete, sender=Worker)
+def remember_cached_relations(sender, instance, **kwargs):
+    # Through rows are gone by post_delete.
+    if sender is Task:
+        instance._cache_related_ids = _task_related_ids(instance)
+    else:
+        instance._cache_related_ids = list(instance.teams.values_list("pk", flat=True))
+
+
+def _through_field(through, model):
+    for field in through._meta.get_fields():
+        if field.many_to_one and field.related_model is model:
+            return field
+
+
+@receiver(m2m_changed, sender=Task.tags.through)
+@receiver(m2m_changed, sender=Task.assignees.through)
+@receiver(m2m_changed, sender=Team.workers.through)
+def invalidate_cached_relations(sender, instance, action, model, pk_set, **kwargs):
+    if action == "pre_clear":
+        own = _through_field(sender, type(instance))
+        other = _through_field(sender, model)
+        instance._cache_cleared_ids = list(
+            sender.objects.filter(**{own.name: instance.pk}).values_list(other.attname, flat=True)
+        )
+    elif action in ("post_add", "post_remove", "post_clear"):
+        if action == "post_clear":
+            pk_set = getattr(instance, "_cache_cleared_ids", [])
+        caching.invalidate(type(instance), [instance.pk])
+        caching.invalidate(model, pk_set)
+
+
+def _dashboard_state(values):
+    return dashboard.task_state(values["priority"], values["is_completed"], values["deadline"])
+
+
+def _dashboard_state_of(task):
+    return dashboard.task_state(task.priority, task.is_completed, task.deadline)
+
+
+@receiver(post_save, sender=Task)
+def update_dashboard_task(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        dashboard.invalidate()
+        return
+    previous = getattr(instance, "_previous_values", None)
+    old = None if created or not previous else _dashboard_state(previous)
+    dashboard.apply_task_change(old, _dashboard_state_of(instance))
+
+
+@receiver(post_delete, sender=Task)
+def remove_dashboard_task(sender, instance, **kwargs):
+    dashboard.apply_task_change(_dashboard_state_of(instance), None)
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=Team)
+def count_dashboard_created(sender, instance, created, **kwargs):
+    if created:
+        dashboard.apply_count_change(f"num_{sender._meta.model_name}s", 1)
+
+
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=Team)
+def count_dashboard_deleted(sender, instance, **kwargs):
+    dashboard.apply_count_change(f"num_{sender._meta.model_name}s", -1)
+
+
+def _rollup_state(values):
+    return rollups.task_state(values["project"], values["is_completed"], values["deadline"])
+
+
+def _rollup_state_of(task):
+    return rollups.task_state(task.project_id, task.is_completed, task.deadline)
+
+
+@receiver(post_save, sender=Task)
+def update_task_rollups(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_previous_values", None)
+    old = None if created or not previous else _rollup_state(previous)
+    rollups.apply_task_change(old, _rollup_state_of(instance))
+
+
+@receiver(post_delete, sender=Task)
+def remove_task_rollups(sender, instance, **kwargs):
+    rollups.apply_task_change(_rollup_state_of(instance), None)
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=Team)
+def create_rollups(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        rollups.create_for(instance)
+
+
+@receiver(post_save, sender=Project)
+def move_project_rollups(sender, instance, created, raw=False, **kwargs):
+    previous = getattr(instance, "_previous_values", {})
+    if not created and not raw and previous.get("team") != instance.team_id:
+        rollups.refresh_teams([previous.get("team"), instance.team_id])
+
+
+@receiver(post_save, sender=Task)
+def record_task_saved(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        history.record_saved(instance, created, getattr(instance, "_previous_values", None))
+
+
+@receiver(post_delete, sender=Task)
+def record_task_deleted(sender, instance, **kwargs):
+    history.record_deleted([instance])
+
+
+@receiver(m2m_changed, sender=Task.tags.through)
+@receiver(m2m_changed, sender=Task.assignees.through)
+def record_task_relations(sender, instance, action, reverse, model, pk_set, **kwargs):
+    field = "tags" if sender is Task.tags.through else "assignees"
+    target = _through_field(sender, type(instance) if reverse else model).attname
+    if action == "pre_clear":
+        instance._history_cleared_links = list(
+            sender.objects.filter(**{target if reverse else "task_id": instance.pk}).values_list("task_id", target)
+        )
+        return
+    if action == "post_clear":
+        links = getattr(instance, "_history_cleared_links", [])
+    elif action in ("post_add", "post_remove"):
+        links = [(pk, instance.pk) if reverse else (instance.pk, pk) for pk in pk_set]
+    else:
+        return
+    projects = None if reverse else {instance.pk: instance.project_id}
+    history.record_links(field, links, added=action == "post_add", projects=projects)
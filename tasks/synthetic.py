@@ -0,0 +1,180 @@
+"""
+Synthetic data for load testing.
+
+Builds a graph of positions, workers, teams, projects, task types, tags
+and tasks with bulk inserts only. Signals don't fire for bulk_create, so
+``generate`` rebuilds the search index, counter columns and caches once
+at the end instead.
+"""
+import random
+import time
+from dataclasses import dataclass
+
+from django.apps import apps
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from tasks import caching, dashboard, rollups, search
+from tasks.counters import recount
+from tasks.models import Position, Project, Tag, Task, TaskPriority, TaskType, Team, Worker
+
+PASSWORD = "password"
+
+
+@dataclass
+class Sizes:
+    positions: int = 10
+    workers: int = 1000
+    teams: int = 50
+    projects: int = 200
+    task_types: int = 10
+    tags: int = 100
+    tasks: int = 100_000
+    # Upper bounds, the actual fan-out per row is random.
+    assignees_per_task: int = 3
+    tags_per_task: int = 4
+    teams_per_worker: int = 2
+
+
+def _bulk_create(model, objs, batch_size):
+    created = []
+    for start in range(0, len(objs), batch_size):
+        created += model.objects.bulk_create(objs[start:start + batch_size])
+    return created
+
+
+def create_tasks(count, task_types, projects, rng, prefix="gen", batch_size=5000, progress=None):
+    """
+    Inserts ``count`` tasks in batches and returns their ids. Most tasks
+    are completed, a few have no deadline or project.
+    """
+    today = timezone.now().date()
+    priorities = TaskPriority.values
+    ids = []
+    for start in range(0, count, batch_size):
+        tasks = Task.objects.bulk_create(
+            Task(
+                name=f"{prefix} task {i}",
+                description=f"Synthetic task {i}",
+                is_completed=rng.random() < 0.8,
+                deadline=(
+                    today + timezone.timedelta(days=rng.randint(-365, 90))
+                    if rng.random() < 0.9 else None
+                ),
+                priority=rng.choice(priorities),
+                task_type=rng.choice(task_types),
+                project=rng.choice(projects) if projects and rng.random() < 0.7 else None,
+            )
+            for i in range(start, min(start + batch_size, count))
+        )
+        ids += [task.pk for task in tasks]
+        if progress:
+            progress(f"{len(ids)} tasks")
+    return ids
+
+
+def _links(through, source_field, source_ids, target_field, target_ids, max_per_row, rng):
+    for source_id in source_ids:
+        for target_id in rng.sample(target_ids, min(rng.randint(0, max_per_row), len(target_ids))):
+            yield through(**{source_field: source_id, target_field: target_id})
+
+
+def _bulk_links(through, links, batch_size):
+    batch = []
+    for link in links:
+        batch.append(link)
+        if len(batch) == batch_size:
+            through.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        through.objects.bulk_create(batch)
+
+
+def generate(sizes, prefix="gen", seed=0, batch_size=5000, progress=None):
+    """
+    Creates the object graph described by ``sizes``. Names start with
+    ``prefix`` so several runs can share a database. Workers get the
+    password "password".
+    """
+    rng = random.Random(seed)
+    started = time.monotonic()
+
+    def report(message):
+        if progress:
+            progress(f"{message} ({time.monotonic() - started:.1f}s)")
+
+    with transaction.atomic():
+        positions = _bulk_create(
+            Position,
+            [Position(name=f"{prefix} position {i}") for i in range(sizes.positions)],
+            batch_size,
+        )
+        password = make_password(PASSWORD)
+        workers = _bulk_create(
+            Worker,
+            [
+                Worker(
+                    username=f"{prefix}-worker-{i}",
+                    first_name="Worker",
+                    last_name=str(i),
+                    password=password,
+                    position=rng.choice(positions),
+                )
+                for i in range(sizes.workers)
+            ],
+            batch_size,
+        )
+        report(f"{len(workers)} workers")
+        teams = _bulk_create(Team, [Team(name=f"{prefix} team {i}") for i in range(sizes.teams)], batch_size)
+        projects = _bulk_create(
+            Project,
+            [Project(name=f"{prefix} project {i}", team=rng.choice(teams)) for i in range(sizes.projects)],
+            batch_size,
+        )
+        task_types = _bulk_create(
+            TaskType,
+            [TaskType(name=f"{prefix} type {i}") for i in range(sizes.task_types)],
+            batch_size,
+        )
+        tags = _bulk_create(Tag, [Tag(name=f"{prefix} tag {i}") for i in range(sizes.tags)], batch_size)
+        worker_ids = [worker.pk for worker in workers]
+        _bulk_links(
+            Team.workers.through,
+            _links(
+                Team.workers.through, "worker_id", worker_ids,
+                "team_id", [team.pk for team in teams], sizes.teams_per_worker, rng,
+            ),
+            batch_size,
+        )
+
+        task_ids = create_tasks(
+            sizes.tasks, task_types, projects, rng,
+            prefix=prefix, batch_size=batch_size, progress=report,
+        )
+        _bulk_links(
+            Task.assignees.through,
+            _links(
+                Task.assignees.through, "task_id", task_ids,
+                "worker_id", worker_ids, sizes.assignees_per_task, rng,
+            ),
+            batch_size,
+        )
+        _bulk_links(
+            Task.tags.through,
+            _links(
+                Task.tags.through, "task_id", task_ids,
+                "tag_id", [tag.pk for tag in tags], sizes.tags_per_task, rng,
+            ),
+            batch_size,
+        )
+        report("relations")
+
+        recount()
+        rollups.rebuild()
+        search.reindex_tasks(task_ids)
+        report("counters, rollups and search index")
+
+    for model in apps.get_app_config("tasks").get_models():
+        caching.invalidate(model)
+    dashboard.invalidate()
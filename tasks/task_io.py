@@ -0,0 +1,242 @@
+"""
+Streaming task import and export.
+
+Tasks are exchanged as flat records where related objects are referred
+to by name (task type, project, tags) or username (assignees). Readers
+and writers work on one record at a time and the database side works in
+fixed-size batches, so memory stays flat regardless of the file size.
+"""
+import csv
+import json
+from collections import defaultdict
+from datetime import date
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from tasks import history, search
+from tasks.models import Project, Tag, Task, TaskPriority, TaskType
+
+FIELDS = (
+    "name",
+    "description",
+    "deadline",
+    "is_completed",
+    "priority",
+    "task_type",
+    "project",
+    "tags",
+    "assignees",
+)
+LIST_FIELDS = ("tags", "assignees")
+CSV_LIST_SEPARATOR = ";"
+
+FORMATS = ("jsonl", "csv")
+
+
+class TaskImportError(Exception):
+    pass
+
+
+def check_length(model, field, value):
+    max_length = model._meta.get_field(field).max_length
+    if value and len(value) > max_length:
+        raise TaskImportError(
+            f"{model._meta.verbose_name.capitalize()} {field} {value[:20]!r}... "
+            f"is longer than {max_length} characters"
+        )
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def iter_task_records(queryset, chunk_size=2000):
+    """
+    Yields one export record per task. Rows are read with a server-side
+    cursor and tags/assignees are fetched with one query per chunk.
+    """
+    rows = queryset.values(
+        "id",
+        "name",
+        "description",
+        "deadline",
+        "is_completed",
+        "priority",
+        "task_type__name",
+        "project__name",
+    ).iterator(chunk_size=chunk_size)
+    for chunk in batched(rows, chunk_size):
+        ids = [row["id"] for row in chunk]
+        tags = _names_by_task(Task.tags.through, ids, "tag__name")
+        assignees = _names_by_task(Task.assignees.through, ids, "worker__username")
+        for row in chunk:
+            yield {
+                "name": row["name"],
+                "description": row["description"],
+                "deadline": row["deadline"].isoformat() if row["deadline"] else None,
+                "is_completed": row["is_completed"],
+                "priority": row["priority"],
+                "task_type": row["task_type__name"],
+                "project": row["project__name"],
+                "tags": tags.get(row["id"], []),
+                "assignees": assignees.get(row["id"], []),
+            }
+
+
+def _names_by_task(through, task_ids, name_field):
+    names = {}
+    rows = through.objects.filter(task_id__in=task_ids).values_list("task_id", name_field)
+    for task_id, name in rows.order_by(name_field):
+        names.setdefault(task_id, []).append(name)
+    return names
+
+
+def jsonl_lines(records):
+    for record in records:
+        yield json.dumps(record, ensure_ascii=False) + "\n"
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def csv_lines(records):
+    writer = csv.DictWriter(_Echo(), fieldnames=FIELDS)
+    yield writer.writeheader()
+    for record in records:
+        row = dict(record)
+        for field in LIST_FIELDS:
+            row[field] = CSV_LIST_SEPARATOR.join(row[field])
+        yield writer.writerow(row)
+
+
+def export_lines(records, fmt):
+    return jsonl_lines(records) if fmt == "jsonl" else csv_lines(records)
+
+
+def read_jsonl(stream):
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def read_csv(stream):
+    for row in csv.DictReader(stream):
+        for field in LIST_FIELDS:
+            value = row.get(field) or ""
+            row[field] = [name for name in value.split(CSV_LIST_SEPARATOR) if name]
+        row["is_completed"] = (row.get("is_completed") or "").lower() in ("1", "true", "yes")
+        yield row
+
+
+def read_records(stream, fmt):
+    return read_jsonl(stream) if fmt == "jsonl" else read_csv(stream)
+
+
+class TaskImporter:
+    """
+    Inserts task records in batches with bulk_create.
+
+    Related objects are resolved through name -> id maps loaded once up
+    front. Tasks whose name already exists are skipped. With
+    ``create_missing`` unknown task types and tags are created, otherwise
+    they are an error like unknown projects and assignees.
+    """
+
+    def __init__(self, batch_size=1000, create_missing=False):
+        self.batch_size = batch_size
+        self.create_missing = create_missing
+        self.task_types = dict(TaskType.objects.values_list("name", "id"))
+        self.projects = dict(Project.objects.values_list("name", "id"))
+        self.tags = dict(Tag.objects.values_list("name", "id"))
+        self.workers = dict(get_user_model().objects.values_list("username", "id"))
+        self.created = 0
+        self.skipped = 0
+
+    def run(self, records, progress=None):
+        for batch in batched(records, self.batch_size):
+            self.import_batch(batch)
+            if progress:
+                progress(self)
+
+    def import_batch(self, records):
+        with transaction.atomic():
+            names = [record["name"] for record in records]
+            seen = set(Task.objects.filter(name__in=names).values_list("name", flat=True))
+            unique = []
+            for record in records:
+                if record["name"] not in seen:
+                    seen.add(record["name"])
+                    unique.append(record)
+            records = unique
+            self.skipped += len(names) - len(records)
+
+            tasks = Task.objects.bulk_create(
+                [self.build_task(record) for record in records],
+                batch_size=self.batch_size,
+            )
+            tag_links, assignee_links = [], []
+            for task, record in zip(tasks, records):
+                tag_links += [
+                    Task.tags.through(task_id=task.pk, tag_id=self.resolve_tag(name))
+                    for name in set(record.get("tags") or ())
+                ]
+                assignee_links += [
+                    Task.assignees.through(
+                        task_id=task.pk,
+                        worker_id=self.resolve(self.workers, name, "assignee"),
+                    )
+                    for name in set(record.get("assignees") or ())
+                ]
+            Task.tags.through.objects.bulk_create(tag_links, batch_size=self.batch_size)
+            Task.assignees.through.objects.bulk_create(assignee_links, batch_size=self.batch_size)
+            related = defaultdict(lambda: defaultdict(list))
+            for link in tag_links:
+                related[link.task_id]["tags"].append(link.tag_id)
+            for link in assignee_links:
+                related[link.task_id]["assignees"].append(link.worker_id)
+            history.record_created(tasks, related)
+            search.reindex_tasks([task.pk for task in tasks])
+        self.created += len(tasks)
+
+    def build_task(self, record):
+        check_length(Task, "name", record["name"])
+        deadline = record.get("deadline") or None
+        if isinstance(deadline, str):
+            deadline = date.fromisoformat(deadline)
+        priority = record.get("priority") or Task._meta.get_field("priority").default
+        if priority not in TaskPriority.values:
+            raise TaskImportError(f"Unknown priority {priority!r} of task {record['name']!r}")
+        project = record.get("project") or None
+        return Task(
+            name=record["name"],
+            description=record.get("description") or "",
+            deadline=deadline,
+            is_completed=bool(record.get("is_completed")),
+            priority=priority,
+            task_type_id=self.resolve_task_type(record.get("task_type")),
+            project_id=self.resolve(self.projects, project, "project") if project else None,
+        )
+
+    def resolve(self, lookup, name, kind):
+        try:
+            return lookup[name]
+        except KeyError:
+            raise TaskImportError(f"Unknown {kind} {name!r}")
+
+    def resolve_task_type(self, name):
+        if name not in self.task_types and self.create_missing:
+            check_length(TaskType, "name", name)
+            self.task_types[name] = TaskType.objects.create(name=name).pk
+        return self.resolve(self.task_types, name, "task type")
+
+    def resolve_tag(self, name):
+        if name not in self.tags and self.create_missing:
+            check_length(Tag, "name", name)
+            self.tags[name] = Tag.objects.create(name=name).pk
+        return self.resolve(self.tags, name, "tag")
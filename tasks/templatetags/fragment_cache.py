@@ -0,0 +1,46 @@
+from django import template
+
+from tasks import caching
+
+register = template.Library()
+
+
+class CacheFragmentNode(template.Node):
+    def __init__(self, nodelist, name, dependencies):
+        self.nodelist = nodelist
+        self.name = name
+        self.dependencies = dependencies
+
+    def render(self, context):
+        dependencies = [dependency.resolve(context) for dependency in self.dependencies]
+        key = caching.fragment_key(self.name.resolve(context), dependencies)
+        content = caching.get_fragment(key)
+        if content is None:
+            content = self.nodelist.render(context)
+            caching.set_fragment(key, content)
+        return content
+
+
+@register.tag("cachefragment")
+def do_cache_fragment(parser, token):
+    """
+    Caches the enclosed fragment until one of its dependencies changes.
+
+        {% cachefragment "task_detail" task "tasks.Tag" %}
+            ...
+        {% endcachefragment %}
+
+    Model instances invalidate the fragment when that row changes,
+    "app_label.Model" strings when any row of the model changes, other
+    values are part of the key as they are.
+    """
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' tag requires a fragment name.")
+    nodelist = parser.parse(("endcachefragment",))
+    parser.delete_first_token()
+    return CacheFragmentNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        [parser.compile_filter(bit) for bit in bits[2:]],
+    )
@@ -3,9 +3,17 @@ from django import template
 register = template.Library()
 
 
+# Offset and cursor pagination address pages differently, a link that
+# sets one of them must drop the other.
+EXCLUSIVE_PARAMS = {"page": "cursor", "cursor": "page"}
+
+
 @register.simple_tag
 def query_transform(request, **kwargs):
     updated = request.GET.copy()
+    for key, other in EXCLUSIVE_PARAMS.items():
+        if kwargs.get(key) is not None:
+            updated.pop(other, 0)
     for key, value in kwargs.items():
         if value is not None:
             updated[key] = value
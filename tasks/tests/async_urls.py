@@ -0,0 +1,8 @@
+from django.urls import include, path
+
+from tasks.urls import urlpatterns, use_async_views
+
+urlpatterns = [
+    path("", include((use_async_views(urlpatterns), "tasks"), namespace="tasks")),
+    path("accounts/", include("django.contrib.auth.urls")),
+]
@@ -0,0 +1,84 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from tasks.api import RESOURCES
+from tasks.models import Position, Project, Tag, Task, TaskType, Team
+from tasks.pagination import NEXT, encode_cursor
+
+TASKS_URL = reverse("api:tasks-list")
+
+
+class ApiTests(TestCase):
+    def setUp(self):
+        position = Position.objects.create(name="developer")
+        self.user = get_user_model().objects.create_user(
+            username="alice", password="testpassword", position=position
+        )
+        self.client.force_login(self.user)
+        task_type = TaskType.objects.create(name="bug")
+        team = Team.objects.create(name="core")
+        self.project = Project.objects.create(name="api", team=team)
+        tags = [Tag.objects.create(name=f"tag{i}") for i in range(3)]
+        for i in range(5):
+            task = Task.objects.create(
+                name=f"task {i}", description="secret", task_type=task_type, project=self.project
+            )
+            task.tags.set(tags)
+            task.assignees.add(self.user)
+
+    def test_requires_login(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(TASKS_URL).status_code, 401)
+
+    def test_every_resource_lists(self):
+        for name in RESOURCES:
+            with self.subTest(resource=name):
+                res = self.client.get(reverse(f"api:{name}-list"))
+                self.assertEqual(res.status_code, 200)
+                self.assertTrue(res.json()["results"])
+
+    def test_sparse_fields(self):
+        res = self.client.get(TASKS_URL, {"fields": "id,name"})
+        self.assertEqual(res.json()["results"][0], {"id": Task.objects.first().pk, "name": "task 0"})
+        self.assertEqual(self.client.get(TASKS_URL, {"fields": "password"}).status_code, 400)
+
+    def test_includes_use_one_query_per_relation(self):
+        with CaptureQueriesContext(connection) as plain:
+            self.client.get(TASKS_URL)
+        with CaptureQueriesContext(connection) as included:
+            res = self.client.get(TASKS_URL, {"include": "assignees,tags,project"})
+        self.assertEqual(len(included), len(plain) + 3)
+        task = res.json()["results"][0]
+        self.assertEqual([tag["name"] for tag in task["tags"]], ["tag0", "tag1", "tag2"])
+        self.assertEqual(task["assignees"][0]["username"], "alice")
+        self.assertNotIn("password", task["assignees"][0])
+        self.assertEqual(task["project"]["name"], "api")
+
+    def test_cursor_pagination(self):
+        res = self.client.get(TASKS_URL, {"limit": 2, "fields": "name"}).json()
+        names = [task["name"] for task in res["results"]]
+        while res["next"]:
+            res = self.client.get(res["next"]).json()
+            names += [task["name"] for task in res["results"]]
+        self.assertEqual(names, [f"task {i}" for i in range(5)])
+        res = self.client.get(TASKS_URL, {"cursor": encode_cursor(NEXT, "task 1", "x")})
+        self.assertEqual(res.status_code, 400)
+
+    def test_etag_not_modified_without_queries(self):
+        etag = self.client.get(TASKS_URL)["ETag"]
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(TASKS_URL, headers={"if-none-match": etag})
+        self.assertEqual(res.status_code, 304)
+        self.assertFalse(any("tasks_task" in query["sql"] for query in queries))
+
+    def test_etag_changes_on_write(self):
+        url = reverse("api:projects-detail", kwargs={"pk": self.project.pk})
+        etag = self.client.get(url)["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.create(name="new", task_type=TaskType.objects.first(), project=self.project)
+        res = self.client.get(url, headers={"if-none-match": etag})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()["num_tasks"], 6)
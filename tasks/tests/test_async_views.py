@@ -0,0 +1,62 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from tasks.async_views import AsyncTaskListView
+from tasks.models import Position, Tag, Task, TaskType, Team
+
+
+@override_settings(ROOT_URLCONF="tasks.tests.async_urls")
+class AsyncViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        position = Position.objects.create(name="developer")
+        cls.user = get_user_model().objects.create_user(
+            username="alice", password="testpassword", position=position
+        )
+        Team.objects.create(name="core").workers.add(cls.user)
+        task_type = TaskType.objects.create(name="bug")
+        tag = Tag.objects.create(name="backend")
+        for i in range(10):
+            task = Task.objects.create(name=f"task {i}", task_type=task_type, is_completed=i % 2)
+            task.assignees.add(cls.user)
+            task.tags.add(tag)
+        cls.task = Task.objects.get(name="task 0")
+
+    def test_urls_resolve_to_async_views(self):
+        match = self.client.get(reverse("tasks:task-list")).resolver_match
+        self.assertIs(match.func.view_class, AsyncTaskListView)
+
+    async def test_login_required(self):
+        res = await self.async_client.get(reverse("tasks:task-list"))
+        self.assertEqual(res.status_code, 302)
+
+    async def test_read_views_render(self):
+        await self.async_client.aforce_login(self.user)
+        res = await self.async_client.get(reverse("tasks:index"))
+        self.assertEqual(res.status_code, 200)
+
+        res = await self.async_client.get(reverse("tasks:task-list"), {"page": 2})
+        self.assertEqual(res.context["page_obj"].number, 2)
+        self.assertEqual([task.name for task in res.context["task_list"]], ["task 7", "task 8", "task 9"])
+
+        res = await self.async_client.get(reverse("tasks:task-detail", kwargs={"pk": self.task.pk}))
+        self.assertContains(res, "backend")
+
+        res = await self.async_client.get(reverse("tasks:worker-detail", kwargs={"pk": self.user.pk}))
+        self.assertEqual(len(res.context["incompleted_tasks"]), 5)
+        self.assertEqual(len(res.context["completed_tasks"]), 5)
+        self.assertContains(res, "core")
+
+    async def test_missing_object(self):
+        await self.async_client.aforce_login(self.user)
+        res = await self.async_client.get(reverse("tasks:task-detail", kwargs={"pk": 999999}))
+        self.assertEqual(res.status_code, 404)
+
+    @override_settings(LIST_PAGINATION_MODE="cursor")
+    async def test_cursor_pagination(self):
+        await self.async_client.aforce_login(self.user)
+        res = await self.async_client.get(reverse("tasks:task-list"))
+        cursor = res.context["page_obj"].next_cursor
+        res = await self.async_client.get(reverse("tasks:task-list"), {"cursor": cursor})
+        self.assertEqual([task.name for task in res.context["task_list"]], ["task 7", "task 8", "task 9"])
@@ -0,0 +1,72 @@
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from tasks.forms import TaskForm
+from tasks.models import Position, Tag, TaskType
+
+WORKER_AUTOCOMPLETE_URL = reverse("tasks:worker-autocomplete")
+
+
+class AutocompleteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        position = Position.objects.create(name="developer")
+        cls.workers = get_user_model().objects.bulk_create(
+            get_user_model()(username=f"worker{i:02}", position=position) for i in range(30)
+        )
+
+    def setUp(self):
+        self.client.force_login(self.workers[0])
+
+    def test_endpoint_searches_and_pages(self):
+        res = self.client.get(WORKER_AUTOCOMPLETE_URL, {"term": "worker2"}).json()
+        self.assertEqual(len(res["results"]), 10)
+        self.assertFalse(res["pagination"]["more"])
+
+        first = self.client.get(WORKER_AUTOCOMPLETE_URL).json()
+        second = self.client.get(WORKER_AUTOCOMPLETE_URL, {"page": 2}).json()
+        self.assertTrue(first["pagination"]["more"])
+        self.assertFalse(second["pagination"]["more"])
+        self.assertEqual(len(first["results"]) + len(second["results"]), 30)
+
+    def test_endpoint_requires_login(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(WORKER_AUTOCOMPLETE_URL).status_code, 302)
+
+    def test_form_renders_only_selected_options(self):
+        html = str(TaskForm(initial={"assignees": [self.workers[3].pk]})["assignees"])
+        self.assertIn("worker03", html)
+        self.assertNotIn("worker04", html)
+        self.assertIn(f'data-autocomplete-url="{WORKER_AUTOCOMPLETE_URL}"', html)
+
+    def test_form_validates_against_full_queryset(self):
+        task_type = TaskType.objects.create(name="bug")
+        tag = Tag.objects.create(name="backend")
+        data = {
+            "name": "task",
+            "description": "description",
+            "priority": "high",
+            "deadline": date.today() + timedelta(days=1),
+            "task_type": task_type.pk,
+            "assignees": [self.workers[29].pk],
+            "tags": [tag.pk],
+        }
+        self.assertTrue(TaskForm(data).is_valid())
+        data["assignees"] = [999999]
+        self.assertFalse(TaskForm(data).is_valid())
+
+    def test_invalid_submitted_values_render(self):
+        form = TaskForm({
+            "name": "task",
+            "deadline": date.today() + timedelta(days=1),
+            "assignees": ["abc", self.workers[3].pk],
+            "project": "abc",
+        })
+        self.assertFalse(form.is_valid())
+        html = str(form["assignees"]) + str(form["project"])
+        self.assertIn("worker03", html)
+        res = self.client.post(reverse("tasks:worker-create"), {"username": "new", "position": "zz"})
+        self.assertEqual(res.status_code, 200)
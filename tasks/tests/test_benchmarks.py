@@ -0,0 +1,58 @@
+from io import StringIO
+import json
+import tempfile
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from tasks import jobs, urls as task_urls
+from tasks.benchmarks import percentile
+from tasks.models import Position, Project, Tag, Task, Team, Worker
+
+
+class GenerateFixturesTests(TestCase):
+    def generate(self, **sizes):
+        call_command("generate_fixtures", stdout=StringIO(), stderr=StringIO(), **sizes)
+
+    def test_builds_graph_with_consistent_counters(self):
+        self.generate(
+            positions=2, workers=20, teams=3, projects=4,
+            task_types=2, tags=5, tasks=200, batch_size=50,
+        )
+        self.assertEqual(Position.objects.count(), 2)
+        self.assertEqual(Worker.objects.count(), 20)
+        self.assertEqual(Task.objects.count(), 200)
+        self.assertTrue(Task.assignees.through.objects.exists())
+        self.assertEqual(
+            sum(Tag.objects.values_list("num_tasks", flat=True)),
+            Task.tags.through.objects.count(),
+        )
+        self.assertEqual(
+            sum(Project.objects.values_list("num_tasks", flat=True)),
+            Task.objects.filter(project__isnull=False).count(),
+        )
+        self.assertEqual(
+            sum(Team.objects.values_list("num_workers", flat=True)),
+            Team.workers.through.objects.count(),
+        )
+
+    def test_benchmark_reports_every_url(self):
+        self.generate(workers=5, teams=2, projects=2, tags=3, tasks=30)
+        Worker.objects.filter(pk=Worker.objects.first().pk).update(is_superuser=True)
+        out = StringIO()
+        with tempfile.TemporaryDirectory() as directory, override_settings(JOB_OUTPUT_DIR=directory):
+            # A finished export job for the job pages.
+            jobs.enqueue("export_tasks")
+            jobs.run_pending()
+            call_command("benchmark_urls", repeat=2, stdout=out, stderr=StringIO())
+        results = json.loads(out.getvalue())["results"]
+        self.assertEqual(set(results), {pattern.name for pattern in task_urls.urlpatterns})
+        for name, result in results.items():
+            self.assertEqual(result["status"], 200, name)
+            self.assertGreater(result["peak_memory_kb"], 0)
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 95), 95)
+        self.assertEqual(percentile([3.0], 95), 3.0)
@@ -0,0 +1,118 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from tasks import bulk, caching, dashboard
+from tasks.counters import recount
+from tasks.models import Position, Project, Tag, Task, TaskPriority, TaskType, Team
+from tasks.search import search_tasks
+
+BULK_URL = reverse("tasks:task-bulk")
+API_BULK_URL = reverse("api:task-bulk")
+
+
+class BulkActionTests(TestCase):
+    def setUp(self):
+        position = Position.objects.create(name="developer")
+        self.user = get_user_model().objects.create_user(
+            username="alice", password="testpassword", position=position
+        )
+        self.client.force_login(self.user)
+        task_type = TaskType.objects.create(name="bug")
+        team = Team.objects.create(name="core")
+        self.old_project = Project.objects.create(name="old", team=team)
+        self.new_project = Project.objects.create(name="new", team=team)
+        self.tag = Tag.objects.create(name="sprint")
+        self.tasks = [
+            Task.objects.create(name=f"task {i}", task_type=task_type, project=self.old_project)
+            for i in range(4)
+        ]
+        self.tasks[0].tags.add(self.tag)
+
+    def assertCountersConsistent(self):
+        counts = {
+            (model, obj.pk): obj.num_tasks
+            for model in (Project, Tag)
+            for obj in model.objects.all()
+        }
+        recount()
+        for (model, pk), count in counts.items():
+            self.assertEqual(model.objects.get(pk=pk).num_tasks, count)
+
+    def test_complete_and_priority_report_changed_rows(self):
+        tasks = Task.objects.filter(pk__in=[task.pk for task in self.tasks[:3]])
+        self.assertEqual(bulk.set_completed(tasks), 3)
+        self.assertEqual(bulk.set_completed(tasks), 0)
+        self.assertEqual(Task.objects.filter(is_completed=True).count(), 3)
+        self.assertEqual(bulk.set_priority(Task.objects.all(), TaskPriority.URGENT), 4)
+
+    def test_complete_drops_cached_worker_and_tag_pages(self):
+        self.tasks[0].assignees.add(self.user)
+        keys = [caching.object_key(type(self.user), self.user.pk), caching.object_key(Tag, self.tag.pk)]
+        versions = caching.get_versions(keys)
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk.set_completed(Task.objects.filter(pk=self.tasks[0].pk))
+        self.assertNotEqual(caching.get_versions(keys)[0], versions[0])
+        self.assertNotEqual(caching.get_versions(keys)[1], versions[1])
+
+    @mock.patch.object(bulk, "CHUNK_SIZE", 3)
+    def test_actions_run_in_chunks(self):
+        tasks = Task.objects.all()
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(bulk.set_priority(tasks, TaskPriority.HIGH), 4)
+        self.assertEqual(sum('"tasks_task"."id" IN' in query["sql"] for query in queries if query["sql"].startswith("UPDATE")), 2)
+        self.assertEqual(bulk.move_to_project(tasks, self.new_project), 4)
+        self.assertEqual(bulk.add_tags(tasks, [self.tag]), 3)
+        self.assertEqual(bulk.remove_tags(tasks, [self.tag]), 4)
+        self.assertEqual(Task.objects.filter(priority=TaskPriority.HIGH, project=self.new_project).count(), 4)
+        self.assertCountersConsistent()
+
+    def test_dashboard_is_dropped_on_commit(self):
+        stats = dashboard.get_stats()
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk.set_completed(Task.objects.all())
+            self.assertEqual(dashboard.get_stats()["num_completed"], stats["num_completed"])
+        self.assertEqual(dashboard.get_stats()["num_completed"], 4)
+
+    def test_move_to_project_keeps_counters(self):
+        self.assertEqual(bulk.move_to_project(Task.objects.filter(name__in=["task 0", "task 1"]), self.new_project), 2)
+        self.assertEqual(bulk.move_to_project(Task.objects.filter(name="task 2"), None), 1)
+        self.old_project.refresh_from_db()
+        self.assertEqual(self.old_project.num_tasks, 1)
+        self.assertCountersConsistent()
+
+    def test_tags_keep_counters_and_search_index(self):
+        self.assertEqual(bulk.add_tags(Task.objects.all(), [self.tag]), 3)
+        self.assertEqual(Task.tags.through.objects.count(), 4)
+        self.assertEqual(search_tasks(Task.objects.all(), "sprint").count(), 4)
+        self.assertCountersConsistent()
+
+        self.assertEqual(bulk.remove_tags(Task.objects.filter(name="task 3"), [self.tag]), 1)
+        self.assertEqual(search_tasks(Task.objects.all(), "sprint").count(), 3)
+        self.assertCountersConsistent()
+
+    def test_view_applies_action_to_selection(self):
+        res = self.client.post(BULK_URL, {
+            "action": "add_assignees",
+            "tasks": [self.tasks[0].pk, self.tasks[1].pk],
+            "assignees": [self.user.pk],
+        })
+        self.assertRedirects(res, reverse("tasks:task-list"))
+        self.assertEqual(self.user.tasks.count(), 2)
+
+    def test_view_select_all_uses_list_filters(self):
+        res = self.client.post(
+            f"{API_BULK_URL}?name=task 1",
+            {"action": "complete", "select_all": "on"},
+        )
+        self.assertEqual(res.json(), {"action": "complete", "affected": 1})
+        self.assertTrue(Task.objects.get(name="task 1").is_completed)
+
+    def test_view_requires_action_parameters(self):
+        res = self.client.post(API_BULK_URL, {"action": "set_priority", "tasks": [self.tasks[0].pk]})
+        self.assertEqual(res.status_code, 400)
+        self.assertIn("priority", res.json()["errors"])
@@ -0,0 +1,89 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.template import Context, Template
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from tasks import caching
+from tasks.models import Position, TaskType, Tag, Team, Project, Task
+
+
+class FragmentCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        caching.reset_stats()
+        self.position = Position.objects.create(name="developer")
+        self.user = get_user_model().objects.create_user(
+            username="alice", password="testpassword", position=self.position
+        )
+        self.task_type = TaskType.objects.create(name="bug")
+        self.project = Project.objects.create(name="billing", team=Team.objects.create(name="core"))
+        self.tag = Tag.objects.create(name="backend")
+        self.task = Task.objects.create(name="task", task_type=self.task_type, project=self.project)
+        self.task.tags.add(self.tag)
+
+    def render_tag_fragment(self, tag):
+        template = Template(
+            "{% load fragment_cache %}"
+            "{% cachefragment 'tags' tag %}{% for task in tag.tasks.all %}{{ task.name }}{% endfor %}"
+            "{% endcachefragment %}"
+        )
+        return template.render(Context({"tag": tag}))
+
+    def test_fragment_is_cached_until_dependency_changes(self):
+        self.assertEqual(self.render_tag_fragment(self.tag), "task")
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.render_tag_fragment(self.tag), "task")
+        self.assertEqual(len(queries), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task.name = "renamed"
+            self.task.save()
+        self.assertEqual(self.render_tag_fragment(self.tag), "renamed")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task.tags.remove(self.tag)
+        self.assertEqual(self.render_tag_fragment(self.tag), "")
+
+    def test_versions_are_dropped_on_commit(self):
+        keys = [caching.object_key(Tag, self.tag.pk), caching.object_key(Task, self.task.pk)]
+        versions = caching.get_versions(keys)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task.tags.remove(self.tag)
+            # A read before the commit sees the old rows, it must keep
+            # caching them under the old versions.
+            self.assertEqual(caching.get_versions(keys), versions)
+        new_versions = caching.get_versions(keys)
+        self.assertNotEqual(new_versions[0], versions[0])
+        self.assertNotEqual(new_versions[1], versions[1])
+
+    def test_stats_count_hits_and_misses(self):
+        self.render_tag_fragment(self.tag)
+        self.render_tag_fragment(self.tag)
+        self.assertEqual(caching.stats()["hits"], 1)
+        self.assertEqual(caching.stats()["misses"], 1)
+        self.assertEqual(cache.get_many(["fragment-stats:hits", "fragment-stats:misses"]), {})
+
+    def test_task_detail_reflects_related_changes(self):
+        self.client.force_login(self.user)
+        url = reverse("tasks:task-detail", kwargs={"pk": self.task.pk})
+        self.assertContains(self.client.get(url), "backend")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tag.name = "frontend"
+            self.tag.save()
+        self.assertContains(self.client.get(url), "frontend")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task.assignees.add(self.user)
+        self.assertContains(self.client.get(url), "alice")
+
+    def test_position_detail_reflects_new_worker(self):
+        self.client.force_login(self.user)
+        url = reverse("tasks:position-detail", kwargs={"pk": self.position.pk})
+        self.assertNotContains(self.client.get(url), "bob")
+        with self.captureOnCommitCallbacks(execute=True):
+            get_user_model().objects.create_user(
+                username="bob", password="testpassword", position=self.position
+            )
+        self.assertContains(self.client.get(url), "bob")
@@ -0,0 +1,95 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from tasks import caching
+from tasks.models import Position, TaskType, Tag, Team, Project, Task
+
+
+class CounterTests(TestCase):
+    def setUp(self):
+        self.position = Position.objects.create(name="developer")
+        self.worker = get_user_model().objects.create_user(
+            username="worker", password="testpassword", position=self.position
+        )
+        self.task_type = TaskType.objects.create(name="bug")
+        self.team = Team.objects.create(name="core")
+        self.project = Project.objects.create(name="billing", team=self.team)
+        self.tag = Tag.objects.create(name="backend")
+        self.task = Task.objects.create(
+            name="task", task_type=self.task_type, project=self.project
+        )
+
+    def assertCounts(self, obj, **counts):
+        obj.refresh_from_db()
+        for field, value in counts.items():
+            self.assertEqual(getattr(obj, field), value, field)
+
+    def test_foreign_key_counters(self):
+        self.assertCounts(self.position, num_workers=1)
+        self.assertCounts(self.task_type, num_tasks=1)
+        self.assertCounts(self.project, num_tasks=1)
+        self.assertCounts(self.team, num_projects=1)
+
+        other_type = TaskType.objects.create(name="feature")
+        self.task.task_type = other_type
+        self.task.project = None
+        self.task.save()
+        self.assertCounts(self.task_type, num_tasks=0)
+        self.assertCounts(other_type, num_tasks=1)
+        self.assertCounts(self.project, num_tasks=0)
+
+        self.task.delete()
+        self.assertCounts(other_type, num_tasks=0)
+
+    def test_m2m_counters_from_both_sides(self):
+        self.task.tags.add(self.tag)
+        self.assertCounts(self.tag, num_tasks=1)
+        other = Task.objects.create(name="other", task_type=self.task_type)
+        self.tag.tasks.add(other)
+        self.assertCounts(self.tag, num_tasks=2)
+        self.task.tags.clear()
+        self.assertCounts(self.tag, num_tasks=1)
+        self.tag.tasks.clear()
+        self.assertCounts(self.tag, num_tasks=0)
+
+        self.team.workers.add(self.worker)
+        self.assertCounts(self.team, num_workers=1)
+        self.worker.teams.remove(self.team)
+        self.assertCounts(self.team, num_workers=0)
+
+    def test_removing_missing_links_keeps_counts(self):
+        self.task.tags.add(self.tag)
+        other = Task.objects.create(name="other", task_type=self.task_type)
+        for _ in range(2):
+            other.tags.remove(self.tag)
+            self.tag.tasks.remove(other)
+        self.assertCounts(self.tag, num_tasks=1)
+
+        self.team.workers.add(self.worker)
+        other_team = Team.objects.create(name="other")
+        self.worker.teams.remove(other_team)
+        other_team.workers.remove(self.worker)
+        self.assertCounts(self.team, num_workers=1)
+        self.assertCounts(other_team, num_workers=0)
+
+    def test_deletes_release_m2m_counts(self):
+        self.task.tags.add(self.tag)
+        self.team.workers.add(self.worker)
+        self.task.delete()
+        self.worker.delete()
+        self.assertCounts(self.tag, num_tasks=0)
+        self.assertCounts(self.team, num_workers=0)
+
+    def test_recount_repairs_drift(self):
+        self.task.tags.add(self.tag)
+        Tag.objects.update(num_tasks=42)
+        Position.objects.update(num_workers=0)
+        version = caching.get_versions([caching.collection_key(Tag)])
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("recount", stdout=StringIO())
+        self.assertCounts(self.tag, num_tasks=1)
+        self.assertCounts(self.position, num_workers=1)
+        self.assertNotEqual(caching.get_versions([caching.collection_key(Tag)]), version)
@@ -0,0 +1,70 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DatabaseError, connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from tasks import dashboard
+from tasks.models import Position, TaskType, Team, Project, Task, TaskPriority
+
+
+class DashboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.task_type = TaskType.objects.create(name="bug")
+        self.team = Team.objects.create(name="core")
+        Project.objects.create(name="billing", team=self.team)
+        yesterday = timezone.localdate() - timezone.timedelta(days=1)
+        Task.objects.create(name="overdue", task_type=self.task_type, deadline=yesterday,
+                            priority=TaskPriority.URGENT)
+        Task.objects.create(name="done", task_type=self.task_type, is_completed=True)
+
+    def test_compute_stats(self):
+        with CaptureQueriesContext(connection) as queries:
+            stats = dashboard.compute_stats()
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(stats["num_tasks"], 2)
+        self.assertEqual(stats["num_projects"], 1)
+        self.assertEqual(stats["num_teams"], 1)
+        self.assertEqual(stats["num_overdue"], 1)
+        self.assertEqual(stats["by_priority"]["urgent"], {"open": 1, "completed": 0, "overdue": 1})
+        self.assertEqual(stats["by_priority"]["medium"]["completed"], 1)
+
+    def test_signals_update_cached_stats_in_place(self):
+        dashboard.refresh()
+        with self.captureOnCommitCallbacks(execute=True):
+            task = Task.objects.get(name="overdue")
+            task.is_completed = True
+            task.save()
+            Task.objects.create(name="new", task_type=self.task_type, priority=TaskPriority.LOW)
+            Task.objects.get(name="done").delete()
+            Team.objects.create(name="second")
+
+        cached = dashboard.get_stats()
+        fresh = dashboard.compute_stats()
+        for key in ("num_tasks", "num_open", "num_completed", "num_overdue", "num_teams", "by_priority"):
+            self.assertEqual(cached[key], fresh[key], key)
+
+    def test_rolled_back_changes_leave_cached_stats(self):
+        stats = dashboard.refresh()
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    Task.objects.create(name="new", task_type=self.task_type)
+                    raise DatabaseError
+            except DatabaseError:
+                pass
+        self.assertEqual(dashboard.get_stats(), stats)
+
+    def test_index_uses_cache(self):
+        position = Position.objects.create(name="developer")
+        user = get_user_model().objects.create_user(
+            username="alice", password="testpassword", position=position
+        )
+        self.client.force_login(user)
+        dashboard.refresh()
+        res = self.client.get(reverse("tasks:index"))
+        self.assertEqual(res.context["num_tasks"], 2)
+        self.assertContains(res, "Urgent")
@@ -0,0 +1,49 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from tasks.models import Position, TaskType, Tag, Task
+
+EXPORT_URL = reverse("tasks:task-export")
+
+
+class TaskExportTests(TestCase):
+    def setUp(self):
+        position = Position.objects.create(name="developer")
+        self.user = get_user_model().objects.create_user(
+            username="alice", password="testpassword", position=position
+        )
+        task_type = TaskType.objects.create(name="bug")
+        tag = Tag.objects.create(name="backend")
+        first = Task.objects.create(name="first task", task_type=task_type)
+        first.tags.add(tag)
+        first.assignees.add(self.user)
+        Task.objects.create(name="second task", task_type=task_type)
+
+    def test_login_required(self):
+        res = self.client.get(EXPORT_URL)
+        self.assertNotEqual(res.status_code, 200)
+
+    def test_streams_filtered_csv(self):
+        self.client.force_login(self.user)
+        res = self.client.get(EXPORT_URL, {"name": "first"})
+        self.assertTrue(res.streaming)
+        lines = b"".join(res.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertIn("first task", lines[1])
+        self.assertIn("alice", lines[1])
+
+    def test_unknown_format(self):
+        self.client.force_login(self.user)
+        res = self.client.get(EXPORT_URL, {"format": "xml"})
+        self.assertEqual(res.status_code, 404)
+
+    async def test_streams_ndjson_under_asgi(self):
+        await self.async_client.aforce_login(self.user)
+        res = await self.async_client.get(EXPORT_URL, {"format": "ndjson"})
+        content = b"".join([chunk async for chunk in res.streaming_content])
+        records = [json.loads(line) for line in content.decode().splitlines()]
+        self.assertEqual([record["name"] for record in records], ["first task", "second task"])
+        self.assertEqual(records[0]["tags"], ["backend"])
@@ -0,0 +1,102 @@
+from datetime import date, datetime, timezone as dt_timezone
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from tasks.facets import compute_counts, facet_filters, get_counts
+from tasks.models import Position, Project, Tag, Task, TaskType, Team
+
+TASK_LIST_URL = reverse("tasks:task-list")
+
+
+class FacetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.today = timezone.now().date()
+        self.user = get_user_model().objects.create_user(
+            username="user", password="password", position=Position.objects.create(name="developer")
+        )
+        self.bug = TaskType.objects.create(name="bug")
+        self.feature = TaskType.objects.create(name="feature")
+        self.project = Project.objects.create(name="api", team=Team.objects.create(name="core"))
+        self.tag = Tag.objects.create(name="backend")
+        self.late = Task.objects.create(
+            name="late", task_type=self.bug, priority="urgent", project=self.project,
+            deadline=self.today - timezone.timedelta(days=1),
+        )
+        self.late.tags.add(self.tag)
+        self.late.assignees.add(self.user)
+        self.done = Task.objects.create(
+            name="done", task_type=self.bug, priority="low", is_completed=True,
+        )
+        self.soon = Task.objects.create(
+            name="soon", task_type=self.feature, priority="urgent",
+            deadline=self.today + timezone.timedelta(days=3),
+        )
+        self.client.force_login(self.user)
+
+    def counts(self, **data):
+        return compute_counts(Task.objects.all(), facet_filters(data, self.today), self.today)
+
+    def test_counts(self):
+        counts = self.counts()
+        self.assertEqual(counts["priority"], [("urgent", "Urgent", 2), ("low", "Low", 1)])
+        self.assertEqual(counts["completion"], [("open", "Open", 2), ("completed", "Completed", 1)])
+        self.assertEqual(counts["task_type"], [(self.bug.pk, "bug", 2), (self.feature.pk, "feature", 1)])
+        self.assertEqual(counts["project"], [(self.project.pk, "api", 1)])
+        self.assertEqual(counts["tag"], [(self.tag.pk, "backend", 1)])
+        self.assertEqual(counts["assignee"], [(self.user.pk, "user", 1)])
+        self.assertEqual(
+            counts["deadline"],
+            [("overdue", "Overdue", 1), ("week", "Due within 7 days", 1), ("none", "No deadline", 1)],
+        )
+
+    def test_deadlines_use_the_local_day(self):
+        # 23:30 UTC is already the next day in Kyiv (TIME_ZONE).
+        now = datetime(2026, 10, 18, 23, 30, tzinfo=dt_timezone.utc)
+        Task.objects.filter(pk=self.soon.pk).update(deadline=date(2026, 10, 19))
+        Task.objects.filter(pk=self.late.pk).update(deadline=date(2026, 10, 18))
+        with mock.patch("django.utils.timezone.now", return_value=now):
+            counts = get_counts(Task.objects.all(), {})
+        self.assertEqual(
+            counts["deadline"],
+            [("overdue", "Overdue", 1), ("today", "Due today", 1), ("none", "No deadline", 1)],
+        )
+
+    def test_unknown_priority_is_counted_as_is(self):
+        Task.objects.filter(pk=self.done.pk).update(priority="critical")
+        self.assertIn(("critical", "critical", 1), self.counts()["priority"])
+
+    def test_facet_counts_ignore_own_filter(self):
+        counts = self.counts(priority=["urgent"], task_type=[self.bug.pk])
+        self.assertEqual(counts["priority"], [("low", "Low", 1), ("urgent", "Urgent", 1)])
+        self.assertEqual(counts["task_type"], [(self.bug.pk, "bug", 1), (self.feature.pk, "feature", 1)])
+        self.assertEqual(counts["completion"], [("open", "Open", 1)])
+
+    def test_list_filters(self):
+        response = self.client.get(TASK_LIST_URL, {"priority": ["urgent", "low"], "deadline": "overdue"})
+        self.assertEqual(list(response.context["task_list"]), [self.late])
+        response = self.client.get(TASK_LIST_URL, {"tag": self.tag.pk, "completion": "open"})
+        self.assertEqual(list(response.context["task_list"]), [self.late])
+        response = self.client.get(TASK_LIST_URL, {"assignee": self.user.pk, "completion": "completed"})
+        self.assertContains(response, "No tasks match the selected filters.")
+
+    def test_counts_are_cached_until_tasks_change(self):
+        params = {"priority": "urgent"}
+        self.client.get(TASK_LIST_URL, params)
+        with self.assertNumQueries(4):
+            self.client.get(TASK_LIST_URL, params)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.soon.priority = "low"
+            self.soon.save()
+        response = self.client.get(TASK_LIST_URL, params)
+        priorities = next(facet for facet in response.context["facets"] if facet["name"] == "priority")
+        self.assertEqual(
+            [(value["label"], value["count"], value["selected"]) for value in priorities["values"]],
+            [("Low", 2, False), ("Urgent", 1, True)],
+        )
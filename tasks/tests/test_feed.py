@@ -0,0 +1,125 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.http import Http404
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from tasks import bulk, feed
+from tasks.models import Position, Project, Task, TaskEvent, TaskType, Team
+
+
+class FeedTests(TestCase):
+    def setUp(self):
+        position = Position.objects.create(name="developer")
+        self.user = get_user_model().objects.create_user(
+            username="alice", password="testpassword", position=position
+        )
+        self.task_type = TaskType.objects.create(name="bug")
+        self.team = Team.objects.create(name="core")
+        self.team.workers.add(self.user)
+        self.project = Project.objects.create(name="core", team=self.team)
+        self.other_project = Project.objects.create(name="other", team=Team.objects.create(name="other"))
+
+    def task(self, name, project=None):
+        return Task.objects.create(name=name, task_type=self.task_type, project=project)
+
+    def feed_tasks(self, **kwargs):
+        events, cursor = feed.page(self.user, **kwargs)
+        return [event.task_id for event in events], cursor
+
+    def test_subscriptions_follow_assignments_and_teams(self):
+        assigned = self.task("assigned", self.other_project)
+        with self.captureOnCommitCallbacks(execute=True):
+            assigned.assignees.add(self.user)
+        self.assertEqual(feed.subscriptions(self.user), {"tasks": [assigned.pk], "projects": [self.project.pk]})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            assigned.assignees.remove(self.user)
+            self.other_project.team.workers.add(self.user)
+        self.assertEqual(feed.subscriptions(self.user),
+                         {"tasks": [], "projects": [self.project.pk, self.other_project.pk]})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.team = Team.objects.create(name="elsewhere")
+            self.project.save()
+        self.assertEqual(feed.subscriptions(self.user)["projects"], [self.other_project.pk])
+
+    def test_feed_merges_streams_newest_first(self):
+        in_project = self.task("in project", self.project)
+        elsewhere = self.task("elsewhere", self.other_project)
+        both = self.task("both", self.project)
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk.add_related(Task.objects.filter(pk__in=[elsewhere.pk, both.pk]), "assignees", [self.user])
+        unrelated = self.task("unrelated", self.other_project)
+        bulk.set_priority(Task.objects.all(), "high")
+
+        task_ids, cursor = self.feed_tasks()
+        followed = [task.pk for task in (in_project, elsewhere, both)]
+        expected = list(
+            TaskEvent.objects.filter(task_id__in=followed).order_by("-created_at", "-pk").values_list("task_id", flat=True)
+        )
+        self.assertEqual(task_ids, expected)
+        self.assertNotIn(unrelated.pk, task_ids)
+        self.assertIsNone(cursor)
+
+    def test_moved_task_keeps_its_old_events_in_the_old_project(self):
+        task = self.task("moving", self.project)
+        bulk.move_to_project(Task.objects.filter(pk=task.pk), self.other_project)
+        self.assertEqual(
+            list(TaskEvent.objects.filter(task_id=task.pk).order_by("pk").values_list("project_id", flat=True)),
+            [self.project.pk, self.other_project.pk],
+        )
+        task_id = task.pk
+        Task.objects.get(pk=task_id).delete()
+        self.assertEqual(TaskEvent.objects.filter(task_id=task_id).latest("pk").project_id, self.other_project.pk)
+
+    def test_cursor_paging(self):
+        tasks = [self.task(f"task {i}", self.project) for i in range(5)]
+        TaskEvent.objects.update(created_at=timezone.now() - timedelta(hours=1))
+        for task in tasks[:3]:
+            task.priority = "low"
+            task.save()
+
+        pages, cursor = [], None
+        while True:
+            task_ids, cursor = self.feed_tasks(cursor=cursor, limit=3)
+            pages.append(task_ids)
+            if cursor is None:
+                break
+        self.assertEqual([len(page) for page in pages], [3, 3, 2])
+        ids = [task.pk for task in tasks]
+        self.assertEqual(sum(pages, []), ids[2::-1] + ids[::-1])
+
+        with self.assertRaises(Http404):
+            feed.page(self.user, cursor="garbage")
+
+    @mock.patch.object(feed, "MAX_SUBQUERY_STREAMS", 2)
+    def test_query_count_does_not_grow_with_teams(self):
+        def count_queries():
+            feed.subscriptions(self.user)
+            with CaptureQueriesContext(connection) as queries:
+                feed.page(self.user)
+            return len(queries)
+
+        self.task("task", self.project).assignees.add(self.user)
+        few = count_queries()
+        for i in range(5):
+            team = Team.objects.create(name=f"team {i}")
+            team.workers.add(self.user)
+            self.task(f"task {i}", Project.objects.create(name=f"project {i}", team=team)).assignees.add(self.user)
+        self.assertEqual(count_queries(), few)
+
+    def test_feed_page(self):
+        self.client.force_login(self.user)
+        task = self.task("fix login", self.project)
+        task.priority = "urgent"
+        task.save()
+        res = self.client.get(reverse("tasks:feed"))
+        self.assertContains(res, "fix login")
+        self.assertContains(res, "Medium &rarr; Urgent")
+        self.assertEqual(self.client.get(reverse("tasks:feed"), {"cursor": "x"}).status_code, 404)
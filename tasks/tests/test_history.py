@@ -0,0 +1,142 @@
+import io
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from tasks import bulk, history
+from tasks.models import Position, Project, Tag, Task, TaskEvent, TaskEventKind, TaskType, Team
+from tasks.task_io import TaskImporter
+from tasks.views import TaskHistoryView
+
+
+class TaskHistoryTests(TestCase):
+    def setUp(self):
+        position = Position.objects.create(name="developer")
+        self.user = get_user_model().objects.create_user(
+            username="alice", password="testpassword", position=position
+        )
+        self.client.force_login(self.user)
+        self.task_type = TaskType.objects.create(name="bug")
+        self.project = Project.objects.create(name="core", team=Team.objects.create(name="core"))
+        self.tags = [Tag.objects.create(name=f"tag{i}") for i in range(3)]
+
+    def post_task(self, url, **data):
+        return self.client.post(url, {
+            "name": "fix login",
+            "description": "broken",
+            "priority": "medium",
+            "task_type": self.task_type.pk,
+            "deadline": timezone.now().date() + timedelta(days=7),
+            **data,
+        })
+
+    def events(self, task):
+        return list(TaskEvent.objects.filter(task_id=task.pk).order_by("pk"))
+
+    def test_form_save_writes_one_event_with_field_and_link_changes(self):
+        self.post_task(reverse("tasks:task-create"), tags=[self.tags[0].pk, self.tags[1].pk])
+        task = Task.objects.get()
+        self.post_task(
+            reverse("tasks:task-update", kwargs={"pk": task.pk}),
+            priority="urgent",
+            tags=[self.tags[1].pk, self.tags[2].pk],
+            assignees=[self.user.pk],
+        )
+
+        created, updated = self.events(task)
+        self.assertEqual(created.kind, TaskEventKind.CREATED)
+        self.assertEqual(created.changes["tags"], [self.tags[0].pk, self.tags[1].pk])
+        self.assertEqual(updated.kind, TaskEventKind.UPDATED)
+        self.assertEqual(updated.changes, {
+            "priority": ["medium", "urgent"],
+            "tags": {"add": [self.tags[2].pk], "remove": [self.tags[0].pk]},
+            "assignees": {"add": [self.user.pk]},
+        })
+        self.assertEqual({created.actor, updated.actor}, {self.user})
+
+    def test_unchanged_save_writes_nothing(self):
+        task = Task.objects.create(name="task", description="", task_type=self.task_type)
+        task.save()
+        self.assertEqual(len(self.events(task)), 1)
+
+    def test_reverse_links_and_clear(self):
+        tasks = [Task.objects.create(name=f"task {i}", description="", task_type=self.task_type) for i in range(2)]
+        self.tags[0].tasks.add(*tasks)
+        self.tags[0].tasks.clear()
+        for task in tasks:
+            changes = [event.changes for event in self.events(task)[1:]]
+            self.assertEqual(changes, [{"tags": {"add": [self.tags[0].pk]}}, {"tags": {"remove": [self.tags[0].pk]}}])
+
+    def test_removing_missing_links_writes_nothing(self):
+        task = Task.objects.create(name="task", description="", task_type=self.task_type)
+        task.tags.add(self.tags[0])
+        task.tags.remove(self.tags[0], self.tags[1])
+        task.tags.remove(self.tags[2])
+        task.assignees.remove(self.user)
+        changes = [event.changes for event in self.events(task)[1:]]
+        self.assertEqual(changes, [{"tags": {"add": [self.tags[0].pk]}}, {"tags": {"remove": [self.tags[0].pk]}}])
+
+    def test_bulk_actions_and_delete(self):
+        tasks = [Task.objects.create(name=f"task {i}", description="", task_type=self.task_type) for i in range(2)]
+        queryset = Task.objects.filter(pk__in=[task.pk for task in tasks])
+        bulk.set_priority(queryset, "high")
+        bulk.move_to_project(queryset, self.project)
+        bulk.add_tags(queryset, self.tags[:1])
+        task_id = tasks[0].pk
+        tasks[0].delete()
+
+        changes = [(event.kind, event.changes) for event in TaskEvent.objects.filter(task_id=task_id).order_by("pk")[1:]]
+        self.assertEqual(changes, [
+            (TaskEventKind.UPDATED, {"priority": ["medium", "high"]}),
+            (TaskEventKind.UPDATED, {"project": [None, self.project.pk]}),
+            (TaskEventKind.UPDATED, {"tags": {"add": [self.tags[0].pk]}}),
+            (TaskEventKind.DELETED, {}),
+        ])
+
+    def test_import_writes_created_events(self):
+        TaskImporter().run([{"name": "imported", "task_type": "bug", "tags": ["tag1"]}])
+        (event,) = self.events(Task.objects.get(name="imported"))
+        self.assertEqual((event.kind, event.changes["tags"]), (TaskEventKind.CREATED, [self.tags[1].pk]))
+
+    @mock.patch.object(TaskHistoryView, "paginate_by", 3)
+    def test_history_page(self):
+        task = Task.objects.create(name="task", description="", task_type=self.task_type)
+        for priority in ["high", "low", "urgent"]:
+            task.priority = priority
+            task.save()
+        task.tags.add(self.tags[0])
+
+        url = reverse("tasks:task-history", kwargs={"pk": task.pk})
+        res = self.client.get(url)
+        self.assertContains(res, "tag0")
+        self.assertContains(res, "Low &rarr; Urgent")
+        self.assertEqual(len(res.context["events"]), 3)
+        res = self.client.get(url, {"before": res.context["before"]})
+        self.assertEqual([event.kind for event, _ in res.context["events"]],
+                         [TaskEventKind.UPDATED, TaskEventKind.CREATED])
+        self.assertNotIn("before", res.context)
+
+    def test_compaction_folds_old_events(self):
+        task = Task.objects.create(name="task", description="", task_type=self.task_type)
+        task.tags.add(*self.tags[:2])
+        task.priority = "low"
+        task.save()
+        gone = Task.objects.create(name="gone", description="", task_type=self.task_type)
+        gone_id = gone.pk
+        gone.delete()
+        TaskEvent.objects.update(created_at=timezone.now() - timedelta(days=100))
+        task.tags.remove(self.tags[0])
+        expected = history.state_of(task, {"tags": [self.tags[1].pk]})
+
+        call_command("compact_task_history", days=90, stdout=io.StringIO())
+
+        snapshot, recent = self.events(task)
+        self.assertEqual(snapshot.kind, TaskEventKind.SNAPSHOT)
+        self.assertEqual(history.fold([snapshot, recent]), {**expected, "deadline": None})
+        self.assertFalse(TaskEvent.objects.filter(task_id=gone_id).exists())
+
@@ -0,0 +1,27 @@
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+
+from tasks.models import Task
+
+
+class ExplainIndexesCommandTests(TestCase):
+    def test_reports_plans_and_rolls_back(self):
+        out = StringIO()
+        call_command("explain_indexes", tasks=500, batch_size=100, locks_tasks=True, stdout=out, stderr=StringIO())
+        output = out.getvalue()
+        self.assertIn("without indexes", output)
+        self.assertIn("task_priority_deadline_idx", output)
+        self.assertFalse(Task.objects.exists())
+
+    def test_refuses_to_lock_tasks_without_debug(self):
+        with self.assertRaisesMessage(CommandError, "--i-know-this-locks-tasks"):
+            call_command("explain_indexes", tasks=10, stdout=StringIO(), stderr=StringIO())
+
+    @skipUnless(connection.vendor == "sqlite", "Planner choice depends on table statistics")
+    def test_open_tasks_by_name_use_partial_index(self):
+        plan = Task.objects.filter(is_completed=False).order_by("name").explain()
+        self.assertIn("task_open_name_idx", plan)
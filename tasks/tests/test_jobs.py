@@ -0,0 +1,174 @@
+import io
+import os
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from tasks import caching, jobs
+from tasks.models import Job, JobStatus, Position, Project, Tag, Task, TaskType, Team
+
+
+def fail(job):
+    raise ValueError("boom")
+
+
+def handed_over(job):
+    # requeue_stale() gave the job to another worker meanwhile.
+    Job.objects.filter(pk=job.pk).update(locked_by="other", started_at=timezone.now())
+    return {"value": 1}
+
+
+def die(job_id):
+    os._exit(1)
+
+
+class JobQueueTests(TestCase):
+    def test_enqueue_unknown_job(self):
+        with self.assertRaises(KeyError):
+            jobs.enqueue("missing")
+
+    def test_claim_hands_out_each_due_job_once(self):
+        first = jobs.enqueue("noop", {"value": 1})
+        second = jobs.enqueue("noop", {"value": 2})
+        jobs.enqueue("noop", run_after=timezone.now() + timedelta(hours=1))
+
+        claimed = jobs.claim(limit=5, worker_id="worker-a")
+        self.assertEqual([job.pk for job in claimed], [first.pk, second.pk])
+        self.assertEqual({(job.status, job.attempts, job.locked_by) for job in claimed},
+                         {(JobStatus.RUNNING, 1, "worker-a")})
+        self.assertEqual(jobs.claim(limit=5), [])
+
+    def test_execute_stores_result(self):
+        job = jobs.enqueue("noop", {"value": 1})
+        jobs.claim()
+        self.assertEqual(jobs.execute(job.pk), JobStatus.SUCCEEDED)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.progress, job.result), (JobStatus.SUCCEEDED, 100, {"value": 1}))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_recount_drops_cached_counts(self):
+        key = caching.collection_key(Tag)
+        version = caching.get_versions([key])[0]
+        job = jobs.enqueue("recount")
+        jobs.claim()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(jobs.execute(job.pk), JobStatus.SUCCEEDED)
+        self.assertNotEqual(caching.get_versions([key])[0], version)
+
+    @mock.patch.dict(jobs.JOBS, {"handed_over": handed_over})
+    def test_late_finish_leaves_a_requeued_job_alone(self):
+        job = jobs.enqueue("handed_over")
+        jobs.claim()
+        jobs.execute(job.pk)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by, job.result), (JobStatus.RUNNING, "other", None))
+
+    @override_settings(JOB_RETRY_BACKOFF=10, JOB_RETRY_MAX_BACKOFF=15)
+    @mock.patch.dict(jobs.JOBS, {"fail": fail})
+    def test_failed_job_is_retried_with_backoff(self):
+        job = jobs.enqueue("fail", max_attempts=3)
+        backoffs = []
+        for _ in range(3):
+            Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+            jobs.claim()
+            before = timezone.now()
+            self.assertEqual(jobs.execute(job.pk), JobStatus.FAILED)
+            job.refresh_from_db()
+            backoffs.append(round((job.run_after - before).total_seconds()))
+
+        self.assertEqual(backoffs[:2], [10, 15])
+        self.assertEqual((job.status, job.attempts), (JobStatus.FAILED, 3))
+        self.assertIn("ValueError: boom", job.error)
+
+    @override_settings(JOB_TIMEOUT=60)
+    def test_requeue_stale(self):
+        job = jobs.enqueue("noop")
+        jobs.claim()
+        self.assertEqual(jobs.requeue_stale(), 0)
+        Job.objects.filter(pk=job.pk).update(started_at=timezone.now() - timedelta(minutes=2))
+        self.assertEqual(jobs.requeue_stale(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by), (JobStatus.QUEUED, ""))
+
+    @override_settings(JOB_RETRY_BACKOFF=0)
+    @mock.patch.object(jobs, "execute", die)
+    @mock.patch("signal.signal")
+    def test_worker_survives_a_dying_process(self, _):
+        job = jobs.enqueue("noop")
+        stderr = io.StringIO()
+        call_command("run_worker", processes=1, burst=True, poll_interval=0.01, stderr=stderr)
+        # Every attempt broke the pool, the worker gave the job back and
+        # started a new pool until the attempts ran out.
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.locked_by), (JobStatus.FAILED, job.max_attempts, ""))
+        self.assertEqual(stderr.getvalue().count("A worker process died"), job.max_attempts)
+
+
+class JobViewTests(TestCase):
+    def setUp(self):
+        position = Position.objects.create(name="developer")
+        self.user = get_user_model().objects.create_user(
+            username="alice", password="testpassword", position=position
+        )
+        self.other = get_user_model().objects.create_user(
+            username="bob", password="testpassword", position=position
+        )
+        self.client.force_login(self.user)
+        task_type = TaskType.objects.create(name="bug")
+        self.project = Project.objects.create(name="core", team=Team.objects.create(name="core"))
+        self.tag = Tag.objects.create(name="sprint")
+        self.tasks = [
+            Task.objects.create(name=f"task {i}", task_type=task_type, project=self.project)
+            for i in range(3)
+        ]
+
+    def test_bulk_action_in_background(self):
+        res = self.client.post(
+            reverse("tasks:task-bulk") + "?name=task",
+            {"action": "add_tags", "select_all": "on", "tags": [self.tag.pk], "in_background": "on"},
+        )
+        job = Job.objects.get()
+        self.assertRedirects(res, reverse("tasks:job-detail", kwargs={"pk": job.pk}))
+        self.assertEqual(self.tag.tasks.count(), 0)
+
+        jobs.run_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.result, {"affected": 3})
+        self.assertEqual(self.tag.tasks.count(), 3)
+        self.tag.refresh_from_db()
+        self.assertEqual(self.tag.num_tasks, 3)
+
+    def test_export_in_background(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(JOB_OUTPUT_DIR=directory):
+            res = self.client.post(reverse("tasks:task-export-job") + "?name=task+1", {"format": "jsonl"})
+            job = Job.objects.get()
+            self.assertRedirects(res, reverse("tasks:job-detail", kwargs={"pk": job.pk}))
+            download = reverse("tasks:job-download", kwargs={"pk": job.pk})
+            self.assertEqual(self.client.get(download).status_code, 404)
+
+            jobs.run_pending()
+            res = self.client.get(download)
+            self.assertEqual(res.status_code, 200)
+            content = b"".join(res.streaming_content).decode()
+            res.close()
+        self.assertEqual(content.count("\n"), 1)
+        self.assertIn('"task 1"', content)
+
+    def test_workers_only_see_their_jobs(self):
+        own = jobs.enqueue("noop", created_by=self.user)
+        other = jobs.enqueue("noop", created_by=self.other)
+        res = self.client.get(reverse("tasks:job-list"))
+        self.assertEqual(list(res.context["job_list"]), [own])
+        res = self.client.get(reverse("tasks:job-detail", kwargs={"pk": other.pk}))
+        self.assertEqual(res.status_code, 404)
+
+        self.user.is_staff = True
+        self.user.save()
+        res = self.client.get(reverse("tasks:job-list"))
+        self.assertEqual(set(res.context["job_list"]), {own, other})
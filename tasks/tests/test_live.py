@@ -0,0 +1,126 @@
+import asyncio
+import json
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import OperationalError
+from django.test import TestCase, override_settings
+
+from tasks import live
+from tasks.models import Position, Task, TaskEvent, TaskEventKind, TaskType
+
+
+class IdleBroker:
+    async def listen(self):
+        await asyncio.Event().wait()
+        yield
+
+
+def message(task_id, event_id=1):
+    return {"id": event_id, "task": task_id, "kind": "updated", "project": None, "actor": None}
+
+
+class HubTests(TestCase):
+    async def test_topics_and_backpressure(self):
+        hub = live.Hub(IdleBroker(), queue_size=2)
+        every_task = hub.subscribe((live.ALL_TASKS,))
+        one_task = hub.subscribe(("task:1",))
+        for event_id in range(1, 4):
+            hub.publish(message(2, event_id))
+        hub.publish(message(1, 4))
+
+        # The list page fell three messages behind its buffer of two.
+        self.assertEqual(await every_task.get(1), live.RESYNC)
+        self.assertEqual(hub.dropped, 2)
+        self.assertEqual(await one_task.get(1), message(1, 4))
+        self.assertEqual(await one_task.get(0.01), live.HEARTBEAT)
+
+        hub.publish(message(1, 5))
+        self.assertEqual((await every_task.get(1))["id"], 5)
+
+        hub.unsubscribe(one_task)
+        self.assertEqual(await one_task.get(1), live.CLOSED)
+        hub.unsubscribe(every_task)
+        self.assertEqual((hub.connections, dict(hub.subscriptions), hub.pump), (0, {}, None))
+
+    def test_event_log_broker_reads_new_events(self):
+        task_type = TaskType.objects.create(name="bug")
+        broker = live.EventLogBroker()
+        task = Task.objects.create(name="task", task_type=task_type)
+        last = broker.latest()
+        task.priority = "high"
+        task.save()
+        TaskEvent.objects.create(task=task, kind=TaskEventKind.SNAPSHOT, changes={})
+        task_id = task.pk
+        task.delete()
+
+        self.assertEqual([(m["task"], m["kind"]) for m in broker.read(last)],
+                         [(task_id, "updated"), (task_id, "deleted")])
+
+    def test_event_log_broker_recovers_from_a_failed_read(self):
+        task = Task.objects.create(name="task", task_type=TaskType.objects.create(name="bug"))
+        broker = live.EventLogBroker()
+        with mock.patch.object(live, "close_old_connections") as close_old_connections:
+            with mock.patch.object(TaskEvent.objects, "filter", side_effect=OperationalError("server closed the connection")):
+                with self.assertRaises(OperationalError):
+                    broker.read(0)
+            messages = broker.read(0)
+        # Each poll gets the chance to replace the broken connection.
+        self.assertEqual(close_old_connections.call_count, 2)
+        self.assertEqual([message["task"] for message in messages], [task.pk])
+
+
+@override_settings(LIVE_UPDATES=True)
+class LiveUpdatesEndpointTests(TestCase):
+    def setUp(self):
+        position = Position.objects.create(name="developer")
+        user = get_user_model().objects.create_user(
+            username="alice", password="testpassword", position=position
+        )
+        self.client.force_login(user)
+        self.cookie = f"{settings.SESSION_COOKIE_NAME}={self.client.cookies[settings.SESSION_COOKIE_NAME].value}"
+        self.hub = live.Hub(IdleBroker())
+        patcher = mock.patch.object(live, "_hub", self.hub)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def start(self, cookie="", query_string=b""):
+        sent = asyncio.Queue()
+        self.disconnected = asyncio.Event()
+
+        async def receive():
+            await self.disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": settings.LIVE_UPDATES_PATH,
+            "query_string": query_string,
+            "headers": [(b"cookie", cookie.encode())],
+        }
+        django_app = mock.AsyncMock()
+        app = live.LiveUpdatesRouter(django_app)
+        return asyncio.create_task(app(scope, receive, sent.put)), sent
+
+    async def test_requires_login(self):
+        app, sent = self.start()
+        await app
+        self.assertEqual((await sent.get())["status"], 403)
+
+    async def test_streams_the_task_changes(self):
+        app, sent = self.start(self.cookie, b"task=7")
+        start = await sent.get()
+        self.assertEqual((start["status"], dict(start["headers"])[b"content-type"]), (200, b"text/event-stream"))
+        self.assertEqual((await sent.get())["body"], b"retry: 5000\n\n")
+
+        self.hub.publish(message(8, 1))
+        self.hub.publish(message(7, 2))
+        body = (await sent.get())["body"].decode()
+        self.assertTrue(body.startswith("id: 2\nevent: task\n"))
+        self.assertEqual(json.loads(body.split("data: ")[1]), message(7, 2))
+
+        self.disconnected.set()
+        await app
+        self.assertEqual(self.hub.connections, 0)
@@ -73,6 +73,7 @@ class ModelTests(TestCase):
             username="test_second_username",
             position=position
         )
+        position.refresh_from_db()
         self.assertEqual(position.worker_count, 2)
 
     def test_task_type_task_count(self):
@@ -89,6 +90,7 @@ class ModelTests(TestCase):
             task_type=task_type,
             project=project,
         )
+        task_type.refresh_from_db()
         self.assertEqual(task_type.task_count, 2)
 
     def test_tag_task_count(self):
@@ -108,6 +110,7 @@ class ModelTests(TestCase):
         )
         first_task.tags.add(tag)
         second_task.tags.add(tag)
+        tag.refresh_from_db()
         self.assertEqual(tag.task_count, 2)
 
     def test_task_is_overdue(self):
@@ -0,0 +1,49 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from tasks.models import Position, TaskType, Task
+
+OVERDUE_URL = reverse("tasks:task-overdue-list")
+
+
+class OverdueQuerySetTests(TestCase):
+    def setUp(self):
+        task_type = TaskType.objects.create(name="bug")
+        today = timezone.now().date()
+        self.late = Task.objects.create(
+            name="late", task_type=task_type, deadline=today - timezone.timedelta(days=1)
+        )
+        self.done = Task.objects.create(
+            name="done", task_type=task_type, is_completed=True,
+            deadline=today - timezone.timedelta(days=1),
+        )
+        self.soon = Task.objects.create(
+            name="soon", task_type=task_type, deadline=today + timezone.timedelta(days=2)
+        )
+        self.later = Task.objects.create(
+            name="later", task_type=task_type, deadline=today + timezone.timedelta(days=30)
+        )
+        self.undated = Task.objects.create(name="undated", task_type=task_type)
+
+    def test_overdue(self):
+        self.assertEqual(list(Task.objects.overdue()), [self.late])
+
+    def test_due_within(self):
+        self.assertEqual(list(Task.objects.due_within(7)), [self.soon])
+
+    def test_with_overdue_matches_is_overdue(self):
+        for task in Task.objects.with_overdue():
+            self.assertEqual(task.overdue, task.is_overdue(), task.name)
+
+    def test_overdue_view(self):
+        position = Position.objects.create(name="developer")
+        user = get_user_model().objects.create_user(
+            username="alice", password="testpassword", position=position
+        )
+        self.client.force_login(user)
+        res = self.client.get(OVERDUE_URL)
+        self.assertEqual(list(res.context["task_list"]), [self.late])
+        res = self.client.get(OVERDUE_URL, {"due_within": 7})
+        self.assertEqual(list(res.context["task_list"]), [self.soon])
@@ -0,0 +1,81 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.http import Http404
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from tasks.models import Position, Project, TaskType, Task
+from tasks.pagination import NEXT, CursorPaginator, decode_cursor, encode_cursor
+from tasks.templatetags.query_transform import query_transform
+
+TASK_URL = reverse("tasks:task-list")
+
+
+class CursorPaginatorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        task_type = TaskType.objects.create(name="test")
+        for i in range(10):
+            Task.objects.create(name=f"task {i:02}", task_type=task_type)
+
+    def test_walks_forward_and_back(self):
+        paginator = CursorPaginator(Task.objects.all(), 4, "name")
+        first = paginator.page()
+        self.assertEqual([t.name for t in first], ["task 00", "task 01", "task 02", "task 03"])
+        self.assertFalse(first.has_previous())
+
+        second = paginator.page(first.next_cursor)
+        third = paginator.page(second.next_cursor)
+        self.assertEqual([t.name for t in third], ["task 08", "task 09"])
+        self.assertFalse(third.has_next())
+
+        back = paginator.page(third.previous_cursor)
+        self.assertEqual(list(back), list(second))
+        self.assertTrue(back.has_previous())
+        self.assertEqual(list(paginator.page(back.previous_cursor)), list(first))
+
+    def test_page_runs_no_count(self):
+        paginator = CursorPaginator(Task.objects.all(), 4, "name")
+        with CaptureQueriesContext(connection) as queries:
+            paginator.page()
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("COUNT", queries[0]["sql"])
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(Http404):
+            decode_cursor("not a cursor")
+        for value, pk in [("task", "1"), (None, 1), (["task"], 1), ("task", True)]:
+            with self.assertRaises(Http404):
+                decode_cursor(encode_cursor(NEXT, value, pk))
+        paginator = CursorPaginator(Project.objects.all(), 4, "num_tasks")
+        with self.assertRaises(Http404):
+            paginator.page(encode_cursor(NEXT, "many", 1))
+
+
+@override_settings(LIST_PAGINATION_MODE="cursor")
+class CursorPaginationViewTests(TestCase):
+    def setUp(self):
+        position = Position.objects.create(name="test")
+        self.user = get_user_model().objects.create_user(
+            username="testuser",
+            password="testpassword",
+            position=position,
+        )
+        self.client.force_login(self.user)
+        task_type = TaskType.objects.create(name="test")
+        for i in range(10):
+            Task.objects.create(name=f"task {i:02}", task_type=task_type)
+
+    def test_task_list_uses_cursor(self):
+        res = self.client.get(TASK_URL)
+        page = res.context["page_obj"]
+        self.assertTrue(res.context["is_paginated"])
+        self.assertContains(res, f"cursor={page.next_cursor}")
+
+        res = self.client.get(TASK_URL, {"cursor": page.next_cursor})
+        self.assertEqual([t.name for t in res.context["object_list"]], ["task 07", "task 08", "task 09"])
+
+    def test_query_transform_swaps_page_and_cursor(self):
+        request = RequestFactory().get(TASK_URL, {"name": "task", "page": 2})
+        self.assertEqual(query_transform(request, cursor="abc"), "name=task&cursor=abc")
@@ -0,0 +1,73 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from tasks.models import Position
+from tasks.profiling import metrics, render_prometheus
+
+METRICS_URL = reverse("metrics")
+
+
+class ProfilingTests(TestCase):
+    def setUp(self):
+        position = Position.objects.create(name="developer")
+        self.user = get_user_model().objects.create_user(
+            username="user", password="password", position=position
+        )
+        self.staff = get_user_model().objects.create_user(
+            username="staff", password="password", position=position, is_staff=True
+        )
+        metrics.reset()
+
+    def test_records_per_route_metrics(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse("tasks:task-list"))
+        self.client.get(reverse("tasks:task-list"))
+        stats = metrics.snapshot()["tasks:task-list", "GET"]
+        self.assertEqual(stats["requests"], 2)
+        self.assertGreater(stats["queries"], 0)
+        self.assertGreater(stats["template"], 0)
+        self.assertGreaterEqual(stats["wall"], stats["db"] + stats["template"])
+
+    def test_times_render_shortcut_views(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse("tasks:index"))
+        self.assertGreater(metrics.snapshot()["tasks:index", "GET"]["template"], 0)
+
+    def test_metrics_endpoint(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse("tasks:index"))
+        self.assertEqual(self.client.get(METRICS_URL).status_code, 403)
+
+        self.client.force_login(self.staff)
+        response = self.client.get(METRICS_URL)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'task_manager_requests_total{view="tasks:index",method="GET"} 1')
+        self.assertContains(response, "# TYPE task_manager_request_duration_seconds histogram")
+
+    @override_settings(PROFILING_METRICS_TOKEN="secret")
+    def test_metrics_token(self):
+        self.assertEqual(self.client.get(METRICS_URL).status_code, 302)
+        response = self.client.get(METRICS_URL, headers={"Authorization": "Bearer secret"})
+        self.assertEqual(response.status_code, 200)
+
+    def test_histogram_buckets(self):
+        metrics.record("tasks:index", "GET", 200, 0.03, 0.01, 2, 0.0)
+        metrics.record("tasks:index", "GET", 500, 20, 0.01, 2, 0.0)
+        text = render_prometheus()
+        self.assertIn('task_manager_request_duration_seconds_bucket{view="tasks:index",method="GET",le="0.025"} 0', text)
+        self.assertIn('task_manager_request_duration_seconds_bucket{view="tasks:index",method="GET",le="0.05"} 1', text)
+        self.assertIn('task_manager_request_duration_seconds_bucket{view="tasks:index",method="GET",le="+Inf"} 2', text)
+        self.assertIn('task_manager_request_errors_total{view="tasks:index",method="GET"} 1', text)
+
+    def test_sampled_requests_are_profiled(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        with self.settings(PROFILING_DIR=directory, PROFILING_SAMPLE_RATE=1.0):
+            self.client.force_login(self.user)
+            self.client.get(reverse("tasks:task-list"))
+        self.assertEqual(len(list(Path(directory).glob("tasks.task-list-*.prof"))), 1)
@@ -0,0 +1,81 @@
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from tasks import jobs, urls as task_urls
+from tasks.benchmarks import iter_urls
+from tasks.middleware import get_query_budget
+from tasks.models import Position, TaskType, Tag, Team, Project, Task
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Walks every url in tasks.urls with a seeded dataset and checks
+    that no view issues more queries than its declared budget.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.position = Position.objects.create(name="developer")
+        cls.user = get_user_model().objects.create_user(
+            username="owner",
+            password="testpassword",
+            position=cls.position,
+        )
+        workers = [
+            get_user_model().objects.create_user(
+                username=f"worker{i}",
+                password="testpassword",
+                position=cls.position,
+            )
+            for i in range(5)
+        ]
+        tags = [Tag.objects.create(name=f"tag{i}") for i in range(5)]
+        task_types = [TaskType.objects.create(name=f"type{i}") for i in range(3)]
+        teams = []
+        for i in range(3):
+            team = Team.objects.create(name=f"team{i}")
+            team.workers.set(workers)
+            teams.append(team)
+        projects = [
+            Project.objects.create(name=f"project{i}", team=teams[i % 3])
+            for i in range(3)
+        ]
+        for i in range(10):
+            task = Task.objects.create(
+                name=f"task{i}",
+                description="description",
+                task_type=task_types[i % 3],
+                project=projects[i % 3],
+                is_completed=bool(i % 2),
+            )
+            task.assignees.set(workers + [cls.user])
+            task.tags.set(tags)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(JOB_OUTPUT_DIR=directory.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        # A finished export job owned by the user, for the job pages.
+        jobs.enqueue("export_tasks", created_by=self.user)
+        jobs.run_pending()
+
+    def test_every_view_declares_budget(self):
+        for pattern in task_urls.urlpatterns:
+            with self.subTest(url=pattern.name):
+                self.assertIsNotNone(get_query_budget(pattern.callback))
+
+    def test_views_stay_within_budget(self):
+        for pattern, url in iter_urls():
+            budget = get_query_budget(pattern.callback)
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as queries:
+                    res = self.client.get(url)
+                self.assertEqual(res.status_code, 200)
+                self.assertLessEqual(len(queries), budget)
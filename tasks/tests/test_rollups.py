@@ -0,0 +1,104 @@
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from tasks import bulk, rollups
+from tasks.models import Position, Project, ProjectProgress, Task, TaskType, Team, TeamProgress
+
+
+class RollupTests(TestCase):
+    def setUp(self):
+        self.today = timezone.now().date()
+        self.task_type = TaskType.objects.create(name="bug")
+        self.team = Team.objects.create(name="core")
+        self.project = Project.objects.create(name="api", team=self.team)
+        self.other = Project.objects.create(name="web", team=self.team)
+
+    def create_task(self, name, days=None, project=None, **kwargs):
+        return Task.objects.create(
+            name=name,
+            task_type=self.task_type,
+            project=project or self.project,
+            deadline=self.today + timezone.timedelta(days=days) if days is not None else None,
+            **kwargs,
+        )
+
+    def assertProgress(self, obj, num_tasks, num_completed, num_overdue, next_deadline):
+        progress = type(obj).objects.select_related("progress").get(pk=obj.pk).progress
+        self.assertEqual(
+            (progress.num_tasks, progress.num_completed, progress.num_overdue, progress.next_deadline),
+            (num_tasks, num_completed, num_overdue, next_deadline),
+        )
+
+    def assertMatchesRebuild(self):
+        current = {
+            model: list(model.objects.order_by("pk").values())
+            for model in (ProjectProgress, TeamProgress)
+        }
+        rollups.rebuild()
+        for model, rows in current.items():
+            self.assertEqual(rows, list(model.objects.order_by("pk").values()))
+
+    def test_signals_keep_rollups_current(self):
+        late = self.create_task("late", days=-1)
+        soon = self.create_task("soon", days=2)
+        self.create_task("web", days=1, project=self.other)
+        self.assertProgress(self.project, 2, 0, 1, late.deadline)
+        self.assertProgress(self.team, 3, 0, 1, late.deadline)
+
+        late.is_completed = True
+        late.save()
+        self.assertProgress(self.project, 2, 1, 0, soon.deadline)
+        self.assertProgress(self.team, 3, 1, 0, self.today + timezone.timedelta(days=1))
+
+        soon.project = self.other
+        soon.save()
+        self.assertProgress(self.project, 1, 1, 0, None)
+        self.assertMatchesRebuild()
+
+        soon.delete()
+        self.assertProgress(self.other, 1, 0, 0, self.today + timezone.timedelta(days=1))
+        self.assertMatchesRebuild()
+
+    def test_bulk_actions_refresh_rollups(self):
+        self.create_task("one", days=-2)
+        self.create_task("two", days=3)
+        bulk.set_completed(Task.objects.all())
+        self.assertProgress(self.project, 2, 2, 0, None)
+        bulk.move_to_project(Task.objects.all(), self.other)
+        self.assertProgress(self.other, 2, 2, 0, None)
+        self.assertMatchesRebuild()
+
+    def test_percent_complete(self):
+        self.create_task("one", is_completed=True)
+        self.create_task("two")
+        self.create_task("three")
+        self.assertEqual(ProjectProgress.objects.get(project=self.project).percent_complete, 33)
+        self.assertEqual(TeamProgress.objects.get(team=self.team).percent_complete, 33)
+
+    def test_stale_rows_refreshed_on_read(self):
+        self.create_task("late", days=-1)
+        ProjectProgress.objects.update(num_overdue=0, computed_on=self.today - timezone.timedelta(days=1))
+        user = get_user_model().objects.create_user(
+            username="user", password="password", position=Position.objects.create(name="developer")
+        )
+        self.client.force_login(user)
+        response = self.client.get(reverse("tasks:project-detail", kwargs={"pk": self.project.pk}))
+        self.assertEqual(response.context["project"].progress.num_overdue, 1)
+        # Reads do not write, the nightly rebuild does.
+        self.assertEqual(ProjectProgress.objects.get(project=self.project).num_overdue, 0)
+
+    def test_rebuild_command(self):
+        self.create_task("one", days=-1)
+        ProjectProgress.objects.all().delete()
+        call_command("rebuild_progress", stdout=open("/dev/null", "w"))
+        self.assertProgress(self.project, 1, 0, 1, self.today - timezone.timedelta(days=1))
+
+    def test_rebuild_overwrites_existing_rows(self):
+        self.create_task("one", days=-1)
+        ProjectProgress.objects.update(num_tasks=7, num_overdue=0)
+        rollups.rebuild()
+        rollups.rebuild()
+        self.assertProgress(self.project, 1, 0, 1, self.today - timezone.timedelta(days=1))
@@ -0,0 +1,60 @@
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, TransactionTestCase, override_settings
+
+from tasks.middleware import PrimaryPinningMiddleware
+from tasks.models import Task
+from tasks.routers import ReplicaRouter, read_from_replicas, stop_reading_from_replicas
+
+
+@override_settings(DATABASE_REPLICAS=["replica"])
+class ReplicaRouterTests(TransactionTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.factory = RequestFactory()
+
+    def run_middleware(self, request, write=False):
+        databases = []
+
+        def view(request):
+            databases.append(self.router.db_for_read(Task))
+            if write:
+                self.router.db_for_write(Task)
+            return HttpResponse()
+
+        response = PrimaryPinningMiddleware(view)(request)
+        return databases[0], response
+
+    def test_reads_outside_requests_use_primary(self):
+        self.assertEqual(self.router.db_for_read(Task), "default")
+        self.assertEqual(self.router.db_for_write(Task), "default")
+
+    def test_reads_in_transaction_use_primary(self):
+        token = read_from_replicas()
+        try:
+            self.assertEqual(self.router.db_for_read(Task), "replica")
+            with transaction.atomic():
+                self.assertEqual(self.router.db_for_read(Task), "default")
+        finally:
+            stop_reading_from_replicas(token)
+
+    def test_safe_requests_read_from_replicas(self):
+        database, response = self.run_middleware(self.factory.get("/"))
+        self.assertEqual(database, "replica")
+        self.assertNotIn(PrimaryPinningMiddleware.cookie_name, response.cookies)
+
+    def test_write_pins_client_to_primary(self):
+        database, response = self.run_middleware(self.factory.post("/"), write=True)
+        self.assertEqual(database, "default")
+        self.assertEqual(response.cookies[PrimaryPinningMiddleware.cookie_name]["max-age"], 5)
+
+        request = self.factory.get("/")
+        request.COOKIES[PrimaryPinningMiddleware.cookie_name] = "1"
+        self.assertEqual(self.run_middleware(request)[0], "default")
+        self.assertEqual(self.router.db_for_read(Task), "default")
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas(self):
+        database, response = self.run_middleware(self.factory.post("/"), write=True)
+        self.assertEqual(database, "default")
+        self.assertNotIn(PrimaryPinningMiddleware.cookie_name, response.cookies)
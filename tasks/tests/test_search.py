@@ -0,0 +1,63 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from tasks.models import Position, TaskType, Tag, Team, Project, Task
+from tasks.search import search_tasks, to_fts5_query
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.position = Position.objects.create(name="developer")
+        self.user = get_user_model().objects.create_user(
+            username="alice",
+            password="testpassword",
+            position=self.position,
+        )
+        self.task_type = TaskType.objects.create(name="bug")
+        self.team = Team.objects.create(name="core")
+        self.project = Project.objects.create(name="billing", team=self.team)
+        self.tag = Tag.objects.create(name="backend")
+        self.invoice_task = Task.objects.create(
+            name="Fix invoice rounding",
+            description="Totals are off by one cent",
+            task_type=self.task_type,
+            project=self.project,
+        )
+        self.report_task = Task.objects.create(
+            name="Monthly report",
+            description="Include the invoice totals",
+            task_type=self.task_type,
+        )
+
+    def search(self, query):
+        return list(search_tasks(Task.objects.all(), query))
+
+    def test_search_ranks_name_matches_first(self):
+        self.assertEqual(self.search("invoice"), [self.invoice_task, self.report_task])
+
+    def test_search_related_names(self):
+        self.report_task.tags.add(self.tag)
+        self.report_task.assignees.add(self.user)
+        self.assertEqual(self.search("backend"), [self.report_task])
+        self.assertEqual(self.search("alice"), [self.report_task])
+        self.assertEqual(self.search("billing"), [self.invoice_task])
+
+    def test_index_follows_changes(self):
+        self.report_task.tags.add(self.tag)
+        self.tag.name = "frontend"
+        self.tag.save()
+        self.assertEqual(self.search("backend"), [])
+        self.assertEqual(self.search("frontend"), [self.report_task])
+        self.tag.tasks.clear()
+        self.assertEqual(self.search("frontend"), [])
+        self.report_task.delete()
+        self.assertEqual(self.search("invoice"), [self.invoice_task])
+
+    def test_fts5_query_escapes_syntax(self):
+        self.assertEqual(to_fts5_query('fix" OR name:*'), '"fix"* "OR"* "name"*')
+
+    def test_task_list_full_text_search(self):
+        self.client.force_login(self.user)
+        res = self.client.get(reverse("tasks:task-list"), {"name": "cent", "full_text": "on"})
+        self.assertEqual(list(res.context["object_list"]), [self.invoice_task])
@@ -0,0 +1,92 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.urls import reverse
+
+from tasks.models import Position, TaskType, Tag, Team, Project, Task
+
+
+class TaskImportExportTests(TestCase):
+    def setUp(self):
+        position = Position.objects.create(name="developer")
+        self.worker = get_user_model().objects.create_user(
+            username="alice", password="testpassword", position=position
+        )
+        self.task_type = TaskType.objects.create(name="bug")
+        self.project = Project.objects.create(name="billing", team=Team.objects.create(name="core"))
+        self.tag = Tag.objects.create(name="backend")
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def write_jsonl(self, name, records):
+        with open(self.path(name), "w") as stream:
+            for record in records:
+                stream.write(json.dumps(record) + "\n")
+        return self.path(name)
+
+    def test_import_resolves_names_and_skips_existing(self):
+        Task.objects.create(name="existing", task_type=self.task_type)
+        path = self.write_jsonl("tasks.jsonl", [
+            {"name": "existing", "task_type": "bug"},
+            {
+                "name": "imported",
+                "description": "from file",
+                "deadline": "2030-01-01",
+                "task_type": "bug",
+                "project": "billing",
+                "tags": ["backend", "new tag"],
+                "assignees": ["alice"],
+            },
+        ])
+        call_command("import_tasks", path, "--batch-size", "1", "--create-missing",
+                     stdout=StringIO(), stderr=StringIO())
+
+        task = Task.objects.get(name="imported")
+        self.assertEqual(task.project, self.project)
+        self.assertEqual(sorted(task.tags.values_list("name", flat=True)), ["backend", "new tag"])
+        self.assertEqual(list(task.assignees.all()), [self.worker])
+        self.tag.refresh_from_db()
+        self.assertEqual(self.tag.task_count, 1)
+        self.assertEqual(Task.objects.count(), 2)
+
+    def test_import_rejects_invalid_values(self):
+        for record in [
+            {"name": "bad priority", "task_type": "bug", "priority": "critical"},
+            {"name": "x" * 101, "task_type": "bug"},
+            {"name": "long tag", "task_type": "bug", "tags": ["t" * 51]},
+        ]:
+            path = self.write_jsonl("tasks.jsonl", [record])
+            with self.assertRaises(CommandError):
+                call_command("import_tasks", path, "--create-missing", stdout=StringIO(), stderr=StringIO())
+        self.assertFalse(Task.objects.exists())
+
+    def test_import_refreshes_cached_pages(self):
+        Task.objects.create(name="existing", task_type=self.task_type)
+        self.client.force_login(self.worker)
+        self.assertNotContains(self.client.get(reverse("tasks:task-list")), "imported")
+        path = self.write_jsonl("tasks.jsonl", [{"name": "imported", "task_type": "bug"}])
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("import_tasks", path, stdout=StringIO(), stderr=StringIO())
+        self.assertContains(self.client.get(reverse("tasks:task-list")), "imported")
+
+    def test_round_trip_csv(self):
+        task = Task.objects.create(name="exported", task_type=self.task_type, project=self.project)
+        task.tags.add(self.tag)
+        task.assignees.add(self.worker)
+        call_command("export_tasks", self.path("tasks.csv"), "--format", "csv",
+                     stdout=StringIO(), stderr=StringIO())
+        task.delete()
+
+        call_command("import_tasks", self.path("tasks.csv"), stdout=StringIO(), stderr=StringIO())
+        task = Task.objects.get(name="exported")
+        self.assertEqual(list(task.tags.all()), [self.tag])
+        self.assertEqual(list(task.assignees.all()), [self.worker])
@@ -0,0 +1,81 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from tasks.models import Position, Task, TaskType
+from tasks.views import WorkloadView
+from tasks.workload import sort_workload, with_workload
+
+WORKLOAD_URL = reverse("tasks:worker-workload")
+
+
+class WorkloadTests(TestCase):
+    def setUp(self):
+        position = Position.objects.create(name="developer")
+        task_type = TaskType.objects.create(name="bug")
+        today = timezone.now().date()
+        self.busy = get_user_model().objects.create_user(
+            username="busy", password="password", position=position
+        )
+        self.idle = get_user_model().objects.create_user(
+            username="idle", password="password", position=position
+        )
+        tasks = [
+            Task.objects.create(name="late", task_type=task_type, priority="urgent",
+                                deadline=today - timezone.timedelta(days=1)),
+            Task.objects.create(name="open", task_type=task_type, priority="low",
+                                deadline=today + timezone.timedelta(days=1)),
+            Task.objects.create(name="done", task_type=task_type, is_completed=True,
+                                deadline=today - timezone.timedelta(days=1)),
+        ]
+        self.busy.tasks.set(tasks)
+        self.client.force_login(self.busy)
+
+    def test_counts(self):
+        busy, idle = sort_workload(with_workload(get_user_model().objects.all()), "username")
+        self.assertEqual(
+            (busy.num_open, busy.num_overdue, busy.num_completed,
+             busy.num_urgent, busy.num_high, busy.num_medium, busy.num_low),
+            (2, 1, 1, 1, 0, 0, 1),
+        )
+        self.assertEqual((idle.num_open, idle.num_completed), (0, 0))
+
+    def test_sort(self):
+        workers = get_user_model().objects.all()
+        self.assertEqual(list(sort_workload(with_workload(workers), "num_open")), [self.idle, self.busy])
+        self.assertEqual(list(sort_workload(with_workload(workers), "password")), [self.busy, self.idle])
+
+    def test_view(self):
+        response = self.client.get(WORKLOAD_URL, {"sort": "username"})
+        self.assertEqual(list(response.context["worker_list"]), [self.busy, self.idle])
+        self.assertContains(response, "busy")
+
+    @mock.patch.object(WorkloadView, "paginate_by", 1)
+    def test_view_pages_by_cursor(self):
+        get_user_model().objects.create_user(username="quiet", password="password", position=self.busy.position)
+        pages, params = [], {"sort": "-num_open"}
+        while True:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(WORKLOAD_URL, params)
+            self.assertFalse([query for query in queries if "COUNT(*)" in query["sql"]])
+            pages.append([worker.username for worker in response.context["worker_list"]])
+            page = response.context["page_obj"]
+            if not page.has_next():
+                break
+            params["cursor"] = page.next_cursor
+        # Ties on the sort column go by pk, newest first.
+        self.assertEqual(pages, [["busy"], ["quiet"], ["idle"]])
+
+        params["cursor"] = page.previous_cursor
+        response = self.client.get(WORKLOAD_URL, params)
+        self.assertEqual([worker.username for worker in response.context["worker_list"]], ["quiet"])
+
+    def test_worker_detail_fetches_tasks_once(self):
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse("tasks:worker-detail", kwargs={"pk": self.busy.pk}))
+        self.assertEqual([task.name for task in response.context["completed_tasks"]], ["done"])
@@ -1,13 +1,25 @@
+from django.conf import settings
 from django.urls import path
 
+from tasks import async_views
+from tasks.models import Position, Project, Tag, Worker
+
 from tasks.views import (index,
                          TaskListView,
+                         TaskExportView,
+                         TaskExportJobView,
+                         TaskBulkActionView,
+                         AutocompleteView,
+                         OverdueTaskListView,
                          WorkerListView,
                          TaskDetailView,
+                         TaskHistoryView,
+                         FeedView,
                          TaskCreateView,
                          TaskUpdateView,
                          TaskDeleteView,
                          WorkerDetailView,
+                         WorkloadView,
                          WorkerDeleteView,
                          WorkerCreateView,
                          PositionListView,
@@ -34,12 +46,20 @@ from tasks.views import (index,
                          TeamDeleteView,
                          TeamCreateView,
                          PositionDeleteView,
-                         TaskTypeDeleteView)
+                         TaskTypeDeleteView,
+                         JobListView,
+                         JobDetailView,
+                         JobDownloadView)
 
 urlpatterns = [
     path("", index, name="index"),
     path("tasks/", TaskListView.as_view(), name="task-list"),
     path("tasks/<int:pk>", TaskDetailView.as_view(), name="task-detail"),
+    path("tasks/<int:pk>/history/", TaskHistoryView.as_view(), name="task-history"),
+    path("tasks/export/", TaskExportView.as_view(), name="task-export"),
+    path("tasks/export/background/", TaskExportJobView.as_view(), name="task-export-job"),
+    path("tasks/overdue/", OverdueTaskListView.as_view(), name="task-overdue-list"),
+    path("tasks/bulk/", TaskBulkActionView.as_view(), name="task-bulk"),
     path("tasks/create/", TaskCreateView.as_view(), name="task-create"),
     path("tasks/update/<int:pk>", TaskUpdateView.as_view(), name="task-update"),
     path("tasks/delete/<int:pk>", TaskDeleteView.as_view(), name="task-delete"),
@@ -47,6 +67,7 @@ urlpatterns = [
     path("workers/", WorkerListView.as_view(), name="worker-list"),
     path("workers/<int:pk>", WorkerDetailView.as_view(), name="worker-detail"),
     path("workers/create/", WorkerCreateView.as_view(), name="worker-create"),
+    path("workers/workload/", WorkloadView.as_view(), name="worker-workload"),
 
     path("workers/delete/<int:pk>", WorkerDeleteView.as_view(), name="worker-delete"),
     path("positions/", PositionListView.as_view(), name="position-list"),
@@ -70,12 +91,52 @@ urlpatterns = [
     path("projects/create/", ProjectCreateView.as_view(), name="project-create"),
     path("projects/update/<int:pk>/", ProjectUpdateView.as_view(), name="project-update"),
     path("projects/delete/<int:pk>/", ProjectDeleteView.as_view(), name="project-delete"),
+    path(
+        "autocomplete/workers/",
+        AutocompleteView.as_view(
+            model=Worker, search_fields=("username", "first_name", "last_name")
+        ),
+        name="worker-autocomplete",
+    ),
+    path("autocomplete/tags/", AutocompleteView.as_view(model=Tag), name="tag-autocomplete"),
+    path(
+        "autocomplete/positions/",
+        AutocompleteView.as_view(model=Position),
+        name="position-autocomplete",
+    ),
+    path(
+        "autocomplete/projects/",
+        AutocompleteView.as_view(model=Project),
+        name="project-autocomplete",
+    ),
     path("teams/", TeamListView.as_view(), name="team-list"),
     path("teams/<int:pk>/", TeamDetailView.as_view(), name="team-detail"),
     path("teams/create/", TeamCreateView.as_view(), name="team-create"),
     path("teams/update/<int:pk>/", TeamUpdateView.as_view(), name="team-update"),
     path("teams/delete/<int:pk>/", TeamDeleteView.as_view(), name="team-delete"),
+    path("feed/", FeedView.as_view(), name="feed"),
+    path("jobs/", JobListView.as_view(), name="job-list"),
+    path("jobs/<int:pk>/", JobDetailView.as_view(), name="job-detail"),
+    path("jobs/<int:pk>/download/", JobDownloadView.as_view(), name="job-download"),
 
 ]
 
+ASYNC_VIEWS = {
+    "index": async_views.index,
+    "task-list": async_views.AsyncTaskListView.as_view(),
+    "task-detail": async_views.AsyncTaskDetailView.as_view(),
+    "worker-detail": async_views.AsyncWorkerDetailView.as_view(),
+}
+
+
+def use_async_views(patterns):
+    return [
+        path(str(pattern.pattern), ASYNC_VIEWS.get(pattern.name, pattern.callback), name=pattern.name)
+        for pattern in patterns
+    ]
+
+
+if settings.ASYNC_VIEWS:
+    urlpatterns = use_async_views(urlpatterns)
+
 app_name = "tasks"
@@ -1,69 +1,397 @@
+from functools import partial
+from itertools import islice
+from pathlib import Path
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.auth.views import redirect_to_login
 from django.contrib.messages.views import SuccessMessageMixin
-from django.http import HttpRequest, HttpResponse
-from django.shortcuts import render
-from django.urls import reverse_lazy
+from django.core.exceptions import PermissionDenied
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.db.models import Q
+from django.http import FileResponse, Http404, HttpRequest, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.shortcuts import redirect, render
+from django.urls import reverse, reverse_lazy
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
 from django.views import generic
 
 from tasks.forms import (TaskForm,
                          WorkerCreationForm,
                          TaskSearchForm,
+                         TaskBulkActionForm,
+                         TaskFacetForm,
+                         TaskExportJobForm,
+                         OverdueTaskFilterForm,
                          WorkerSearchForm,
                          PositionSearchForm,
                          TaskTypeSearchForm, TagSearchForm, ProjectSearchForm, TeamSearchForm)
-from tasks.models import Task, Worker, Position, TaskType, Tag, Project, Team
+from tasks import bulk, dashboard, facets, feed, history, jobs, profiling, rollups, workload
+from tasks.middleware import query_budget
+from tasks.pagination import CursorPaginationMixin
+from tasks.models import Task, Worker, Position, TaskType, Tag, Project, Team, Job, JobStatus
+from tasks.search import search_tasks
+from tasks.task_io import export_lines, iter_task_records
+
+
+def search_by_name(queryset, params):
+    form = TaskSearchForm(params)
+    if form.is_valid():
+        name = form.cleaned_data["name"]
+        if form.cleaned_data["full_text"] and name:
+            return search_tasks(queryset, name)
+        return queryset.filter(name__icontains=name)
+    return queryset
+
+
+def get_facet_data(params):
+    form = TaskFacetForm(params)
+    return form.cleaned_data if form.is_valid() else {}
+
+
+def filter_tasks(queryset, params):
+    """
+    Applies the task list search form and facets to ``queryset``. Shared
+    by the task list, the bulk actions and the export so all of them
+    see the same tasks.
+    """
+    filters = facets.facet_filters(get_facet_data(params), timezone.localdate())
+    return facets.apply(search_by_name(queryset, params), filters)
 
 
 @login_required
+@query_budget(4)
 def index(request: HttpRequest) -> HttpResponse:
-    num_tasks = Task.objects.count()
-    num_projects = Project.objects.count()
-    num_teams = Team.objects.count()
-
-    context = {
-        "num_tasks": num_tasks,
-        "num_projects": num_projects,
-        "num_teams": num_teams,
-    }
+    context = dashboard.get_stats()
 
     return render(request, "tasks/index.html", context=context)
 
 
-class TaskListView(LoginRequiredMixin, generic.ListView):
+@query_budget(2)
+def metrics(request):
+    """
+    Per-route request metrics in the Prometheus text format, for staff
+    or for requests with the PROFILING_METRICS_TOKEN bearer token.
+    """
+    token = settings.PROFILING_METRICS_TOKEN
+    if not (token and constant_time_compare(request.headers.get("Authorization", ""), f"Bearer {token}")):
+        if not request.user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        if not request.user.is_staff:
+            raise PermissionDenied
+    return HttpResponse(
+        profiling.render_prometheus(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+class TaskListView(LoginRequiredMixin, CursorPaginationMixin, generic.ListView):
     model = Task
+    # Facet counts take one query per facet when they are not cached.
+    query_budget = 12
     paginate_by = 7
 
     def get_queryset(self):
-        queryset = Task.objects.prefetch_related("assignees")
-        form = TaskSearchForm(self.request.GET)
-        if form.is_valid():
-            queryset = queryset.filter(name__icontains=form.cleaned_data["name"])
-        return queryset
+        return filter_tasks(
+            Task.objects.select_related("task_type").with_overdue(), self.request.GET
+        )
 
     def get_context_data(self, *, object_list=None, **kwargs):
         context = super(TaskListView, self).get_context_data(**kwargs)
         name = self.request.GET.get("name")
         context["name"] = name
         context["search_form"] = TaskSearchForm(
-            initial={"name": name},
+            initial={"name": name, "full_text": self.request.GET.get("full_text")},
+        )
+        context["bulk_form"] = TaskBulkActionForm()
+        context["facets"] = self.get_facets()
+        context["active_facets"] = [
+            (name, value) for name in facets.FACETS for value in self.request.GET.getlist(name)
+        ]
+        return context
+
+    def get_facets(self):
+        params = self.request.GET
+        counts = facets.get_counts(
+            search_by_name(Task.objects.all(), params),
+            get_facet_data(params),
+            search={"name": params.get("name", ""), "full_text": params.get("full_text", "")},
+        )
+        groups = []
+        for name, label in facets.FACETS.items():
+            selected = params.getlist(name)
+            values = []
+            for value, value_label, count in counts[name]:
+                query = params.copy()
+                for key in ("page", self.cursor_kwarg):
+                    query.pop(key, None)
+                chosen = [item for item in selected if item != str(value)]
+                if str(value) not in selected:
+                    chosen.append(str(value))
+                query.setlist(name, chosen)
+                values.append({
+                    "label": value_label,
+                    "count": count,
+                    "selected": str(value) in selected,
+                    "query": query.urlencode(),
+                })
+            groups.append({"name": name, "label": label, "values": values})
+        return groups
+
+
+class OverdueTaskListView(LoginRequiredMixin, CursorPaginationMixin, generic.ListView):
+    """
+    Overdue tasks of all workers, or open tasks due within ?due_within days.
+    """
+    model = Task
+    query_budget = 4
+    paginate_by = 7
+    template_name = "tasks/overdue_task_list.html"
+    context_object_name = "task_list"
+
+    def get_queryset(self):
+        queryset = Task.objects.select_related("task_type", "project").with_overdue()
+        form = OverdueTaskFilterForm(self.request.GET)
+        if form.is_valid() and form.cleaned_data["due_within"] is not None:
+            queryset = queryset.due_within(form.cleaned_data["due_within"])
+        else:
+            queryset = queryset.overdue()
+        return filter_tasks(queryset, self.request.GET)
+
+    def get_context_data(self, *, object_list=None, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["search_form"] = TaskSearchForm(
+            initial={"name": self.request.GET.get("name")},
+        )
+        context["filter_form"] = OverdueTaskFilterForm(
+            initial={"due_within": self.request.GET.get("due_within")},
         )
         return context
 
+
+class TaskBulkActionView(LoginRequiredMixin, generic.FormView):
+    """
+    Applies one bulk action to the selected tasks, or to every task
+    matching the task list filters passed in the query string.
+    Answers with JSON instead of a redirect when ``json_response`` is set.
+    """
+    query_budget = 12
+    form_class = TaskBulkActionForm
+    template_name = "tasks/task_bulk_form.html"
+    json_response = False
+
+    def handle_no_permission(self):
+        if self.json_response:
+            return JsonResponse({"error": "Authentication required"}, status=401)
+        return super().handle_no_permission()
+
+    def get_tasks(self, form):
+        if form.cleaned_data["select_all"]:
+            return filter_tasks(Task.objects.all(), self.request.GET)
+        return Task.objects.filter(pk__in=form.cleaned_data["tasks"])
+
+    def enqueue(self, form):
+        select_all = form.cleaned_data["select_all"]
+        return jobs.enqueue_bulk_action(
+            form.cleaned_data["action"],
+            form.cleaned_data,
+            task_ids=None if select_all else form.cleaned_data["tasks"],
+            query=self.request.GET.urlencode() if select_all else None,
+            created_by=self.request.user,
+        )
+
+    def form_valid(self, form):
+        action = form.cleaned_data["action"]
+        if form.cleaned_data["in_background"]:
+            job = self.enqueue(form)
+            if self.json_response:
+                return JsonResponse({"action": action, "job": job.pk}, status=202)
+            messages.success(self.request, "The action was queued")
+            return redirect("tasks:job-detail", pk=job.pk)
+        affected = bulk.run(action, self.get_tasks(form), form.cleaned_data)
+        if self.json_response:
+            return JsonResponse({"action": action, "affected": affected})
+        label, _ = form.ACTIONS[action]
+        messages.success(self.request, f"{label}: {affected} changed")
+        query = self.request.GET.urlencode()
+        return redirect(reverse("tasks:task-list") + (f"?{query}" if query else ""))
+
+    def form_invalid(self, form):
+        if self.json_response:
+            return JsonResponse({"errors": form.errors}, status=400)
+        return super().form_invalid(form)
+
+
+class AutocompleteView(LoginRequiredMixin, generic.View):
+    """
+    Search-as-you-type endpoint for the autocomplete widgets. Returns a
+    page of ``{"id", "text"}`` results for ``?term=`` and whether there
+    are more, without counting the matches.
+    """
+    query_budget = 3
+    model = None
+    search_fields = ("name",)
+    paginate_by = 20
+
+    def get(self, request, *args, **kwargs):
+        term = request.GET.get("term", "").strip()
+        try:
+            page = max(1, int(request.GET.get("page", 1)))
+        except ValueError:
+            page = 1
+        queryset = self.model.objects.all()
+        if term:
+            condition = Q()
+            for field in self.search_fields:
+                condition |= Q(**{f"{field}__icontains": term})
+            queryset = queryset.filter(condition)
+        start = (page - 1) * self.paginate_by
+        objects = list(queryset[start:start + self.paginate_by + 1])
+        return JsonResponse({
+            "results": [
+                {"id": str(obj.pk), "text": str(obj)} for obj in objects[:self.paginate_by]
+            ],
+            "pagination": {"more": len(objects) > self.paginate_by},
+        })
+
+
+class TaskExportView(LoginRequiredMixin, generic.View):
+    """
+    Streams the tasks matching the task list filters as CSV or NDJSON.
+    Rows are read with a server-side cursor, so memory stays flat.
+    """
+    query_budget = 2
+    chunk_size = 2000
+    formats = {
+        "csv": ("csv", "text/csv"),
+        "ndjson": ("jsonl", "application/x-ndjson"),
+    }
+
+    def get(self, request, *args, **kwargs):
+        name = request.GET.get("format", "csv")
+        try:
+            fmt, content_type = self.formats[name]
+        except KeyError:
+            raise Http404("Unknown export format")
+        queryset = filter_tasks(Task.objects.all(), request.GET)
+        lines = export_lines(iter_task_records(queryset, self.chunk_size), fmt)
+        if isinstance(request, ASGIRequest):
+            content = aiter_text_chunks(lines)
+        else:
+            content = text_chunks(lines)
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="tasks.{name}"'
+        return response
+
+
+class TaskExportJobView(LoginRequiredMixin, generic.FormView):
+    """
+    Queues an export of the tasks matching the task list filters as a
+    background job, for exports too large to stream in one request.
+    """
+    query_budget = 3
+    form_class = TaskExportJobForm
+    template_name = "tasks/task_export_job_form.html"
+
+    def form_valid(self, form):
+        job = jobs.enqueue(
+            "export_tasks",
+            {"format": form.cleaned_data["format"], "query": self.request.GET.urlencode()},
+            created_by=self.request.user,
+        )
+        messages.success(self.request, "The export was queued")
+        return redirect("tasks:job-detail", pk=job.pk)
+
+
+def text_chunks(lines, size=500):
+    iterator = iter(lines)
+    while chunk := "".join(islice(iterator, size)):
+        yield chunk
+
+
+async def aiter_text_chunks(lines, size=500):
+    """
+    Serves a synchronous line iterator to ASGI without materializing it.
+    Each chunk is pulled on the same thread, which keeps the server-side
+    cursor on one connection.
+    """
+    next_chunk = sync_to_async(partial(next, text_chunks(lines, size), ""))
+    while chunk := await next_chunk():
+        yield chunk
+
+
 class TaskDetailView(LoginRequiredMixin, generic.DetailView):
     model = Task
+    query_budget = 5
+    queryset = Task.objects.select_related("project")
 
 
-class TaskCreateView(LoginRequiredMixin, SuccessMessageMixin, generic.CreateView):
+class TaskHistoryView(LoginRequiredMixin, generic.DetailView):
+    """
+    The change history of a task, newest first, paged with ``?before=``
+    the oldest event id shown.
+    """
     model = Task
+    query_budget = 8
+    template_name = "tasks/task_history.html"
+    paginate_by = 50
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        try:
+            before = int(self.request.GET["before"])
+        except (KeyError, ValueError):
+            before = None
+        events = history.timeline(self.object.pk, before, self.paginate_by + 1)
+        context["events"] = history.describe(events[:self.paginate_by])
+        if len(events) > self.paginate_by:
+            context["before"] = events[self.paginate_by - 1].pk
+        return context
+
+
+class FeedView(LoginRequiredMixin, generic.TemplateView):
+    """
+    Recent changes to the tasks the worker is assigned to and to the
+    tasks of their teams' projects, newest first, paged with ``?cursor=``.
+    """
+    query_budget = 12
+    template_name = "tasks/feed.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        events, context["next_cursor"] = feed.page(self.request.user, self.request.GET.get("cursor"))
+        names = dict(Task.objects.filter(pk__in={event.task_id for event in events}).values_list("pk", "name"))
+        for event in events:
+            event.task_name = names.get(event.task_id)
+        context["events"] = history.describe(events)
+        return context
+
+
+class TaskHistoryFormMixin:
+    """
+    Saves the task, its tags and assignees and the history event of the
+    change in one transaction.
+    """
+    def form_valid(self, form):
+        with transaction.atomic(), history.grouped():
+            return super().form_valid(form)
+
+
+class TaskCreateView(LoginRequiredMixin, SuccessMessageMixin, TaskHistoryFormMixin, generic.CreateView):
+    model = Task
+    query_budget = 6
     form_class = TaskForm
     success_url = reverse_lazy("tasks:task-list")
     success_message = "Task successfully created"
 
 
-class TaskUpdateView(LoginRequiredMixin, SuccessMessageMixin, generic.UpdateView):
+class TaskUpdateView(LoginRequiredMixin, SuccessMessageMixin, TaskHistoryFormMixin, generic.UpdateView):
     model = Task
+    query_budget = 9
     form_class = TaskForm
     success_url = reverse_lazy("tasks:task-list")
     success_message = "Task successfully updated"
@@ -71,19 +399,22 @@ class TaskUpdateView(LoginRequiredMixin, SuccessMessageMixin, generic.UpdateView
 
 class TaskDeleteView(LoginRequiredMixin, generic.DeleteView):
     model = Task
+    query_budget = 3
     success_url = reverse_lazy("tasks:task-list")
 
     def post(self, request, *args, **kwargs):
-        response = super().delete(request, *args, **kwargs)
+        with transaction.atomic():
+            response = super().delete(request, *args, **kwargs)
         messages.success(request, "Task successfully deleted")
         return response
 
-class WorkerListView(LoginRequiredMixin, generic.ListView):
+class WorkerListView(LoginRequiredMixin, CursorPaginationMixin, generic.ListView):
     model = Worker
+    query_budget = 4
     paginate_by = 7
 
     def get_queryset(self):
-        queryset = Worker.objects.all()
+        queryset = Worker.objects.select_related("position")
         form = WorkerSearchForm(self.request.GET)
         if form.is_valid():
             queryset = queryset.filter(username__icontains=form.cleaned_data["username"])
@@ -101,18 +432,59 @@ class WorkerListView(LoginRequiredMixin, generic.ListView):
 
 class WorkerDetailView(LoginRequiredMixin, generic.DetailView):
     model = Worker
+    query_budget = 5
     template_name = "tasks/worker_detail.html"
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["incompleted_tasks"] = self.object.tasks.filter(is_completed=False)
-        context["completed_tasks"] = self.object.tasks.filter(is_completed=True)
+        # One query for both lists, and only when the cached fragment
+        # has to be rendered.
+        tasks = SimpleLazyObject(lambda: list(self.object.tasks.all()))
+        context["incompleted_tasks"] = SimpleLazyObject(
+            lambda: [task for task in tasks if not task.is_completed]
+        )
+        context["completed_tasks"] = SimpleLazyObject(
+            lambda: [task for task in tasks if task.is_completed]
+        )
         return context
 
 
+class WorkloadView(LoginRequiredMixin, CursorPaginationMixin, generic.ListView):
+    """
+    Open, overdue and completed task counts of every worker, sortable by
+    any column. Paged by cursor on the sort column: an offset page would
+    count and skip over the whole grouped query.
+    """
+    model = Worker
+    query_budget = 4
+    paginate_by = 50
+    pagination_mode = "cursor"
+    template_name = "tasks/workload.html"
+    context_object_name = "worker_list"
+
+    def get_queryset(self):
+        queryset = Worker.objects.select_related("position")
+        form = WorkerSearchForm(self.request.GET)
+        if form.is_valid() and form.cleaned_data["username"]:
+            queryset = queryset.filter(username__icontains=form.cleaned_data["username"])
+        # Ordered by the paginator, see get_cursor_ordering_field().
+        return workload.with_workload(queryset)
+
+    def get_cursor_ordering_field(self, queryset):
+        return workload.sort_field(self.request.GET.get("sort", ""))
+
+    def get_context_data(self, *, object_list=None, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["search_form"] = WorkerSearchForm(
+            initial={"username": self.request.GET.get("username", "")},
+        )
+        context["sort"] = self.request.GET.get("sort", "-num_open")
+        return context
+
 
 class WorkerCreateView(LoginRequiredMixin, SuccessMessageMixin, generic.CreateView):
     model = Worker
+    query_budget = 3
     form_class = WorkerCreationForm
     success_url = reverse_lazy("tasks:worker-list")
     success_message = "Worker successfully created"
@@ -120,6 +492,7 @@ class WorkerCreateView(LoginRequiredMixin, SuccessMessageMixin, generic.CreateVi
 
 class WorkerDeleteView(LoginRequiredMixin, generic.DeleteView):
     model = Worker
+    query_budget = 3
     success_url = reverse_lazy("tasks:worker-list")
 
     def post(self, request, *args, **kwargs):
@@ -128,8 +501,9 @@ class WorkerDeleteView(LoginRequiredMixin, generic.DeleteView):
         return response
 
 
-class PositionListView(LoginRequiredMixin, generic.ListView):
+class PositionListView(LoginRequiredMixin, CursorPaginationMixin, generic.ListView):
     model = Position
+    query_budget = 4
     paginate_by = 7
 
     def get_queryset(self):
@@ -151,10 +525,12 @@ class PositionListView(LoginRequiredMixin, generic.ListView):
 
 class PositionDetailView(LoginRequiredMixin, generic.DetailView):
     model = Position
+    query_budget = 4
 
 
 class PositionCreateView(LoginRequiredMixin, SuccessMessageMixin, generic.CreateView):
     model = Position
+    query_budget = 2
     fields = ("name",)
     success_url = reverse_lazy("tasks:position-list")
     success_message = "Position successfully updated."
@@ -162,6 +538,7 @@ class PositionCreateView(LoginRequiredMixin, SuccessMessageMixin, generic.Create
 
 class PositionUpdateView(LoginRequiredMixin, SuccessMessageMixin, generic.UpdateView):
     model = Position
+    query_budget = 3
     fields = ("name",)
     success_url = reverse_lazy("tasks:position-list")
     success_message = "Position successfully updated"
@@ -169,6 +546,7 @@ class PositionUpdateView(LoginRequiredMixin, SuccessMessageMixin, generic.Update
 
 class PositionDeleteView(LoginRequiredMixin, generic.DeleteView):
     model = Position
+    query_budget = 4
     success_url = reverse_lazy("tasks:position-list")
 
     def post(self, request, *args, **kwargs):
@@ -182,8 +560,9 @@ class PositionDeleteView(LoginRequiredMixin, generic.DeleteView):
         return context
 
 
-class TaskTypeListView(LoginRequiredMixin, generic.ListView):
+class TaskTypeListView(LoginRequiredMixin, CursorPaginationMixin, generic.ListView):
     model = TaskType
+    query_budget = 4
     paginate_by = 7
     template_name = "tasks/task_type_list.html"
     context_object_name = "task_type_list"
@@ -207,12 +586,14 @@ class TaskTypeListView(LoginRequiredMixin, generic.ListView):
 
 class TaskTypeDetailView(LoginRequiredMixin, generic.DetailView):
     model = TaskType
+    query_budget = 4
     template_name = "tasks/task_type_detail.html"
     context_object_name = "task_type"
 
 
 class TaskTypeCreateView(LoginRequiredMixin, SuccessMessageMixin, generic.CreateView):
     model = TaskType
+    query_budget = 2
     fields = ("name",)
     success_url = reverse_lazy("tasks:task-type-list")
     template_name = "tasks/task_type_form.html"
@@ -223,6 +604,7 @@ class TaskTypeCreateView(LoginRequiredMixin, SuccessMessageMixin, generic.Create
 
 class TaskTypeUpdateView(LoginRequiredMixin, SuccessMessageMixin, generic.UpdateView):
     model = TaskType
+    query_budget = 3
     fields = ("name",)
     success_url = reverse_lazy("tasks:task-type-list")
     template_name = "tasks/task_type_form.html"
@@ -232,6 +614,7 @@ class TaskTypeUpdateView(LoginRequiredMixin, SuccessMessageMixin, generic.Update
 
 class TaskTypeDeleteView(LoginRequiredMixin, generic.DeleteView):
     model = TaskType
+    query_budget = 4
     success_url = reverse_lazy("tasks:task-type-list")
     template_name = "tasks/task_type_confirm_delete.html"
     context_object_name = "task_type"
@@ -247,8 +630,9 @@ class TaskTypeDeleteView(LoginRequiredMixin, generic.DeleteView):
         return context
 
 
-class TagListView(LoginRequiredMixin, generic.ListView):
+class TagListView(LoginRequiredMixin, CursorPaginationMixin, generic.ListView):
     model = Tag
+    query_budget = 4
     paginate_by = 6
 
     def get_queryset(self):
@@ -270,11 +654,13 @@ class TagListView(LoginRequiredMixin, generic.ListView):
 
 class TagDetailView(LoginRequiredMixin, generic.DetailView):
     model = Tag
+    query_budget = 4
     paginate_by = 6
 
 
 class TagCreateView(LoginRequiredMixin, SuccessMessageMixin, generic.CreateView):
     model = Tag
+    query_budget = 2
     fields = ("name",)
     success_url = reverse_lazy("tasks:tag-list")
     success_message = "Tag successfully created."
@@ -282,6 +668,7 @@ class TagCreateView(LoginRequiredMixin, SuccessMessageMixin, generic.CreateView)
 
 class TagUpdateView(LoginRequiredMixin, SuccessMessageMixin, generic.UpdateView):
     model = Tag
+    query_budget = 3
     fields = ("name",)
     success_url = reverse_lazy("tasks:tag-list")
     success_message = "Tag successfully updated."
@@ -289,6 +676,7 @@ class TagUpdateView(LoginRequiredMixin, SuccessMessageMixin, generic.UpdateView)
 
 class TagDeleteView(LoginRequiredMixin, generic.DeleteView):
     model = Tag
+    query_budget = 3
     success_url = reverse_lazy("tasks:tag-list")
 
     def post(self, request, *args, **kwargs):
@@ -297,12 +685,13 @@ class TagDeleteView(LoginRequiredMixin, generic.DeleteView):
         return response
 
 
-class ProjectListView(LoginRequiredMixin, generic.ListView):
+class ProjectListView(LoginRequiredMixin, CursorPaginationMixin, generic.ListView):
     model = Project
+    query_budget = 4
     paginate_by = 7
 
     def get_queryset(self):
-        queryset = Project.objects.all()
+        queryset = Project.objects.select_related("progress")
         form = ProjectSearchForm(self.request.GET)
         if form.is_valid():
             queryset = queryset.filter(name__icontains=form.cleaned_data["name"])
@@ -310,6 +699,8 @@ class ProjectListView(LoginRequiredMixin, generic.ListView):
 
     def get_context_data(self, *, object_list=None, **kwargs):
         context = super(ProjectListView, self).get_context_data(**kwargs)
+        rollups.refresh_stale(context["project_list"])
+        context["today"] = timezone.now().date()
         name = self.request.GET.get("name")
         context["name"] = name
         context["search_form"] = ProjectSearchForm(
@@ -320,10 +711,17 @@ class ProjectListView(LoginRequiredMixin, generic.ListView):
 
 class ProjectDetailView(LoginRequiredMixin, generic.DetailView):
     model = Project
+    query_budget = 4
+    queryset = Project.objects.select_related("team", "progress")
+
+    def get_context_data(self, **kwargs):
+        rollups.refresh_stale([self.object])
+        return super().get_context_data(**kwargs)
 
 
 class ProjectCreateView(LoginRequiredMixin, SuccessMessageMixin, generic.CreateView):
     model = Project
+    query_budget = 3
     fields = ("name", "team",)
     success_url = reverse_lazy("tasks:project-list")
     success_message = "Project successfully created."
@@ -331,6 +729,7 @@ class ProjectCreateView(LoginRequiredMixin, SuccessMessageMixin, generic.CreateV
 
 class ProjectUpdateView(LoginRequiredMixin, SuccessMessageMixin, generic.UpdateView):
     model = Project
+    query_budget = 4
     fields = ("name","team", )
     success_url = reverse_lazy("tasks:project-list")
     success_message = "Project successfully updated."
@@ -338,6 +737,7 @@ class ProjectUpdateView(LoginRequiredMixin, SuccessMessageMixin, generic.UpdateV
 
 class ProjectDeleteView(LoginRequiredMixin, generic.DeleteView):
     model = Project
+    query_budget = 4
     success_url = reverse_lazy("tasks:project-list")
 
     def post(self, request, *args, **kwargs):
@@ -350,12 +750,13 @@ class ProjectDeleteView(LoginRequiredMixin, generic.DeleteView):
         context["has_dependencies"] = self.object.tasks.exists()
         return context
 
-class TeamListView(LoginRequiredMixin, generic.ListView):
+class TeamListView(LoginRequiredMixin, CursorPaginationMixin, generic.ListView):
     model = Team
+    query_budget = 4
     paginate_by = 7
 
     def get_queryset(self):
-        queryset = Team.objects.all()
+        queryset = Team.objects.select_related("progress")
         form = TeamSearchForm(self.request.GET)
         if form.is_valid():
             queryset = queryset.filter(name__icontains=form.cleaned_data["name"])
@@ -363,6 +764,8 @@ class TeamListView(LoginRequiredMixin, generic.ListView):
 
     def get_context_data(self, *, object_list=None, **kwargs):
         context = super(TeamListView, self).get_context_data(**kwargs)
+        rollups.refresh_stale(context["team_list"])
+        context["today"] = timezone.now().date()
         name = self.request.GET.get("name")
         context["name"] = name
         context["search_form"] = TeamSearchForm(
@@ -373,10 +776,17 @@ class TeamListView(LoginRequiredMixin, generic.ListView):
 
 class TeamDetailView(LoginRequiredMixin, generic.DetailView):
     model = Team
+    query_budget = 5
+    queryset = Team.objects.select_related("progress")
+
+    def get_context_data(self, **kwargs):
+        rollups.refresh_stale([self.object])
+        return super().get_context_data(**kwargs)
 
 
 class TeamCreateView(LoginRequiredMixin, SuccessMessageMixin, generic.CreateView):
     model = Team
+    query_budget = 3
     fields = ("name", "workers",)
     success_url = reverse_lazy("tasks:team-list")
     success_message = "Team successfully created."
@@ -384,6 +794,7 @@ class TeamCreateView(LoginRequiredMixin, SuccessMessageMixin, generic.CreateView
 
 class TeamUpdateView(LoginRequiredMixin, SuccessMessageMixin, generic.UpdateView):
     model = Team
+    query_budget = 5
     fields = ("name", "workers",)
     success_url = reverse_lazy("tasks:team-list")
     success_message = "Team successfully updated."
@@ -391,6 +802,7 @@ class TeamUpdateView(LoginRequiredMixin, SuccessMessageMixin, generic.UpdateView
 
 class TeamDeleteView(LoginRequiredMixin, generic.DeleteView):
     model = Team
+    query_budget = 4
     success_url = reverse_lazy("tasks:team-list")
 
     def post(self, request, *args, **kwargs):
@@ -402,3 +814,41 @@ class TeamDeleteView(LoginRequiredMixin, generic.DeleteView):
         context = super().get_context_data(**kwargs)
         context["has_dependencies"] = self.object.projects.exists()
         return context
+
+
+class JobQuerysetMixin:
+    """
+    Workers see the jobs they queued, staff and superusers see every job.
+    """
+    def get_queryset(self):
+        queryset = Job.objects.select_related("created_by")
+        user = self.request.user
+        if not (user.is_staff or user.is_superuser):
+            queryset = queryset.filter(created_by=self.request.user)
+        return queryset
+
+
+class JobListView(LoginRequiredMixin, JobQuerysetMixin, generic.ListView):
+    model = Job
+    query_budget = 4
+    paginate_by = 20
+
+
+class JobDetailView(LoginRequiredMixin, JobQuerysetMixin, generic.DetailView):
+    model = Job
+    query_budget = 3
+
+
+class JobDownloadView(LoginRequiredMixin, JobQuerysetMixin, generic.DetailView):
+    """
+    Serves the file written by a finished export job.
+    """
+    model = Job
+    query_budget = 3
+
+    def get(self, request, *args, **kwargs):
+        job = self.get_object()
+        path = Path((job.result or {}).get("path", "")) if job.status == JobStatus.SUCCEEDED else None
+        if not path or not path.is_file():
+            raise Http404("The job has no file to download")
+        return FileResponse(open(path, "rb"), as_attachment=True, filename=f"tasks.{job.result['format']}")
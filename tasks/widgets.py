@@ -0,0 +1,61 @@
+from django import forms
+from django.core.exceptions import ValidationError
+from django.urls import reverse
+
+
+class AutocompleteMixin:
+    """
+    Select widget that renders only the selected options and loads the
+    rest from a search endpoint (see AutocompleteView) as the user types.
+
+    Validation is unchanged: the form field still checks submitted values
+    against its full queryset.
+    """
+
+    def __init__(self, url_name, attrs=None, choices=()):
+        super().__init__(attrs, choices)
+        self.url_name = url_name
+
+    def build_attrs(self, base_attrs, extra_attrs=None):
+        attrs = super().build_attrs(base_attrs, extra_attrs)
+        attrs["data-autocomplete-url"] = reverse(self.url_name)
+        attrs["class"] = f"{attrs.get('class', '')} autocomplete form-control".strip()
+        return attrs
+
+    def optgroups(self, name, value, attrs=None):
+        selected = {str(pk) for pk in value if pk not in ("", None)}
+        options = []
+        if not self.is_required and not self.allow_multiple_selected:
+            options.append(self.create_option(name, "", "", not selected, 0))
+        if selected:
+            field_name = self.choices.field.to_field_name or "pk"
+            queryset = self.choices.queryset
+            key = queryset.model._meta.get_field(field_name) if field_name != "pk" else queryset.model._meta.pk
+            queryset = queryset.filter(**{f"{field_name}__in": self.valid_keys(key, selected)})
+            for index, obj in enumerate(queryset, start=len(options)):
+                option_value, label = self.choices.choice(obj)
+                options.append(self.create_option(name, option_value, label, True, index))
+        return [(None, options, 0)]
+
+    @staticmethod
+    def valid_keys(key, values):
+        # A form re-rendered with errors passes back whatever was submitted.
+        keys = set()
+        for value in values:
+            try:
+                keys.add(key.to_python(value))
+            except (ValidationError, ValueError):
+                pass
+        return keys
+
+    @property
+    def media(self):
+        return forms.Media(js=["assets/js/autocomplete.js"])
+
+
+class AutocompleteSelect(AutocompleteMixin, forms.Select):
+    pass
+
+
+class AutocompleteSelectMultiple(AutocompleteMixin, forms.SelectMultiple):
+    pass
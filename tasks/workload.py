@@ -0,0 +1,48 @@
+"""
+Per-worker task counts for the workload page.
+
+All counts come from one grouped query: workers LEFT JOIN the assignees
+through table and tasks, with a filtered COUNT per column.
+"""
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from tasks.models import TaskPriority
+
+PRIORITY_COLUMNS = [f"num_{priority}" for priority in TaskPriority.values]
+COLUMNS = ["num_open", "num_overdue", "num_completed", *PRIORITY_COLUMNS]
+SORT_FIELDS = ["username", *COLUMNS]
+
+
+def with_workload(queryset):
+    """
+    Annotates open, overdue and completed task counts and the open
+    tasks per priority onto a Worker queryset.
+    """
+    is_open = Q(tasks__is_completed=False)
+    return queryset.annotate(
+        num_open=Count("tasks", filter=is_open),
+        num_overdue=Count("tasks", filter=is_open & Q(tasks__deadline__lt=timezone.now().date())),
+        num_completed=Count("tasks", filter=Q(tasks__is_completed=True)),
+        **{
+            f"num_{priority}": Count("tasks", filter=is_open & Q(tasks__priority=priority))
+            for priority in TaskPriority.values
+        },
+    )
+
+
+def sort_field(sort):
+    """
+    ``sort`` if it is one of SORT_FIELDS, "-" prefixed for descending,
+    else most open tasks first.
+    """
+    return sort if sort.lstrip("-") in SORT_FIELDS else "-num_open"
+
+
+def sort_workload(queryset, sort):
+    """
+    Orders by sort_field(), with the pk as tie breaker so pages are
+    stable.
+    """
+    sort = sort_field(sort)
+    return queryset.order_by(sort, "-pk" if sort.startswith("-") else "pk")